@@ -0,0 +1,111 @@
+"""Resolve model artifacts through registry channels and cache them by hash.
+
+With ``MODEL_CHANNEL`` set, the API reads the channel pointer written by
+``recbuddy.registry`` (``artifacts/channels/{channel}.json``, a few hundred
+bytes) instead of a pinned ``MODEL_ARTIFACT_PATH``. The pointer names the
+version, the artifact key and its sha256. Artifacts are kept in
+``MODEL_CACHE_DIR`` as ``{sha256}.safetensors``, so a rollout or rollback
+whose artifact is already on disk skips the download. Downloads are verified
+against the pointer's hash before they enter the cache.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.metrics import ARTIFACT_CACHE_TOTAL
+from app.services.s3 import S3Service
+from recbuddy.registry import channel_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """A resolved artifact: where it lives and what it should hash to."""
+
+    bucket: str
+    key: str
+    version: str
+    sha256: str | None
+
+
+def resolve_channel(s3: S3Service, channel: str, bucket: str) -> ArtifactRef:
+    """Read ``channel``'s pointer from ``bucket``.
+
+    Raises:
+        ValueError: If the channel name is invalid or the channel is unset.
+    """
+    pointer = s3.get_json(channel_key(channel), bucket=bucket)
+    if pointer is None:
+        raise ValueError(f"Model channel {channel!r} is not set in s3://{bucket}")
+    return ArtifactRef(
+        bucket=bucket,
+        key=pointer["artifact_key"],
+        version=pointer["version"],
+        sha256=pointer.get("sha256"),
+    )
+
+
+def file_sha256(path: str | Path) -> str:
+    """Return the hex sha256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch(s3: S3Service, ref: ArtifactRef, cache_dir: str, keep: int = 3) -> str:
+    """Return a local path to ``ref``, downloading it only on a cache miss.
+
+    Artifacts without a recorded hash (promoted before the registry) are
+    downloaded every time.
+
+    Args:
+        s3: S3 service used for the download.
+        ref: Artifact to fetch.
+        cache_dir: Directory of ``{sha256}.safetensors`` files.
+        keep: Number of cached artifacts to retain, most recently used first.
+
+    Raises:
+        ValueError: If the downloaded file does not match ``ref.sha256``.
+    """
+    cache = Path(cache_dir)
+    if ref.sha256 is None:
+        path = cache / "unversioned.safetensors"
+        s3.download_artifact(ref.key, str(path), bucket=ref.bucket)
+        return str(path)
+
+    path = cache / f"{ref.sha256}.safetensors"
+    if path.exists():
+        ARTIFACT_CACHE_TOTAL.inc(result="hit")
+        logger.info("Artifact %s (%s) found in cache", ref.version, ref.sha256[:12])
+        path.touch()
+        return str(path)
+
+    ARTIFACT_CACHE_TOTAL.inc(result="miss")
+    partial = cache / f"{ref.sha256}.partial"
+    s3.download_artifact(ref.key, str(partial), bucket=ref.bucket)
+    actual = file_sha256(partial)
+    if actual != ref.sha256:
+        partial.unlink(missing_ok=True)
+        raise ValueError(
+            f"s3://{ref.bucket}/{ref.key} has sha256 {actual}, "
+            f"pointer expects {ref.sha256}"
+        )
+    os.replace(partial, path)
+    _evict(cache, keep)
+    return str(path)
+
+
+def _evict(cache: Path, keep: int) -> None:
+    """Delete all but the ``keep`` most recently used cached artifacts."""
+    cached = sorted(
+        cache.glob("*.safetensors"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for stale in cached[keep:]:
+        logger.info("Evicting cached artifact %s", stale.name)
+        stale.unlink(missing_ok=True)
@@ -15,8 +15,38 @@ class Settings(BaseSettings):
     aws_secret_access_key: str | None = None
     cors_origins: str = "http://localhost:5173"
     model_artifact_path: str = "model/artifacts/model.safetensors"
+    model_channel: str | None = None  # registry channel; overrides the path
+    model_registry_bucket: str | None = None  # defaults to s3_bucket
+    model_cache_dir: str = "/tmp/model-cache"  # artifacts cached by sha256
+    model_cache_keep: int = 3  # cached artifacts kept for rollbacks
+    model_channel_refresh_seconds: float = 60.0  # re-read MODEL_CHANNEL; 0 = never
+    inference_bf16: bool = False  # bfloat16 autocast; needs AVX512-BF16/AMX
+    inference_channels_last: bool = True  # NHWC weights and inputs
+    inference_compile: bool = False  # torch.compile; first request compiles
+    inference_num_threads: int = 4  # intra-op threads (see benchmarks.inference)
+    inference_jpeg_draft: bool = False  # always decode JPEGs at reduced scale
+    warmup_on_startup: bool = False  # load model + guidelines in the background
+    inference_top_k: int = 3  # alternatives returned by /predict
+    inference_temperature: float = 1.0  # softmax temperature (see evaluate report)
+    low_confidence_threshold: float | None = None  # flag top-1 below this
+    inference_tta_threshold: float | None = None  # TTA when top-1 is below this
+    cascade_artifact_path: str | None = None  # cheap first-stage model
+    cascade_threshold: float = 0.9  # first stage answers at/above this top-1
+    shadow_artifact_path: str | None = None  # candidate run on sampled traffic
+    shadow_sample_rate: float = 0.1  # fraction of /predict requests shadowed
+    shadow_queue_size: int = 16  # pending shadow samples; extra are dropped
+    shadow_queue_bytes: int = 32 * 1024 * 1024  # image bytes of those samples
+    shadow_max_in_flight: int = 4  # /predict requests above which we shed
+    prediction_events_uri: str | None = None  # log (default), a dir or s3://
+    prediction_events_batch_size: int = 500  # buffered events that force a flush
+    prediction_events_flush_seconds: float = 5.0  # longest an event waits
+    prediction_events_max_buffered: int = 10_000  # further events are dropped
+    max_upload_bytes: int = 10 * 1024 * 1024  # /predict and /upload bodies
+    max_image_pixels: int = 16_000_000  # larger JPEGs are downscaled on decode
     openai_api_key: str | None = None
+    openai_base_url: str | None = None  # override for local stubs (benchmarks)
     tavily_api_key: str | None = None
+    tavily_api_base_url: str | None = None  # override for local stubs
     guidelines_cache_ttl_seconds: int = 604800  # 1 week
     search_cache_ttl_seconds: int = 86400  # 24 hours
 
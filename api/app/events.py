@@ -0,0 +1,242 @@
+"""Buffered, batched sink for per-request prediction events (FR-013).
+
+``/predict`` records each prediction (label, confidence, latency, model
+version; never image data) with :meth:`EventSink.emit`. That call appends a
+dict to an in-memory buffer under a lock and returns; it does no encoding
+and no I/O. A background thread flushes the buffer every
+``PREDICTION_EVENTS_FLUSH_SECONDS``, or sooner once
+``PREDICTION_EVENTS_BATCH_SIZE`` events are waiting. Each flush writes the
+batch to the destination chosen by ``PREDICTION_EVENTS_URI``:
+
+  - unset or ``log``: one JSON log line per event, as before, but written
+    by the flush thread instead of the request;
+  - a directory: gzip-compressed NDJSON files under
+    ``predictions/YYYY/MM/DD/``;
+  - ``s3://bucket/prefix``: the same files uploaded with one
+    ``put_object`` per batch.
+
+Memory is bounded by ``PREDICTION_EVENTS_MAX_BUFFERED``. When the buffer is
+full (the destination is slow or down), new events are dropped and counted
+rather than delaying the request. A batch whose write fails is logged,
+counted and discarded; it is not retried. Counts are exported on
+``/metrics`` as ``recbuddy_prediction_events_total{result}`` (written,
+dropped, failed).
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Protocol
+
+from app.metrics import PREDICTION_EVENTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+def encode_ndjson(events: list[dict]) -> bytes:
+    """Return ``events`` as gzip-compressed NDJSON, one compact object per line."""
+    lines = b"".join(
+        json.dumps(event, separators=(",", ":")).encode() + b"\n" for event in events
+    )
+    return gzip.compress(lines, compresslevel=6)
+
+
+def batch_key(prefix: str = "") -> str:
+    """Return a unique, date-partitioned name for a new batch file."""
+    now = datetime.now(timezone.utc)
+    return (
+        f"{prefix}predictions/{now:%Y/%m/%d}/"
+        f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Destinations
+# ---------------------------------------------------------------------------
+
+
+class Destination(Protocol):
+    """Where a flushed batch goes; called from the flush thread only."""
+
+    def write(self, events: list[dict]) -> None: ...
+
+
+class LogDestination:
+    """Logs each event as one JSON line (the original FR-013 format)."""
+
+    def write(self, events: list[dict]) -> None:
+        for event in events:
+            logger.info(json.dumps(event))
+
+
+class LocalDestination:
+    """Writes each batch to a gzip NDJSON file under ``directory``.
+
+    Files are written under a temporary name and renamed, so readers never
+    see a partial batch.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def write(self, events: list[dict]) -> None:
+        path = self.directory / batch_key()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".partial")
+        partial.write_bytes(encode_ndjson(events))
+        os.replace(partial, path)
+
+
+class S3Destination:
+    """Uploads each batch as a gzip NDJSON object under ``s3://bucket/prefix``.
+
+    Args:
+        client: boto3 S3 client, or a zero-argument callable returning one
+            (e.g. ``lambda: s3_service.client``) so it is created on first
+            flush rather than at startup.
+        bucket: Target bucket.
+        prefix: Key prefix, e.g. ``"events/"``.
+    """
+
+    def __init__(self, client: Any, bucket: str, prefix: str = "") -> None:
+        self._client = client
+        self.bucket = bucket
+        self.prefix = prefix if not prefix or prefix.endswith("/") else prefix + "/"
+
+    def write(self, events: list[dict]) -> None:
+        client = self._client() if callable(self._client) else self._client
+        client.put_object(
+            Bucket=self.bucket,
+            Key=batch_key(self.prefix),
+            Body=encode_ndjson(events),
+            ContentType="application/x-ndjson",
+            ContentEncoding="gzip",
+        )
+
+
+def destination_from_uri(uri: str | None, s3_client: Any = None) -> Destination:
+    """Build the destination for ``PREDICTION_EVENTS_URI``.
+
+    Args:
+        uri: ``None``/``"log"``, a local directory, or ``s3://bucket/prefix``.
+        s3_client: Client (or factory) for ``s3://`` URIs.
+
+    Raises:
+        ValueError: If an ``s3://`` URI has no bucket.
+    """
+    if not uri or uri == "log":
+        return LogDestination()
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[len("s3://") :].partition("/")
+        if not bucket:
+            raise ValueError(f"Invalid S3 URI — missing bucket: {uri!r}")
+        return S3Destination(s3_client, bucket, prefix)
+    return LocalDestination(uri)
+
+
+# ---------------------------------------------------------------------------
+# Sink
+# ---------------------------------------------------------------------------
+
+
+class EventSink:
+    """Buffers events in memory and writes them in batches off the request path.
+
+    Args:
+        destination: Where flushed batches are written.
+        batch_size: Buffered events that trigger an early flush.
+        flush_interval_seconds: Longest an event waits before being flushed.
+        max_buffered: Events held in memory; further events are dropped.
+    """
+
+    def __init__(
+        self,
+        destination: Destination,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 5.0,
+        max_buffered: int = 10_000,
+    ) -> None:
+        self.destination = destination
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max(max_buffered, 1)
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._counts = {"written": 0, "dropped": 0, "failed": 0}
+        self._thread = threading.Thread(
+            target=self._run, name="prediction-events", daemon=True
+        )
+        self._thread.start()
+
+    def emit(self, event: dict) -> bool:
+        """Buffer ``event`` for the next flush; never blocks on I/O.
+
+        Returns:
+            False if the buffer was full and the event was dropped.
+        """
+        with self._lock:
+            dropped = len(self._buffer) >= self.max_buffered
+            if dropped:
+                self._counts["dropped"] += 1
+            else:
+                self._buffer.append(event)
+            full_batch = len(self._buffer) >= self.batch_size
+        if dropped:
+            PREDICTION_EVENTS_TOTAL.inc(result="dropped")
+            return False
+        if full_batch:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """Write everything buffered so far as one batch.
+
+        Returns:
+            Number of events written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                self.destination.write(batch)
+            except Exception:
+                logger.exception("Failed to write %d prediction events", len(batch))
+                self._record("failed", len(batch))
+                return 0
+            self._record("written", len(batch))
+            return len(batch)
+
+    def stats(self) -> dict:
+        """Return written, dropped and failed counts and the current backlog."""
+        with self._lock:
+            return {**self._counts, "buffered": len(self._buffer)}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the flush thread after a final flush."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _record(self, result: str, n: int) -> None:
+        PREDICTION_EVENTS_TOTAL.inc(n, result=result)
+        with self._lock:
+            self._counts[result] += n
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            stopping = self._stopping.is_set()
+            self.flush()
+            if stopping:
+                return
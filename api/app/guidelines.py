@@ -17,6 +17,7 @@ from openai import AsyncOpenAI
 from tavily import TavilyClient
 
 from app.config import settings
+from app.metrics import GUIDELINES_CACHE_TOTAL, GUIDELINES_FALLBACK_TOTAL
 
 logger = logging.getLogger(__name__)
 
@@ -101,12 +102,19 @@ class GuidelinesService:
         self._advice_ttl = settings.guidelines_cache_ttl_seconds
         self._search_ttl = settings.search_cache_ttl_seconds
         self._openai = (
-            AsyncOpenAI(api_key=settings.openai_api_key)
+            AsyncOpenAI(
+                api_key=settings.openai_api_key, base_url=settings.openai_base_url
+            )
             if settings.openai_api_key
             else None
         )
+        tavily_kwargs = (
+            {"api_base_url": settings.tavily_api_base_url}
+            if settings.tavily_api_base_url
+            else {}
+        )
         self._tavily = (
-            TavilyClient(api_key=settings.tavily_api_key)
+            TavilyClient(api_key=settings.tavily_api_key, **tavily_kwargs)
             if settings.tavily_api_key
             else None
         )
@@ -131,8 +139,10 @@ class GuidelinesService:
             content, inserted_at = cached
             if time.time() - inserted_at < self._search_ttl:
                 logger.info("Search cache hit for %s/%s", item_category, council_slug)
+                GUIDELINES_CACHE_TOTAL.inc(tier="search", result="hit")
                 return content
             del self._search_cache[cache_key]
+        GUIDELINES_CACHE_TOTAL.inc(tier="search", result="miss")
 
         # Human-readable query for Tavily
         query = f"{item_category.replace('-', ' ')} recycling {council_slug}"
@@ -272,8 +282,10 @@ class GuidelinesService:
             record, inserted_at = cached
             if time.time() - inserted_at < self._advice_ttl:
                 logger.info("Advice cache hit for %s/%s", item_category, council_slug)
+                GUIDELINES_CACHE_TOTAL.inc(tier="advice", result="hit")
                 return record
             del self._advice_cache[cache_key]
+        GUIDELINES_CACHE_TOTAL.inc(tier="advice", result="miss")
 
         # Tier 2: search cache (or fresh Tavily call)
         # _search_rny uses the synchronous Tavily client, so run in a thread
@@ -284,6 +296,8 @@ class GuidelinesService:
         )
 
         record = await self._call_llm(item_category, council_slug, search_content)
+        if record.is_fallback:
+            GUIDELINES_FALLBACK_TOTAL.inc()
         self._advice_cache[cache_key] = (record, time.time())
         logger.info(
             "Guidelines lookup: item=%s council=%s fallback=%s",
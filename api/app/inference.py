@@ -4,6 +4,7 @@ This module is the single integration point between FastAPI and the PyTorch
 model. It owns:
   - Value objects returned to callers (CategoryPrediction, ClassificationResult)
   - ClassificationModel: loads a safetensors artifact, runs thread-safe inference
+  - CascadeClassifier: a cheap first-stage model in front of ClassificationModel
 
 Design constraints (from spec / constitution):
   - Loaded once at app startup via FastAPI lifespan; shared across requests
@@ -14,16 +15,22 @@ Design constraints (from spec / constitution):
 
 import io
 import logging
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import dataclass
+from typing import Any, Callable, Sequence
 
 import torch
 import torch.nn as nn
-import torchvision.models as models
 from PIL import Image, UnidentifiedImageError
-from safetensors.torch import load_file
 from torchvision.transforms import v2 as T
 
+from app.config import settings
+from app.metrics import CASCADE_ROUTED_TOTAL, PREDICT_STAGE_SECONDS
 from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.modeling import load_model
+from recbuddy.optimize import bf16_autocast
+from recbuddy.transforms import tta_transform
+from recbuddy.tta import CROP_SIZE, TTA_VIEWS, center_view, tta_views
 
 logger = logging.getLogger(__name__)
 
@@ -32,12 +39,15 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _NUM_CLASSES: int = len(ALL_LABELS_LIST)  # 48
-_EFFICIENTNET_FEATURE_DIM: int = 1280
 
 # ImageNet normalisation — matches EfficientNet_B0_Weights.IMAGENET1K_V1
 _IMAGENET_MEAN: list[float] = [0.485, 0.456, 0.406]
 _IMAGENET_STD: list[float] = [0.229, 0.224, 0.225]
 
+# Oversize JPEGs (or every JPEG, with inference_jpeg_draft) are decoded at a
+# reduced DCT scale that still leaves the shorter side >= the Resize(256) target.
+_DRAFT_MIN_SIZE: tuple[int, int] = (256, 256)
+
 # Set PyTorch thread counts once at module load time.
 # set_num_interop_threads cannot be changed after the first parallel operation.
 torch.set_num_interop_threads(1)
@@ -53,11 +63,37 @@ _INFERENCE_TRANSFORM: T.Compose = T.Compose(
     ]
 )
 
+# With TTA enabled images are decoded to the 256x256 square the views are cut
+# from; the single pass uses its centre crop, identical to the above.
+_TTA_TRANSFORM: T.Compose = tta_transform()
+
+# Views run when TTA triggers; "center" comes from the single pass.
+_TTA_EXTRA_VIEWS: tuple[str, ...] = TTA_VIEWS[1:]
+
+# Called with a stage name ("decode", "forward", ...) around each stage of
+# predict_batch; see ClassificationModel.stage_timer.
+StageTimer = Callable[[str], AbstractContextManager[Any]]
+
+
+def record_stage(stage: str) -> AbstractContextManager[Any]:
+    """Default :data:`StageTimer`: observe ``recbuddy_predict_stage_seconds``."""
+    return PREDICT_STAGE_SECONDS.time(stage=stage)
+
+
+def untimed(stage: str) -> AbstractContextManager[Any]:
+    """:data:`StageTimer` that records nothing (e.g. for shadow models)."""
+    return nullcontext()
+
+
 # ---------------------------------------------------------------------------
 # Value objects
 # ---------------------------------------------------------------------------
 
 
+class ImageTooLargeError(ValueError):
+    """Raised when an image's dimensions exceed ``settings.max_image_pixels``."""
+
+
 @dataclass(frozen=True)
 class CategoryPrediction:
     """A single label-confidence pair from the classifier."""
@@ -70,12 +106,15 @@ class CategoryPrediction:
 class ClassificationResult:
     """Output of a single inference call.
 
-    alternatives always has exactly 3 entries, ordered confidence descending.
-    alternatives[0] is identical to top_prediction.
+    alternatives has ``top_k`` entries (default 3), ordered confidence
+    descending. alternatives[0] is identical to top_prediction.
+    low_confidence is True when the top confidence is below the configured
+    abstain threshold.
     """
 
     top_prediction: CategoryPrediction
     alternatives: list[CategoryPrediction]
+    low_confidence: bool = False
 
 
 # ---------------------------------------------------------------------------
@@ -89,13 +128,50 @@ class ClassificationModel:
     Load once at application startup (FastAPI lifespan). Safe for concurrent
     access: model.eval() is set permanently; each predict() call creates its
     own tensors via torch.inference_mode().
+
+    With ``tta_threshold`` set, images whose single-pass top-1 confidence is
+    below it are re-scored with test-time augmentation (:mod:`recbuddy.tta`).
+    All extra views of those images run as one batched forward pass, and
+    their probabilities are averaged with the single-pass ones.
+
+    Each stage of :meth:`predict_batch` runs inside ``stage_timer(name)``;
+    the default records ``recbuddy_predict_stage_seconds``. Pass
+    :func:`untimed` for models that must not appear in the /predict stage
+    metrics, or a custom timer to collect timings elsewhere.
+    ``jpeg_draft`` may be changed between calls, e.g. to compare decode modes.
     """
 
-    def __init__(self, net: nn.Module) -> None:
+    def __init__(
+        self,
+        net: nn.Module,
+        bf16: bool = False,
+        top_k: int = 3,
+        temperature: float = 1.0,
+        low_confidence_threshold: float | None = None,
+        jpeg_draft: bool = False,
+        tta_threshold: float | None = None,
+        stage_timer: StageTimer = record_stage,
+    ) -> None:
+        if not 1 <= top_k <= _NUM_CLASSES:
+            raise ValueError(f"top_k must be in [1, {_NUM_CLASSES}], got {top_k}")
+        if temperature <= 0:
+            raise ValueError(f"temperature must be positive, got {temperature}")
         self._net = net
+        self._bf16 = bf16
+        self._top_k = top_k
+        self._temperature = temperature
+        self._low_confidence_threshold = low_confidence_threshold
+        self.jpeg_draft = jpeg_draft
+        self._tta_threshold = tta_threshold
+        self.stage_timer = stage_timer
 
     @classmethod
-    def from_artifact(cls, artifact_path: str) -> "ClassificationModel":
+    def from_artifact(
+        cls,
+        artifact_path: str,
+        bf16: bool | None = None,
+        stage_timer: StageTimer = record_stage,
+    ) -> "ClassificationModel":
         """Load a trained model from a safetensors file.
 
         Sets torch thread counts before any tensor operations to prevent
@@ -103,32 +179,43 @@ class ClassificationModel:
 
         Args:
             artifact_path: Path to a .safetensors state-dict file.
+            bf16: Run the forward pass under bfloat16 autocast. Defaults to
+                ``settings.inference_bf16``.
+            stage_timer: See the class docstring.
 
         Returns:
             ClassificationModel ready for concurrent inference.
 
         Raises:
             FileNotFoundError: If artifact_path does not exist.
+            ValueError: If the artifact is not a 48-class classifier.
         """
-        import os
-
-        if not os.path.exists(artifact_path):
-            raise FileNotFoundError(
-                f"Model artifact not found: {artifact_path}. "
-                "Run the training pipeline to produce an artifact first."
-            )
-
         # set_num_threads can be called per-load; set_num_interop_threads
         # is handled once at module level above.
-        torch.set_num_threads(4)
-
-        net = models.efficientnet_b0(weights=None)
-        net.classifier[1] = nn.Linear(_EFFICIENTNET_FEATURE_DIM, _NUM_CLASSES)
-        net.load_state_dict(load_file(artifact_path))
-        net.eval()  # Disable dropout / BatchNorm training mode; never toggled back
+        torch.set_num_threads(settings.inference_num_threads)
+
+        # Returned in eval() mode, never toggled back; Conv-BN fused and
+        # channels_last, torch.compile only when configured.
+        net = load_model(
+            artifact_path,
+            num_classes=_NUM_CLASSES,
+            channels_last=settings.inference_channels_last,
+            compile=settings.inference_compile,
+        )
 
-        logger.info("Loaded model artifact: %s", artifact_path)
-        return cls(net)
+        if bf16 is None:
+            bf16 = settings.inference_bf16
+        logger.info("Loaded model artifact: %s (bf16=%s)", artifact_path, bf16)
+        return cls(
+            net,
+            bf16=bf16,
+            top_k=settings.inference_top_k,
+            temperature=settings.inference_temperature,
+            low_confidence_threshold=settings.low_confidence_threshold,
+            jpeg_draft=settings.inference_jpeg_draft,
+            tta_threshold=settings.inference_tta_threshold,
+            stage_timer=stage_timer,
+        )
 
     def predict(self, image_bytes: bytes) -> ClassificationResult:
         """Classify raw image bytes.
@@ -141,45 +228,270 @@ class ClassificationModel:
                          NOT stored or written to disk.
 
         Returns:
-            ClassificationResult with top prediction and top-3 alternatives.
+            ClassificationResult with top prediction and top-k alternatives.
 
         Raises:
             ValueError: If image_bytes cannot be decoded as a valid image.
         """
-        tensor = self._decode(image_bytes)
+        return self.predict_batch([image_bytes])[0]
 
-        with torch.inference_mode():
-            logits = self._net(tensor)  # (1, 48)
-            probs = torch.softmax(logits, dim=1).squeeze(0)  # (48,)
+    def predict_batch(self, images: Sequence[bytes]) -> list[ClassificationResult]:
+        """Classify several images with one forward pass.
 
-        top3_indices = probs.argsort(descending=True)[:3].tolist()
+        Same thread-safety and storage guarantees as :meth:`predict`; results
+        are returned in input order.
 
-        alternatives = [
-            CategoryPrediction(
-                label=ALL_LABELS_LIST[i],
-                confidence=float(probs[i]),
-            )
-            for i in top3_indices
-        ]
+        Raises:
+            ValueError: If any image cannot be decoded.
+        """
+        with self.stage_timer("decode"):
+            batch = self._decode_batch(images)
+        with torch.inference_mode():
+            with self.stage_timer("forward"):
+                logits = self._forward(batch)
+            with self.stage_timer("postprocess"):
+                return self._postprocess(logits, batch)
 
-        return ClassificationResult(
-            top_prediction=alternatives[0],
-            alternatives=alternatives,
+    def _decode_batch(self, images: Sequence[bytes]) -> torch.Tensor:
+        """Decode and stack images into an (N, 3, 224, 224) tensor.
+
+        With TTA enabled the tensor is (N, 3, 256, 256); see :meth:`_forward`.
+        """
+        tta = self._tta_threshold is not None
+        return torch.cat(
+            [self._decode(b, draft=self.jpeg_draft, tta=tta) for b in images]
         )
 
+    def _forward(self, batch: torch.Tensor) -> torch.Tensor:
+        """Return (N, 48) logits; call under ``torch.inference_mode()``."""
+        if batch.shape[-1] != CROP_SIZE:
+            batch = center_view(batch)
+        with bf16_autocast(self._bf16):
+            return self._net(batch)
+
+    def _postprocess(
+        self, logits: torch.Tensor, batch: torch.Tensor
+    ) -> list[ClassificationResult]:
+        """Turn logits into one ClassificationResult per row.
+
+        Includes the TTA pass (also timed as the ``tta`` stage) when it
+        triggers.
+        """
+        # Temperature-scaled softmax; topk is a partial selection (no full
+        # sort) and one .tolist() per tensor crosses into Python instead of
+        # a float() per element.
+        probs = torch.softmax(logits.float() / self._temperature, dim=1)
+        if self._tta_threshold is not None:
+            probs = self._apply_tta(probs, batch, self._tta_threshold)
+        values, indices = probs.topk(self._top_k, dim=1)
+        threshold = self._low_confidence_threshold
+        results = []
+        for row_indices, row_values in zip(indices.tolist(), values.tolist()):
+            alternatives = [
+                CategoryPrediction(label=ALL_LABELS_LIST[i], confidence=c)
+                for i, c in zip(row_indices, row_values)
+            ]
+            results.append(
+                ClassificationResult(
+                    top_prediction=alternatives[0],
+                    alternatives=alternatives,
+                    low_confidence=threshold is not None
+                    and alternatives[0].confidence < threshold,
+                )
+            )
+        return results
+
+    def _apply_tta(
+        self, probs: torch.Tensor, batch: torch.Tensor, threshold: float
+    ) -> torch.Tensor:
+        """Average in the extra TTA views for rows with top-1 below threshold."""
+        rows = (probs.max(dim=1).values < threshold).nonzero().flatten()
+        if rows.numel() == 0:
+            return probs
+        with self.stage_timer("tta"):
+            n_views = len(_TTA_EXTRA_VIEWS)
+            with bf16_autocast(self._bf16):
+                logits = self._net(tta_views(batch[rows], _TTA_EXTRA_VIEWS))
+            extra = torch.softmax(logits.float() / self._temperature, dim=1)
+            extra = extra.view(rows.numel(), n_views, -1).sum(dim=1)
+            probs[rows] = (probs[rows] + extra) / (n_views + 1)
+        return probs
+
     @staticmethod
-    def _decode(image_bytes: bytes) -> torch.Tensor:
+    def _decode(
+        image_bytes: bytes, draft: bool = False, tta: bool = False
+    ) -> torch.Tensor:
         """Decode bytes → PIL RGB → normalised (1, 3, 224, 224) tensor.
 
         The PIL Image is not persisted; memory is released after transform.
+        Dimensions are checked from the header before any pixels are decoded
+        (see :func:`_limit_pixels`).
+
+        Args:
+            image_bytes: Encoded image.
+            draft: Decode JPEGs at the smallest DCT scale that still covers
+                the resize target, not only when they exceed the pixel limit.
+                Much cheaper for camera-sized photos; pixels differ slightly
+                from a full decode.
+            tta: Return the (1, 3, 256, 256) TTA input instead.
+
+        Raises:
+            ImageTooLargeError: If the image exceeds the pixel limit.
+            ValueError: If the bytes are not a decodable image.
         """
         try:
             with Image.open(io.BytesIO(image_bytes)) as img:
+                if draft and img.format == "JPEG":
+                    img.draft("RGB", _DRAFT_MIN_SIZE)
+                _limit_pixels(img, settings.max_image_pixels)
                 img = img.convert("RGB")
-                tensor = _INFERENCE_TRANSFORM(img)
+                transform = _TTA_TRANSFORM if tta else _INFERENCE_TRANSFORM
+                tensor = transform(img)
+        except ImageTooLargeError:
+            raise
         except (UnidentifiedImageError, Exception) as exc:
             raise ValueError(
                 f"Cannot decode image bytes: {exc}. Supported formats: JPEG, PNG, WEBP."
             ) from exc
 
-        return tensor.unsqueeze(0)  # add batch dimension: (1, 3, 224, 224)
+        return tensor.unsqueeze(0)  # add batch dimension: (1, 3, H, W)
+
+
+def _limit_pixels(img: Image.Image, max_pixels: int) -> None:
+    """Bound decode memory using only the header-declared size.
+
+    ``Image.open`` parses the header without decoding pixels. JPEGs over the
+    limit are switched to a reduced-scale decode (``Image.draft``); anything
+    still over the limit is rejected before decoding.
+
+    Raises:
+        ImageTooLargeError: If the image cannot be brought under ``max_pixels``.
+    """
+    width, height = img.size
+    if width * height <= max_pixels:
+        return
+    if img.format == "JPEG":
+        img.draft("RGB", _DRAFT_MIN_SIZE)
+        width, height = img.size
+        if width * height <= max_pixels:
+            return
+    raise ImageTooLargeError(
+        f"Image is {width}x{height} pixels; the limit is {max_pixels} pixels."
+    )
+
+
+# ---------------------------------------------------------------------------
+# CascadeClassifier
+# ---------------------------------------------------------------------------
+
+
+class CascadeClassifier:
+    """Serve easy images from a cheap model, escalating hard ones.
+
+    The first stage (e.g. a ``mobilenet_v3_small`` artifact) classifies every
+    image. Images whose first-stage top-1 confidence is at or above
+    ``threshold`` are answered from it; the rest run through the full
+    ``second`` model as one batch. Each image is decoded once. Routing counts
+    are exported as ``recbuddy_cascade_routed_total{stage}``.
+    ``recbuddy.evaluate --cascade-artifact`` reports the accuracy/latency
+    trade-off per threshold.
+
+    Same interface and thread-safety as :class:`ClassificationModel`,
+    including ``stage_timer``: every stage, ``cascade_first`` among them,
+    is timed through it. It defaults to ``second.stage_timer``.
+    """
+
+    def __init__(
+        self,
+        first: ClassificationModel,
+        second: ClassificationModel,
+        threshold: float,
+        stage_timer: StageTimer | None = None,
+    ) -> None:
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"threshold must be in [0, 1], got {threshold}")
+        self._first = first
+        self._second = second
+        self._threshold = threshold
+        self.stage_timer = (
+            stage_timer if stage_timer is not None else second.stage_timer
+        )
+
+    @classmethod
+    def from_artifact(
+        cls,
+        first_stage_path: str,
+        second: ClassificationModel,
+        threshold: float | None = None,
+        stage_timer: StageTimer | None = None,
+    ) -> "CascadeClassifier":
+        """Load the first stage from a safetensors file in front of ``second``.
+
+        The first stage uses the untempered softmax, matching the evaluation
+        report, and never applies test-time augmentation.
+
+        Args:
+            first_stage_path: Path to the first-stage artifact.
+            second: The full model escalations go to.
+            threshold: First-stage confidence needed to answer. Defaults to
+                ``settings.cascade_threshold``.
+            stage_timer: See the class docstring.
+
+        Raises:
+            FileNotFoundError: If first_stage_path does not exist.
+            ValueError: If the artifact is not a 48-class classifier.
+        """
+        net = load_model(
+            first_stage_path,
+            num_classes=_NUM_CLASSES,
+            channels_last=settings.inference_channels_last,
+            compile=settings.inference_compile,
+        )
+        first = ClassificationModel(
+            net,
+            bf16=second._bf16,
+            top_k=second._top_k,
+            low_confidence_threshold=second._low_confidence_threshold,
+        )
+        if threshold is None:
+            threshold = settings.cascade_threshold
+        logger.info(
+            "Cascade first stage: %s (threshold=%.2f)", first_stage_path, threshold
+        )
+        return cls(first, second, threshold, stage_timer=stage_timer)
+
+    def predict(self, image_bytes: bytes) -> ClassificationResult:
+        """Classify raw image bytes; see :meth:`ClassificationModel.predict`."""
+        return self.predict_batch([image_bytes])[0]
+
+    def predict_batch(self, images: Sequence[bytes]) -> list[ClassificationResult]:
+        """Classify several images, escalating only the uncertain ones.
+
+        Raises:
+            ValueError: If any image cannot be decoded.
+        """
+        with self.stage_timer("decode"):
+            # The second stage's decoder: its TTA input (if enabled) is a
+            # superset the first stage centre-crops in _forward.
+            batch = self._second._decode_batch(images)
+        with torch.inference_mode():
+            with self.stage_timer("cascade_first"):
+                logits = self._first._forward(batch)
+                results = self._first._postprocess(logits, batch)
+            escalate = [
+                i
+                for i, result in enumerate(results)
+                if result.top_prediction.confidence < self._threshold
+            ]
+            CASCADE_ROUTED_TOTAL.inc(len(results) - len(escalate), stage="first")
+            if escalate:
+                CASCADE_ROUTED_TOTAL.inc(len(escalate), stage="second")
+                hard = batch[escalate]
+                with self.stage_timer("forward"):
+                    logits = self._second._forward(hard)
+                with self.stage_timer("postprocess"):
+                    for i, result in zip(
+                        escalate, self._second._postprocess(logits, hard)
+                    ):
+                        results[i] = result
+        return results
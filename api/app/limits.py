@@ -0,0 +1,106 @@
+"""Request body size enforcement for upload endpoints.
+
+BodySizeLimitMiddleware rejects oversize bodies with 413 *before* they are
+buffered: a declared ``Content-Length`` over the limit is refused without
+reading the body, and chunked or under-declared bodies are cut off as soon as
+the running total crosses the limit. Multipart parsing and the route handler
+therefore never hold more than ``max_bytes`` of an upload.
+"""
+
+import json
+from typing import Any, Awaitable, Callable
+
+Scope = dict[str, Any]
+Message = dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class _BodyTooLarge(Exception):
+    """Raised from ``receive`` to abort reading an oversize body."""
+
+
+class BodySizeLimitMiddleware:
+    """Pure ASGI middleware capping request body size on selected paths.
+
+    Args:
+        app: The wrapped ASGI application.
+        max_bytes: Largest accepted body, in bytes.
+        paths: Exact request paths the limit applies to.
+    """
+
+    def __init__(
+        self, app: ASGIApp, max_bytes: int, paths: tuple[str, ...] = ("/predict",)
+    ) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        declared = _content_length(scope)
+        if declared is not None and declared > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                # Drop whatever error response the app built from the abort.
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _BodyTooLarge:
+            pass
+        if exceeded and not response_started:
+            await self._reject(send)
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps(
+            {"detail": f"Request body exceeds {self.max_bytes} bytes"}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _content_length(scope: Scope) -> int | None:
+    """Return the declared Content-Length, or None if absent or malformed."""
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
@@ -1,38 +1,94 @@
 """
 FastAPI application for Recycling Buddy
+
+Heavy dependencies are imported lazily so that importing this module (every
+worker start, test run and health probe) stays cheap:
+  - torch / torchvision / PIL (``app.inference``) on the first /predict
+  - openai / tavily (``app.guidelines``) on the first /advice
+  - the boto3 client on the first S3 call (see ``S3Service.client``)
+Set ``WARMUP_ON_STARTUP=true`` to load the model and the guidelines service
+in a background task as soon as the app starts instead.
 """
 
 import asyncio
 import base64
 import json
 import logging
+import threading
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import AsyncGenerator
+from typing import TYPE_CHECKING, Any, AsyncGenerator
 
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi import FastAPI, File, HTTPException, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, field_validator
 from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.guidelines import AdviceRecord, GuidelinesService
-from app.inference import ClassificationModel
+from app.limits import BodySizeLimitMiddleware
+from app.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    MODEL_LOAD_SECONDS,
+    PREDICT_RESPONSES_TOTAL,
+    PREDICT_STAGE_SECONDS,
+    REGISTRY,
+)
 from recbuddy.labels import ALL_LABELS, ALL_LABELS_LIST
 from app.services.s3 import S3Service
 
+if TYPE_CHECKING:
+    from app.artifacts import ArtifactRef
+    from app.events import EventSink
+    from app.guidelines import AdviceRecord, GuidelinesService
+    from app.inference import (
+        CascadeClassifier,
+        ClassificationModel,
+        ClassificationResult,
+    )
+    from app.shadow import ShadowRunner
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def __getattr__(name: str) -> Any:
+    """Resolve ``ClassificationModel`` on first access (PEP 562).
+
+    Keeps ``app.main.ClassificationModel`` addressable (e.g. for patching)
+    without importing torch when this module is imported.
+    """
+    if name == "ClassificationModel":
+        from app.inference import ClassificationModel
+
+        return ClassificationModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Initialise app state; model is loaded lazily on first /predict request."""
+    """Initialise app state; model and guidelines load lazily or via warm-up."""
     app.state.model = None
     app.state.model_lock = asyncio.Lock()
-    app.state.guidelines_service = GuidelinesService()
+    app.state.guidelines_service = None
+    app.state.shadow = None
+    app.state.events = None
+    _event_sink(app)  # fail at startup on a bad PREDICTION_EVENTS_URI
+    warmup = asyncio.create_task(_warm_up(app)) if settings.warmup_on_startup else None
+    refresh = (
+        asyncio.create_task(_watch_channel(app))
+        if settings.model_channel and settings.model_channel_refresh_seconds > 0
+        else None
+    )
     yield
+    for task in (warmup, refresh):
+        if task is not None:
+            task.cancel()
+    if app.state.shadow is not None:
+        app.state.shadow.close()
+    if app.state.events is not None:
+        app.state.events.close()
 
 
 # Initialize FastAPI app
@@ -43,6 +99,14 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Reject oversize uploads before they are buffered. Added before CORS so the
+# 413 still carries CORS headers.
+app.add_middleware(
+    BodySizeLimitMiddleware,  # ty: ignore[invalid-argument-type]
+    max_bytes=settings.max_upload_bytes,
+    paths=("/predict", "/upload"),
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,  # ty: ignore[invalid-argument-type]
@@ -62,15 +126,17 @@ s3_service = S3Service(
 )
 
 
-def _resolve_artifact_path(path: str) -> str:
+def _resolve_artifact_path(
+    path: str, local_path: str = "/tmp/model.safetensors"
+) -> str:
     """Return a local path to the model artifact.
 
-    If *path* is an ``s3://`` URI, downloads the artifact to
-    ``/tmp/model.safetensors`` and returns that path.  Otherwise returns
-    *path* unchanged.
+    If *path* is an ``s3://`` URI, downloads the artifact to *local_path*
+    and returns that path.  Otherwise returns *path* unchanged.
 
     Args:
-        path: ``MODEL_ARTIFACT_PATH`` setting value.
+        path: ``MODEL_ARTIFACT_PATH`` (or ``CASCADE_ARTIFACT_PATH``) value.
+        local_path: Download destination for ``s3://`` URIs.
 
     Returns:
         Absolute local filesystem path to the artifact.
@@ -81,11 +147,236 @@ def _resolve_artifact_path(path: str) -> str:
     _bucket, sep, key = without_scheme.partition("/")
     if not sep or not key:
         raise ValueError(f"Invalid S3 URI — missing object key: {path!r}")
-    local_path = "/tmp/model.safetensors"
     s3_service.download_artifact(key, local_path, bucket=_bucket)
     return local_path
 
 
+def _channel_ref() -> "ArtifactRef":
+    """Read the ``MODEL_CHANNEL`` pointer from the registry bucket."""
+    from app.artifacts import resolve_channel
+
+    assert settings.model_channel is not None
+    return resolve_channel(
+        s3_service,
+        settings.model_channel,
+        bucket=settings.model_registry_bucket or settings.s3_bucket,
+    )
+
+
+def _fetch_artifact(ref: "ArtifactRef") -> str:
+    """Return a local path to ``ref`` from the hash-addressed cache."""
+    from app.artifacts import fetch
+
+    return fetch(
+        s3_service, ref, settings.model_cache_dir, keep=settings.model_cache_keep
+    )
+
+
+def _resolve_model() -> tuple[str, str]:
+    """Return ``(local artifact path, version)`` for the configured model.
+
+    With ``MODEL_CHANNEL`` set, the registry channel pointer is read and the
+    artifact is served from the hash-addressed cache (see
+    :mod:`app.artifacts`); otherwise ``MODEL_ARTIFACT_PATH`` is used as is.
+    """
+    if settings.model_channel:
+        ref = _channel_ref()
+        return _fetch_artifact(ref), ref.version
+    return (
+        _resolve_artifact_path(settings.model_artifact_path),
+        _extract_model_version(settings.model_artifact_path),
+    )
+
+
+async def _ensure_model(
+    app: FastAPI,
+) -> "ClassificationModel | CascadeClassifier":
+    """Load the model into ``app.state.model`` once; return it.
+
+    With ``CASCADE_ARTIFACT_PATH`` set, the model is wrapped in a
+    :class:`~app.inference.CascadeClassifier` with that artifact as the
+    first stage.
+
+    Raises:
+        HTTPException: 503 if the artifact cannot be resolved or loaded.
+    """
+    if app.state.model is None:
+        async with app.state.model_lock:
+            if app.state.model is None:
+                start = time.perf_counter()
+                try:
+                    from app.inference import ClassificationModel
+
+                    artifact_path, version = await run_in_threadpool(_resolve_model)
+                    model = await run_in_threadpool(
+                        ClassificationModel.from_artifact,
+                        artifact_path,
+                    )
+                    if settings.cascade_artifact_path:
+                        model = await run_in_threadpool(
+                            _load_cascade, settings.cascade_artifact_path, model
+                        )
+                    app.state.model = model
+                    app.state.model_version = version
+                    MODEL_LOAD_SECONDS.observe(time.perf_counter() - start)
+                    logger.info("Model loaded (version: %s)", version)
+                    if settings.shadow_artifact_path:
+                        # Loaded after the primary is published, so the first
+                        # /predict never waits for the candidate.
+                        threading.Thread(
+                            target=_start_shadow,
+                            args=(app, settings.shadow_artifact_path),
+                            name="shadow-load",
+                            daemon=True,
+                        ).start()
+                except Exception:
+                    logger.exception("Model failed to load")
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Model artifact not available. Run the training pipeline first.",
+                    )
+    return app.state.model
+
+
+async def _reload_if_moved(app: FastAPI) -> bool:
+    """Load and publish the channel's model if the pointer names a new version.
+
+    The replacement is built off the event loop while the current model
+    keeps serving, then swapped in with its version in one step.
+
+    Returns:
+        True if a new version was loaded.
+    """
+    ref = await run_in_threadpool(_channel_ref)
+    if ref.version == app.state.model_version:
+        return False
+    from app.inference import ClassificationModel
+
+    start = time.perf_counter()
+    artifact_path = await run_in_threadpool(_fetch_artifact, ref)
+    model = await run_in_threadpool(ClassificationModel.from_artifact, artifact_path)
+    if settings.cascade_artifact_path:
+        model = await run_in_threadpool(
+            _load_cascade, settings.cascade_artifact_path, model
+        )
+    previous = app.state.model_version
+    app.state.model, app.state.model_version = model, ref.version
+    MODEL_LOAD_SECONDS.observe(time.perf_counter() - start)
+    logger.info(
+        "Model channel %s moved: %s -> %s",
+        settings.model_channel,
+        previous,
+        ref.version,
+    )
+    return True
+
+
+async def _watch_channel(app: FastAPI) -> None:
+    """Re-read ``MODEL_CHANNEL`` every ``MODEL_CHANNEL_REFRESH_SECONDS``.
+
+    Rollouts and rollbacks reach running workers without a restart. Until
+    the first request (or warm-up) loads a model there is nothing to
+    replace, and a failed refresh keeps the current model.
+    """
+    while True:
+        await asyncio.sleep(settings.model_channel_refresh_seconds)
+        if app.state.model is None:
+            continue
+        try:
+            await _reload_if_moved(app)
+        except Exception:
+            logger.exception(
+                "Model channel refresh failed; still serving %s",
+                app.state.model_version,
+            )
+
+
+def _load_cascade(
+    first_stage_path: str, second: "ClassificationModel"
+) -> "CascadeClassifier":
+    """Resolve and load the cascade's first stage in front of ``second``."""
+    from app.inference import CascadeClassifier
+
+    local_path = _resolve_artifact_path(
+        first_stage_path, local_path="/tmp/first_stage.safetensors"
+    )
+    return CascadeClassifier.from_artifact(local_path, second)
+
+
+def _load_shadow(path: str) -> "ShadowRunner | None":
+    """Load the shadow candidate; a failure disables shadowing, not /predict."""
+    try:
+        from app.inference import ClassificationModel, untimed
+        from app.shadow import ShadowRunner
+
+        local_path = _resolve_artifact_path(path, local_path="/tmp/shadow.safetensors")
+        runner = ShadowRunner(
+            ClassificationModel.from_artifact(local_path, stage_timer=untimed),
+            sample_rate=settings.shadow_sample_rate,
+            queue_size=settings.shadow_queue_size,
+            queue_bytes=settings.shadow_queue_bytes,
+            max_in_flight=settings.shadow_max_in_flight,
+            version=_extract_model_version(path),
+        )
+    except Exception:
+        logger.exception("Shadow model failed to load; shadowing disabled")
+        return None
+    logger.info(
+        "Shadowing %.0f%% of /predict traffic with %s",
+        settings.shadow_sample_rate * 100,
+        runner.version,
+    )
+    return runner
+
+
+def _start_shadow(app: FastAPI, path: str) -> None:
+    """Thread target: load the shadow candidate and publish it on ``app.state``."""
+    app.state.shadow = _load_shadow(path)
+
+
+def _guidelines_service(app: FastAPI) -> "GuidelinesService":
+    """Return ``app.state.guidelines_service``, creating it on first use."""
+    service = getattr(app.state, "guidelines_service", None)
+    if service is None:
+        from app.guidelines import GuidelinesService
+
+        service = app.state.guidelines_service = GuidelinesService()
+    return service
+
+
+def _event_sink(app: FastAPI) -> "EventSink":
+    """Return ``app.state.events``, creating it on first use.
+
+    Raises:
+        ValueError: If ``PREDICTION_EVENTS_URI`` is an invalid ``s3://`` URI.
+    """
+    sink = getattr(app.state, "events", None)
+    if sink is None:
+        from app.events import EventSink, destination_from_uri
+
+        destination = destination_from_uri(
+            settings.prediction_events_uri, lambda: s3_service.client
+        )
+        sink = app.state.events = EventSink(
+            destination,
+            batch_size=settings.prediction_events_batch_size,
+            flush_interval_seconds=settings.prediction_events_flush_seconds,
+            max_buffered=settings.prediction_events_max_buffered,
+        )
+    return sink
+
+
+async def _warm_up(app: FastAPI) -> None:
+    """Load the model and guidelines service in the background at startup."""
+    try:
+        await run_in_threadpool(_guidelines_service, app)
+        await _ensure_model(app)
+        logger.info("Warm-up complete")
+    except HTTPException:
+        # Already logged; /predict retries the load and returns 503.
+        pass
+
+
 def _extract_model_version(path: str) -> str:
     """Extract model version from artifact path.
 
@@ -109,11 +400,16 @@ class HealthResponse(BaseModel):
 
 
 class PredictionResponse(BaseModel):
-    """Prediction response."""
+    """Prediction response.
+
+    Documents the /predict schema; the route itself serialises through
+    :func:`_prediction_json`, which must produce the same fields.
+    """
 
     label: str
     confidence: float
     categories: list[dict[str, float]]
+    low_confidence: bool = False
 
 
 class LabelItem(BaseModel):
@@ -179,8 +475,12 @@ async def health_check():
     return HealthResponse(status="healthy", version="0.1.0")
 
 
+# /predict requests in progress; only touched on the event loop thread.
+_predict_in_flight = 0
+
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(request: Request, file: UploadFile = File(...)) -> PredictionResponse:
+async def predict(request: Request, file: UploadFile = File(...)) -> Response:
     """Classify an uploaded waste item image.
 
     Args:
@@ -190,59 +490,103 @@ async def predict(request: Request, file: UploadFile = File(...)) -> PredictionR
     Returns:
         PredictionResponse with top label, confidence, and top-3 categories.
     """
-    if request.app.state.model is None:
-        async with request.app.state.model_lock:
-            if request.app.state.model is None:
-                try:
-                    artifact_path = await run_in_threadpool(
-                        _resolve_artifact_path,
-                        settings.model_artifact_path,
-                    )
-                    request.app.state.model = await run_in_threadpool(
-                        ClassificationModel.from_artifact,
-                        artifact_path,
-                    )
-                    logger.info(
-                        "Model loaded (version: %s)",
-                        _extract_model_version(settings.model_artifact_path),
-                    )
-                except Exception:
-                    logger.exception("Model failed to load")
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Model artifact not available. Run the training pipeline first.",
-                    )
+    global _predict_in_flight
+    _predict_in_flight += 1
+    try:
+        response = await _predict(request.app, file)
+    except HTTPException as exc:
+        PREDICT_RESPONSES_TOTAL.inc(status=str(exc.status_code))
+        raise
+    finally:
+        _predict_in_flight -= 1
+    PREDICT_RESPONSES_TOTAL.inc(status="200")
+    return response
+
+
+def _run_predict(
+    model: "ClassificationModel | CascadeClassifier",
+    image_bytes: bytes,
+    submitted: float,
+) -> tuple["ClassificationResult", float]:
+    """Threadpool entry point; records how long the call waited for a worker.
+
+    Returns:
+        The result and the seconds ``predict`` took.
+    """
+    PREDICT_STAGE_SECONDS.observe(time.perf_counter() - submitted, stage="queue_wait")
+    start = time.perf_counter()
+    result = model.predict(image_bytes)
+    return result, time.perf_counter() - start
+
+
+async def _predict(app: FastAPI, file: UploadFile) -> Response:
+    """Body of POST /predict, separated so every exit is counted."""
+    model = await _ensure_model(app)
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    image_bytes = await file.read()
+    with PREDICT_STAGE_SECONDS.time(stage="read_body"):
+        image_bytes = await file.read()
 
     try:
-        result = await run_in_threadpool(request.app.state.model.predict, image_bytes)
+        result, predict_seconds = await run_in_threadpool(
+            _run_predict, model, image_bytes, time.perf_counter()
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         logger.error("Prediction error: %s", exc)
         raise HTTPException(status_code=500, detail="Inference failed")
 
-    # FR-013: emit structured prediction log (no image data)
-    logger.info(
-        json.dumps(
-            {
-                "event": "prediction",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-                "predicted_label": result.top_prediction.label,
-                "confidence": result.top_prediction.confidence,
-            }
+    shadow = getattr(app.state, "shadow", None)
+    if shadow is not None:
+        shadow.submit(
+            image_bytes, result, predict_seconds, in_flight=_predict_in_flight
         )
-    )
 
-    return PredictionResponse(
-        label=result.top_prediction.label,
-        confidence=result.top_prediction.confidence,
-        categories=[{pred.label: pred.confidence} for pred in result.alternatives],
+    # FR-013: record the prediction (no image data); written in batches by
+    # the sink's flush thread, see app.events
+    _event_sink(app).emit(
+        {
+            "event": "prediction",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model_version": getattr(app.state, "model_version", None),
+            "predicted_label": result.top_prediction.label,
+            "confidence": result.top_prediction.confidence,
+            "low_confidence": result.low_confidence,
+            "latency_ms": round(predict_seconds * 1000, 3),
+        }
     )
 
+    with PREDICT_STAGE_SECONDS.time(stage="serialise"):
+        body = _prediction_json(result)
+    return Response(content=body, media_type="application/json")
+
+
+def _prediction_json(result: "ClassificationResult") -> bytes:
+    """Encode a ClassificationResult as the PredictionResponse JSON body.
+
+    Built straight from the dataclass with ``json.dumps``; the values are
+    already plain str/float/bool, so pydantic validation would only repeat
+    work on the hot path.
+    """
+    return json.dumps(
+        {
+            "label": result.top_prediction.label,
+            "confidence": result.top_prediction.confidence,
+            "categories": [
+                {pred.label: pred.confidence} for pred in result.alternatives
+            ],
+            "low_confidence": result.low_confidence,
+        }
+    ).encode()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text-format metrics (see ``app.metrics``)."""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 
 def _display_name(label: str) -> str:
     """Convert a label like 'aluminum-can' to 'Aluminum Can'."""
@@ -275,7 +619,7 @@ async def get_advice(
     Returns:
         AdviceResponse with bin decision and instructions.
     """
-    service: GuidelinesService = request.app.state.guidelines_service
+    service: GuidelinesService = _guidelines_service(request.app)
     record: AdviceRecord = await service.lookup(item_category, council_slug)
     return AdviceResponse(
         council_slug=record.council_slug,
@@ -0,0 +1,258 @@
+"""In-process metrics exposed in the Prometheus text format at GET /metrics.
+
+A deliberately small subset of the Prometheus data model — counters and
+histograms with string labels — so instrumenting the hot path costs a dict
+lookup, a lock and a few additions, with no extra dependency:
+
+    from app.metrics import PREDICT_STAGE_SECONDS
+
+    with PREDICT_STAGE_SECONDS.time(stage="decode"):
+        tensor = decode(image_bytes)
+
+All metrics live in the module-level ``REGISTRY``; define new ones with
+``REGISTRY.counter(...)`` / ``REGISTRY.histogram(...)`` next to the others
+at the bottom of this module so the full list stays in one place.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond stages up to multi-second model loads.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Shared label handling for counters and histograms."""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the series identified by ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of one series (0 if never incremented)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per series: [bucket counts..., +Inf count], sum
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations in one series."""
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------------------------------------------------------------------------
+# Metric definitions
+# ---------------------------------------------------------------------------
+
+PREDICT_STAGE_SECONDS = REGISTRY.histogram(
+    "recbuddy_predict_stage_seconds",
+    "Time spent in each /predict stage (read_body, queue_wait, decode, "
+    "cascade_first, forward, postprocess, tta, serialise).",
+    ("stage",),
+)
+PREDICT_RESPONSES_TOTAL = REGISTRY.counter(
+    "recbuddy_predict_responses_total",
+    "/predict responses by HTTP status code.",
+    ("status",),
+)
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "recbuddy_model_load_seconds",
+    "Time to resolve and load the model artifact.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+CASCADE_ROUTED_TOTAL = REGISTRY.counter(
+    "recbuddy_cascade_routed_total",
+    "Cascade predictions by the stage that answered them (first, second).",
+    ("stage",),
+)
+SHADOW_PREDICTIONS_TOTAL = REGISTRY.counter(
+    "recbuddy_shadow_predictions_total",
+    "Shadow-model samples by outcome (agree, disagree, error, dropped, shed).",
+    ("outcome",),
+)
+SHADOW_LATENCY_SECONDS = REGISTRY.histogram(
+    "recbuddy_shadow_latency_seconds",
+    "predict() latency of the primary and candidate models on shadowed images.",
+    ("model",),
+)
+PREDICTION_EVENTS_TOTAL = REGISTRY.counter(
+    "recbuddy_prediction_events_total",
+    "Prediction events by result (written, dropped, failed); see app.events.",
+    ("result",),
+)
+ARTIFACT_CACHE_TOTAL = REGISTRY.counter(
+    "recbuddy_artifact_cache_total",
+    "Model artifact cache lookups by result (hit, miss).",
+    ("result",),
+)
+GUIDELINES_CACHE_TOTAL = REGISTRY.counter(
+    "recbuddy_guidelines_cache_total",
+    "Guidelines cache lookups by tier (advice, search) and result (hit, miss).",
+    ("tier", "result"),
+)
+GUIDELINES_FALLBACK_TOTAL = REGISTRY.counter(
+    "recbuddy_guidelines_fallback_total",
+    "Guidelines lookups answered with the general-waste fallback.",
+)
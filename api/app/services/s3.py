@@ -1,11 +1,14 @@
 """S3 service for uploading training images."""
 
+import json
 import logging
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 import boto3
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
@@ -31,13 +34,25 @@ class S3Service:
             region_name: AWS region name
         """
         self.bucket = bucket
-        self.client = boto3.client(
-            "s3",
-            endpoint_url=endpoint_url,
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
-        )
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,
+            "aws_access_key_id": aws_access_key_id,
+            "aws_secret_access_key": aws_secret_access_key,
+            "region_name": region_name,
+        }
+        self._client: Any = None
+
+    @property
+    def client(self) -> Any:
+        """boto3 S3 client, created on first use.
+
+        Creating a client loads botocore's service model (tens of MB and a
+        noticeable fraction of a second), so it is deferred until the first
+        upload or download instead of happening at app import.
+        """
+        if self._client is None:
+            self._client = boto3.client("s3", **self._client_kwargs)
+        return self._client
 
     def upload_training_image(
         self,
@@ -90,6 +105,24 @@ class S3Service:
         self.client.download_file(effective_bucket, s3_key, local_path)
         logger.info("Download complete: %s", local_path)
 
+    def get_json(self, s3_key: str, bucket: str | None = None) -> Any:
+        """Fetch and parse a small JSON object (e.g. a registry pointer).
+
+        Args:
+            s3_key: S3 object key to read.
+            bucket: S3 bucket name. Defaults to ``self.bucket``.
+
+        Returns:
+            The parsed JSON, or ``None`` if the object does not exist.
+        """
+        try:
+            response = self.client.get_object(Bucket=bucket or self.bucket, Key=s3_key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(response["Body"].read())
+
     def _detect_extension(self, data: bytes) -> str:
         """Detect image format from magic bytes.
 
@@ -0,0 +1,201 @@
+"""Shadow inference: run a candidate model on sampled live traffic.
+
+With ``SHADOW_ARTIFACT_PATH`` set, a sampled fraction (``SHADOW_SAMPLE_RATE``)
+of successful ``/predict`` requests is handed to :class:`ShadowRunner` after
+the primary result is computed. The request only pays for a
+``queue.put_nowait``. A single background thread runs the candidate with one
+intra-op thread and compares its top-1 label with the primary's.
+
+Shadow work never competes with a busy primary or grows without bound:
+samples are shed while more than ``SHADOW_MAX_IN_FLIGHT`` ``/predict``
+requests are running, and dropped when the queue already holds
+``SHADOW_QUEUE_SIZE`` samples or ``SHADOW_QUEUE_BYTES`` of image data.
+
+Results are exported on ``/metrics``:
+  - ``recbuddy_shadow_predictions_total{outcome}``: agree, disagree, error,
+    dropped, shed;
+  - ``recbuddy_shadow_latency_seconds{model}``: primary and candidate
+    ``predict`` latency for the same images.
+
+:meth:`ShadowRunner.summary` gives the running agreement rate and mean
+latency delta for logs and tests. The candidate should be built with
+``stage_timer=untimed`` so its stages stay out of the /predict stage metrics.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import torch
+
+from app.metrics import SHADOW_LATENCY_SECONDS, SHADOW_PREDICTIONS_TOTAL
+
+if TYPE_CHECKING:
+    from app.inference import (
+        CascadeClassifier,
+        ClassificationModel,
+        ClassificationResult,
+    )
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Sample:
+    image_bytes: bytes
+    primary_label: str
+    primary_seconds: float
+
+
+_STOP = object()
+
+
+class ShadowRunner:
+    """Runs a candidate model beside the primary, off the request path.
+
+    Args:
+        candidate: Model under evaluation.
+        sample_rate: Fraction of requests mirrored to the candidate.
+        queue_size: Samples waiting for the candidate; more are dropped.
+        queue_bytes: Image bytes waiting for the candidate; more are dropped.
+        max_in_flight: Requests in progress above which samples are shed.
+        version: Candidate version, for logs.
+    """
+
+    def __init__(
+        self,
+        candidate: "ClassificationModel | CascadeClassifier",
+        sample_rate: float = 0.1,
+        queue_size: int = 16,
+        queue_bytes: int = 32 * 1024 * 1024,
+        max_in_flight: int = 4,
+        version: str = "unknown",
+    ) -> None:
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.queue_bytes = queue_bytes
+        self.max_in_flight = max_in_flight
+        self.version = version
+        self._queue: queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {
+            "agree": 0,
+            "disagree": 0,
+            "error": 0,
+            "dropped": 0,
+            "shed": 0,
+        }
+        self._latency_delta_sum = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name="shadow-inference", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        image_bytes: bytes,
+        primary: "ClassificationResult",
+        seconds: float,
+        in_flight: int = 0,
+    ) -> bool:
+        """Maybe mirror a request to the candidate; never blocks.
+
+        Args:
+            image_bytes: The request's image.
+            primary: The primary model's result for it.
+            seconds: The primary's ``predict`` latency.
+            in_flight: ``/predict`` requests currently in progress.
+
+        Returns:
+            True if the sample was queued.
+        """
+        if random.random() >= self.sample_rate:
+            return False
+        if in_flight > self.max_in_flight:
+            self._record("shed")
+            return False
+        size = len(image_bytes)
+        with self._lock:
+            fits = self._queued_bytes + size <= self.queue_bytes
+            if fits:
+                self._queued_bytes += size
+        if not fits:
+            self._record("dropped")
+            return False
+        sample = _Sample(image_bytes, primary.top_prediction.label, seconds)
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self._release(size)
+            self._record("dropped")
+            return False
+        return True
+
+    def summary(self) -> dict:
+        """Return counts, agreement rate and mean candidate-minus-primary latency."""
+        with self._lock:
+            counts = dict(self._counts)
+            delta_sum = self._latency_delta_sum
+        compared = counts["agree"] + counts["disagree"]
+        return {
+            "version": self.version,
+            **counts,
+            "agreement": counts["agree"] / compared if compared else None,
+            "mean_latency_delta_ms": (
+                round(delta_sum / compared * 1000, 3) if compared else None
+            ),
+        }
+
+    def join(self) -> None:
+        """Block until every queued sample has been processed."""
+        self._queue.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the worker after the samples already queued."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _release(self, size: int) -> None:
+        with self._lock:
+            self._queued_bytes -= size
+
+    def _record(self, outcome: str, delta: float = 0.0) -> None:
+        SHADOW_PREDICTIONS_TOTAL.inc(outcome=outcome)
+        with self._lock:
+            self._counts[outcome] += 1
+            self._latency_delta_sum += delta
+
+    def _run(self) -> None:
+        # With the OpenMP backend the intra-op thread count is per calling
+        # thread, so this keeps the candidate off the request threads' cores.
+        torch.set_num_threads(1)
+        while True:
+            sample = self._queue.get()
+            try:
+                if sample is _STOP:
+                    return
+                self._compare(sample)
+                self._release(len(sample.image_bytes))
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, sample: _Sample) -> None:
+        start = time.perf_counter()
+        try:
+            result = self.candidate.predict(sample.image_bytes)
+        except Exception:
+            logger.exception("Shadow model %s failed", self.version)
+            self._record("error")
+            return
+        seconds = time.perf_counter() - start
+        SHADOW_LATENCY_SECONDS.observe(sample.primary_seconds, model="primary")
+        SHADOW_LATENCY_SECONDS.observe(seconds, model="candidate")
+        agree = result.top_prediction.label == sample.primary_label
+        self._record(
+            "agree" if agree else "disagree", delta=seconds - sample.primary_seconds
+        )
@@ -0,0 +1 @@
+"""Load-testing and latency benchmarks for the API (not shipped in the image)."""
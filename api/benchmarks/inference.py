@@ -0,0 +1,262 @@
+"""Inference micro-benchmark for ClassificationModel.
+
+Measures the in-process classifier on its own — no HTTP, no event loop — to
+size Fargate tasks (``cpu``/``memory`` in ``infra/`` and
+``task-definition.json``) and to choose ``INFERENCE_NUM_THREADS``,
+``INFERENCE_JPEG_DRAFT`` and ``INFERENCE_BF16``. For every combination of
+batch size × thread count × decode mode it times the decode, forward and
+postprocess stages separately and reports images/sec.
+
+The corpus is either a directory of real images or synthetic JPEGs at
+phone-camera resolutions; decode cost depends mostly on the encoded
+resolution, so the synthetic default is representative.
+
+Stage timings come from :attr:`ClassificationModel.stage_timer`, so the
+stages measured are exactly the ones ``/predict`` runs.
+
+Usage (from ``api/``)::
+
+    uv run python -m benchmarks.inference --artifact model/artifacts/model.safetensors
+    uv run python -m benchmarks.inference --artifact model.safetensors \\
+        --images ~/photos --batch-sizes 1,4 --threads 1,2 --output sweep.json
+"""
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import torch
+from PIL import Image
+
+from app.inference import ClassificationModel
+from recbuddy.profiling import latency_ms, peak_rss_mb
+
+logger = logging.getLogger(__name__)
+
+DECODE_MODES: tuple[str, ...] = ("full", "draft")
+
+# Typical upload sizes: downscaled web image, 12 MP phone photo (4:3).
+DEFAULT_RESOLUTIONS: tuple[tuple[int, int], ...] = ((1280, 960), (4032, 3024))
+
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+
+def synthetic_jpeg(size: tuple[int, int], seed: int = 0) -> bytes:
+    """Return a deterministic photo-sized JPEG.
+
+    Upscaled low-resolution noise compresses like a real photo, so decode
+    cost is representative without shipping sample images.
+    """
+    rng = random.Random(seed)
+    small = Image.frombytes(
+        "RGB", (32, 24), bytes(rng.randrange(256) for _ in range(32 * 24 * 3))
+    )
+    buf = io.BytesIO()
+    small.resize(size, Image.Resampling.BILINEAR).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def build_corpus(
+    images_dir: Path | None,
+    resolutions: tuple[tuple[int, int], ...] = DEFAULT_RESOLUTIONS,
+    size: int = 16,
+) -> list[bytes]:
+    """Return ``size`` encoded images, read from ``images_dir`` or synthesised.
+
+    Synthetic images cycle through ``resolutions``.
+
+    Raises:
+        ValueError: If ``images_dir`` contains no supported images.
+    """
+    if images_dir is not None:
+        paths = sorted(
+            p for p in images_dir.rglob("*") if p.suffix.lower() in _IMAGE_SUFFIXES
+        )
+        if not paths:
+            raise ValueError(f"No images found in {images_dir}")
+        return [p.read_bytes() for p in paths[:size]]
+    return [
+        synthetic_jpeg(resolutions[i % len(resolutions)], seed=i) for i in range(size)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+
+def benchmark_config(
+    model: ClassificationModel,
+    corpus: list[bytes],
+    batch_size: int,
+    iterations: int,
+    warmup: int = 2,
+) -> dict[str, Any]:
+    """Time ``iterations`` batches of ``batch_size`` images drawn from ``corpus``.
+
+    Returns per-stage latency per batch and end-to-end images/sec.
+    """
+    batches = itertools.cycle(
+        [corpus[i : i + batch_size] for i in range(0, len(corpus), batch_size)]
+    )
+    stages: dict[str, list[float]] = {"decode": [], "forward": [], "postprocess": []}
+    recording = False
+
+    @contextmanager
+    def record(stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        if recording:
+            stages.setdefault(stage, []).append(time.perf_counter() - start)
+
+    total = 0.0
+    images = 0
+    default_timer = model.stage_timer
+    model.stage_timer = record
+    try:
+        for step in range(warmup + iterations):
+            batch = next(batches)
+            recording = step >= warmup
+            start = time.perf_counter()
+            model.predict_batch(batch)
+            if recording:
+                total += time.perf_counter() - start
+                images += len(batch)
+    finally:
+        model.stage_timer = default_timer
+    return {
+        "stages": {name: latency_ms(samples) for name, samples in stages.items()},
+        "batch_ms": round(total / iterations * 1000, 3),
+        "images_per_sec": round(images / total, 2),
+    }
+
+
+def sweep(
+    model: ClassificationModel,
+    corpus: list[bytes],
+    batch_sizes: list[int],
+    threads: list[int],
+    decode_modes: list[str],
+    iterations: int,
+) -> list[dict[str, Any]]:
+    """Run :func:`benchmark_config` over every configuration."""
+    results = []
+    for num_threads, mode, batch_size in itertools.product(
+        threads, decode_modes, batch_sizes
+    ):
+        torch.set_num_threads(num_threads)
+        model.jpeg_draft = mode == "draft"
+        result = {
+            "threads": num_threads,
+            "decode": mode,
+            "batch_size": batch_size,
+            **benchmark_config(model, corpus, batch_size, iterations),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        logger.info(
+            "threads=%d decode=%s batch=%d: %.1f img/s (forward p50 %.1f ms)",
+            num_threads,
+            mode,
+            batch_size,
+            result["images_per_sec"],
+            result["stages"]["forward"]["p50_ms"],
+        )
+        results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _resolutions(value: str) -> tuple[tuple[int, int], ...]:
+    pairs = []
+    for item in value.split(","):
+        width, _, height = item.partition("x")
+        pairs.append((int(width), int(height)))
+    return tuple(pairs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ClassificationModel")
+    parser.add_argument("--artifact", required=True, help="Path to .safetensors")
+    parser.add_argument(
+        "--images", type=Path, default=None, help="Directory of real images"
+    )
+    parser.add_argument(
+        "--resolutions",
+        type=_resolutions,
+        default=DEFAULT_RESOLUTIONS,
+        help="Synthetic image sizes, e.g. 1280x960,4032x3024",
+    )
+    parser.add_argument("--corpus-size", type=int, default=16)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 4, 8])
+    parser.add_argument("--threads", type=_int_list, default=[1, 2, 4])
+    parser.add_argument(
+        "--decode-modes",
+        default=",".join(DECODE_MODES),
+        help="Comma-separated subset of: " + ", ".join(DECODE_MODES),
+    )
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--bf16", action="store_true", help="Run the forward pass under bf16"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON here")
+    args = parser.parse_args()
+
+    decode_modes = [m for m in args.decode_modes.split(",") if m]
+    unknown = set(decode_modes) - set(DECODE_MODES)
+    if unknown:
+        parser.error(f"unknown decode modes: {sorted(unknown)}")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    model = ClassificationModel.from_artifact(args.artifact, bf16=args.bf16)
+    corpus = build_corpus(args.images, args.resolutions, args.corpus_size)
+    report = {
+        "artifact": args.artifact,
+        "bf16": args.bf16,
+        "corpus": "synthetic" if args.images is None else str(args.images),
+        "corpus_size": len(corpus),
+        "environment": {
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": sweep(
+            model,
+            corpus,
+            args.batch_sizes,
+            args.threads,
+            decode_modes,
+            args.iterations,
+        ),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+        logger.info("Wrote %s", args.output)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
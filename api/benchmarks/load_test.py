@@ -0,0 +1,457 @@
+"""End-to-end load test and latency benchmark for the API.
+
+Starts the real FastAPI app under uvicorn with a small artifact, points its
+external dependencies at local stand-ins — a moto S3 server for /upload and
+the stubs in :mod:`benchmarks.stubs` for the search and LLM calls behind
+/advice — and drives each endpoint at a fixed concurrency. Per endpoint it
+reports throughput and p50/p95/p99 latency; for the server process it reports
+CPU time and resident memory. Results are written as JSON so runs can be
+compared, and ``--compare`` fails the run on a regression against a baseline.
+
+Usage (from ``api/``)::
+
+    uv run --with moto python -m benchmarks.load_test \\
+        --concurrency 8 --requests 200 --output results.json
+
+    uv run --with moto python -m benchmarks.load_test \\
+        --compare baseline.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from benchmarks.stubs import StubServer
+from recbuddy.profiling import percentile
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS: tuple[str, ...] = ("predict", "advice", "upload")
+
+_BUCKET = "recbuddy-load-test"
+_LABEL = "paper-cardboard"
+_AWS_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+}
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+
+def summarise(latencies_s: list[float], errors: int, wall_s: float) -> dict[str, Any]:
+    """Summarise one endpoint run; latencies cover successful requests only."""
+    ms = [t * 1000 for t in latencies_s]
+    summary: dict[str, Any] = {
+        "requests": len(ms) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(ms) / wall_s, 2) if wall_s > 0 else 0.0,
+    }
+    for q in (50, 95, 99):
+        summary[f"p{q}_ms"] = round(percentile(ms, q), 2) if ms else None
+    return summary
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], max_regression: float
+) -> list[str]:
+    """Return a message for each endpoint that regressed beyond the tolerance.
+
+    An endpoint regresses if its p95 latency grew, or its throughput fell,
+    by more than ``max_regression`` (a fraction, e.g. 0.2 for 20%), or if it
+    returned errors where the baseline had none. Endpoints missing from either
+    run are ignored.
+    """
+    failures: list[str] = []
+    for name, cur in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+        if cur["errors"] and not base["errors"]:
+            failures.append(f"{name}: {cur['errors']} errors (baseline had none)")
+        if base["p95_ms"] and cur["p95_ms"] is not None:
+            limit = base["p95_ms"] * (1 + max_regression)
+            if cur["p95_ms"] > limit:
+                failures.append(
+                    f"{name}: p95 {cur['p95_ms']:.1f} ms > {limit:.1f} ms "
+                    f"(baseline {base['p95_ms']:.1f} ms)"
+                )
+        if base["throughput_rps"]:
+            floor = base["throughput_rps"] * (1 - max_regression)
+            if cur["throughput_rps"] < floor:
+                failures.append(
+                    f"{name}: throughput {cur['throughput_rps']:.1f} rps < "
+                    f"{floor:.1f} rps (baseline {base['throughput_rps']:.1f} rps)"
+                )
+    return failures
+
+
+# ---------------------------------------------------------------------------
+# Server process resources (Linux /proc; None elsewhere)
+#
+# With --workers > 1 uvicorn's supervisor only forks the workers and serves
+# nothing itself, so every figure covers the supervisor and all of its
+# descendants.
+# ---------------------------------------------------------------------------
+
+
+def process_tree(pid: int) -> list[int]:
+    """Return ``pid`` followed by all of its live descendants."""
+    pids = [pid]
+    for parent in pids:
+        for children in Path(f"/proc/{parent}/task").glob("*/children"):
+            try:
+                pids.extend(int(child) for child in children.read_text().split())
+            except OSError:
+                continue
+    return pids
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """Return user + system CPU seconds consumed by ``pid`` and its descendants."""
+    ticks = 0
+    for member in process_tree(pid):
+        try:
+            stat = Path(f"/proc/{member}/stat").read_text()
+        except OSError:
+            if member == pid:
+                return None
+            continue
+        fields = stat.rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15 of stat(5); index from after "comm".
+        ticks += int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf("SC_CLK_TCK")
+
+
+def process_memory_mb(pid: int) -> dict[str, float | None]:
+    """Return resident memory of ``pid`` and its descendants.
+
+    ``rss_mb`` sums current VmRSS. ``peak_rss_mb`` sums each process's VmHWM;
+    the processes need not peak together, so it is an upper bound.
+    """
+    result: dict[str, float | None] = {"rss_mb": None, "peak_rss_mb": None}
+    totals_kb = {"VmRSS": 0, "VmHWM": 0}
+    for member in process_tree(pid):
+        try:
+            status = Path(f"/proc/{member}/status").read_text()
+        except OSError:
+            if member == pid:
+                return result
+            continue
+        for line in status.splitlines():
+            key, _, value = line.partition(":")
+            if key in totals_kb:
+                totals_kb[key] += int(value.split()[0])
+    result["rss_mb"] = round(totals_kb["VmRSS"] / 1024, 1)
+    result["peak_rss_mb"] = round(totals_kb["VmHWM"] / 1024, 1)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Request payloads
+# ---------------------------------------------------------------------------
+
+
+RequestFn = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def _request_factories(image: bytes, run_id: str) -> dict[str, RequestFn]:
+    image_b64 = base64.b64encode(image).decode()
+
+    async def predict(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        files = {"file": ("load.jpg", image, "image/jpeg")}
+        return await client.post("/predict", files=files)
+
+    async def advice(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        # A fresh council slug per request misses the in-memory caches, so
+        # every request exercises the search → LLM path against the stubs.
+        params = {"item_category": _LABEL, "council_slug": f"Load{run_id}{i}"}
+        return await client.get("/advice", params=params)
+
+    async def upload(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        body = {"image_base64": image_b64, "label": _LABEL}
+        return await client.post("/upload", json=body)
+
+    return {"predict": predict, "advice": advice, "upload": upload}
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, send: RequestFn, requests: int, concurrency: int
+) -> dict[str, Any]:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight."""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await send(client, i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarise(latencies, errors, time.perf_counter() - start)
+
+
+async def drive(
+    base_url: str,
+    server_pid: int,
+    endpoints: list[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    image: bytes,
+) -> dict[str, dict[str, Any]]:
+    """Warm up and then load each endpoint in turn, sampling server resources."""
+    factories = _request_factories(image, run_id=str(int(time.time())))
+    limits = httpx.Limits(max_connections=concurrency)
+    results: dict[str, dict[str, Any]] = {}
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=120.0, limits=limits
+    ) as client:
+        for name in endpoints:
+            send = factories[name]
+            for i in range(warmup):
+                await send(client, -1 - i)
+            cpu_before = process_cpu_seconds(server_pid)
+            start = time.perf_counter()
+            summary = await run_endpoint(client, send, requests, concurrency)
+            wall = time.perf_counter() - start
+            cpu_after = process_cpu_seconds(server_pid)
+            if cpu_before is not None and cpu_after is not None:
+                cpu = cpu_after - cpu_before
+                summary["server_cpu_s"] = round(cpu, 2)
+                summary["server_cpu_percent"] = round(100 * cpu / wall, 1)
+            summary.update(process_memory_mb(server_pid))
+            results[name] = summary
+            logger.info("%s: %s", name, summary)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Environment
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(base_url: str, proc: subprocess.Popen, timeout_s: float) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"API server not healthy after {timeout_s:.0f}s")
+
+
+def _start_moto() -> tuple[Any, str]:
+    try:
+        import boto3
+        from moto.server import ThreadedMotoServer
+    except ImportError as e:
+        raise SystemExit(
+            "The upload benchmark needs moto: "
+            "uv run --with moto python -m benchmarks.load_test"
+        ) from e
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=_free_port())
+    server.start()
+    host, port = server.get_host_and_port()
+    url = f"http://{host}:{port}"
+    boto3.client(
+        "s3",
+        endpoint_url=url,
+        region_name=_AWS_ENV["AWS_REGION"],
+        aws_access_key_id=_AWS_ENV["AWS_ACCESS_KEY_ID"],
+        aws_secret_access_key=_AWS_ENV["AWS_SECRET_ACCESS_KEY"],
+    ).create_bucket(Bucket=_BUCKET)
+    return server, url
+
+
+def _server_env(artifact: Path, s3_url: str | None, stub_url: str) -> dict[str, str]:
+    env = {
+        **os.environ,
+        **_AWS_ENV,
+        "MODEL_ARTIFACT_PATH": str(artifact),
+        "S3_BUCKET": _BUCKET,
+        "OPENAI_API_KEY": "load-test",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "TAVILY_API_KEY": "load-test",
+        "TAVILY_API_BASE_URL": stub_url,
+        "WARMUP_ON_STARTUP": "true",
+    }
+    if s3_url:
+        env["S3_ENDPOINT_URL"] = s3_url
+    return env
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Set up the environment, run the load test and return the results."""
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {sorted(unknown)}")
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        StubServer(latency_ms=args.stub_latency_ms) as stubs,
+    ):
+        artifact = args.artifact
+        if artifact is None:
+            from recbuddy.benchmark import write_random_artifact
+
+            artifact = write_random_artifact(Path(tmp) / "model.safetensors")
+
+        moto, s3_url = _start_moto() if "upload" in endpoints else (None, None)
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ]  # fmt: skip
+        proc = subprocess.Popen(cmd, env=_server_env(artifact, s3_url, stubs.url))
+        try:
+            _wait_healthy(base_url, proc, args.startup_timeout)
+            from benchmarks.inference import synthetic_jpeg
+
+            image = synthetic_jpeg(tuple(args.image_size))
+            endpoint_results = asyncio.run(
+                drive(
+                    base_url,
+                    proc.pid,
+                    endpoints,
+                    args.requests,
+                    args.concurrency,
+                    args.warmup,
+                    image,
+                )
+            )
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+            if moto is not None:
+                moto.stop()
+
+    return {
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "workers": args.workers,
+            "image_size": list(args.image_size),
+            "stub_latency_ms": args.stub_latency_ms,
+            "artifact": str(args.artifact) if args.artifact else "random",
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "endpoints": endpoint_results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--endpoints",
+        default=",".join(ENDPOINTS),
+        help="Comma-separated endpoints to load (default: all)",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="Measured requests per endpoint"
+    )
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn worker processes"
+    )
+    parser.add_argument(
+        "--artifact",
+        type=Path,
+        default=None,
+        help="Model artifact to serve (default: a randomly initialised one)",
+    )
+    parser.add_argument(
+        "--image-size", type=int, nargs=2, default=(1280, 960), metavar=("W", "H")
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=0.0,
+        help="Delay added by the search/LLM stubs",
+    )
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--output", type=Path, default=None, help="Write JSON here")
+    parser.add_argument(
+        "--compare", type=Path, default=None, help="Baseline JSON to compare against"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Tolerated p95/throughput regression as a fraction (default 0.2)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+        logger.info("Wrote %s", args.output)
+    else:
+        print(text)
+
+    if args.compare:
+        failures = compare(
+            json.loads(args.compare.read_text()), results, args.max_regression
+        )
+        for failure in failures:
+            logger.error("REGRESSION %s", failure)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
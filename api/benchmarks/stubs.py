@@ -0,0 +1,126 @@
+"""Local stand-ins for the OpenAI and Tavily HTTP APIs.
+
+Both stubs answer with canned, schema-valid payloads after an optional fixed
+delay, so /advice can be load-tested end to end (search → LLM → cache)
+without network access, API keys or cost. Point the API at them with
+``OPENAI_BASE_URL=<stub>/v1`` and ``TAVILY_API_BASE_URL=<stub>``.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# Returned by the OpenAI stub as the assistant message content.
+STUB_ADVICE: dict[str, Any] = {
+    "bin_colour": "yellow",
+    "bin_name": "Recycling",
+    "prep_instructions": "Rinse and empty",
+    "disposal_method": "kerbside",
+    "special_disposal_flag": False,
+    "notes": "Stubbed advice for benchmarking.",
+    "is_fallback": False,
+}
+
+STUB_SEARCH_RESULTS: list[dict[str, str]] = [
+    {
+        "url": "https://recyclingnearyou.com.au/stub",
+        "content": "Place rinsed containers loose in the yellow-lid bin. " * 20,
+    }
+]
+
+
+def _chat_completion() -> dict[str, Any]:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(STUB_ADVICE)},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+class StubServer:
+    """Serve the OpenAI and Tavily stubs from one background HTTP server.
+
+    Routes:
+        POST /v1/chat/completions — OpenAI chat completion
+        POST /search              — Tavily search
+
+    Args:
+        latency_ms: Delay added to every response, to mimic remote latency.
+        host: Interface to bind.
+        port: Port to bind; 0 picks a free one.
+    """
+
+    def __init__(
+        self, latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.requests: dict[str, int] = {"openai": 0, "tavily": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.requests[name] += 1
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 — http.server API
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                if self.path.rstrip("/").endswith("/chat/completions"):
+                    stub._count("openai")
+                    payload: dict[str, Any] = _chat_completion()
+                elif self.path.rstrip("/").endswith("/search"):
+                    stub._count("tavily")
+                    payload = {"query": "", "results": STUB_SEARCH_RESULTS}
+                else:
+                    self.send_error(404)
+                    return
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+        return _Handler
@@ -0,0 +1,84 @@
+"""Unit tests for registry channel resolution and the artifact cache."""
+
+import hashlib
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.artifacts import ArtifactRef, fetch, resolve_channel
+
+_WEIGHTS = b"model-weights"
+_SHA = hashlib.sha256(_WEIGHTS).hexdigest()
+
+
+def _s3(content: bytes = _WEIGHTS) -> MagicMock:
+    s3 = MagicMock()
+
+    def download(key: str, local_path: str, bucket: str | None = None) -> None:
+        Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(local_path).write_bytes(content)
+
+    s3.download_artifact.side_effect = download
+    return s3
+
+
+def _ref(sha256: str | None = _SHA, version: str = "0.2.0") -> ArtifactRef:
+    return ArtifactRef(
+        bucket="b",
+        key=f"artifacts/{version}/model.safetensors",
+        version=version,
+        sha256=sha256,
+    )
+
+
+def test_resolve_channel_reads_pointer() -> None:
+    s3 = MagicMock()
+    s3.get_json.return_value = {
+        "version": "0.2.0",
+        "artifact_key": "artifacts/0.2.0/model.safetensors",
+        "sha256": _SHA,
+    }
+    ref = resolve_channel(s3, "stable", bucket="b")
+    s3.get_json.assert_called_once_with("artifacts/channels/stable.json", bucket="b")
+    assert ref == _ref()
+
+
+def test_resolve_channel_raises_when_unset() -> None:
+    s3 = MagicMock()
+    s3.get_json.return_value = None
+    with pytest.raises(ValueError, match="not set"):
+        resolve_channel(s3, "stable", bucket="b")
+
+
+def test_fetch_downloads_once_then_hits_cache(tmp_path: Path) -> None:
+    s3 = _s3()
+    first = fetch(s3, _ref(), str(tmp_path))
+    second = fetch(s3, _ref(), str(tmp_path))
+    assert first == second == str(tmp_path / f"{_SHA}.safetensors")
+    assert Path(first).read_bytes() == _WEIGHTS
+    s3.download_artifact.assert_called_once()
+
+
+def test_fetch_rejects_hash_mismatch(tmp_path: Path) -> None:
+    s3 = _s3(content=b"tampered")
+    with pytest.raises(ValueError, match="sha256"):
+        fetch(s3, _ref(), str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_fetch_without_hash_always_downloads(tmp_path: Path) -> None:
+    s3 = _s3()
+    fetch(s3, _ref(sha256=None), str(tmp_path))
+    fetch(s3, _ref(sha256=None), str(tmp_path))
+    assert s3.download_artifact.call_count == 2
+
+
+def test_fetch_evicts_least_recently_used(tmp_path: Path) -> None:
+    for i, content in enumerate([b"a", b"b", b"c"]):
+        sha = hashlib.sha256(content).hexdigest()
+        ref = _ref(sha256=sha, version=f"0.{i}.0")
+        fetch(_s3(content), ref, str(tmp_path), keep=2)
+    cached = sorted(p.name for p in tmp_path.glob("*.safetensors"))
+    assert len(cached) == 2
+    assert f"{hashlib.sha256(b'a').hexdigest()}.safetensors" not in cached
@@ -0,0 +1,90 @@
+"""Unit tests for the load-test statistics and search/LLM stubs."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+from benchmarks.load_test import (
+    compare,
+    process_cpu_seconds,
+    process_memory_mb,
+    process_tree,
+    summarise,
+)
+from benchmarks.stubs import STUB_ADVICE, StubServer
+
+
+def test_summarise_reports_latency_in_ms() -> None:
+    summary = summarise([0.01, 0.02, 0.03], errors=1, wall_s=1.5)
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == pytest.approx(20.0)
+
+
+def _run(p95: float, rps: float, errors: int = 0) -> dict:
+    endpoint = {"p95_ms": p95, "throughput_rps": rps, "errors": errors}
+    return {"endpoints": {"predict": endpoint}}
+
+
+def test_compare_within_tolerance_passes() -> None:
+    assert compare(_run(100, 50), _run(115, 45), max_regression=0.2) == []
+
+
+def test_compare_flags_latency_throughput_and_errors() -> None:
+    failures = compare(_run(100, 50), _run(130, 30, errors=2), max_regression=0.2)
+    assert len(failures) == 3
+    assert all(f.startswith("predict:") for f in failures)
+
+
+def test_compare_ignores_endpoints_missing_from_baseline() -> None:
+    assert compare({"endpoints": {}}, _run(500, 1), max_regression=0.2) == []
+
+
+@pytest.mark.skipif(
+    not list(Path(f"/proc/{os.getpid()}/task").glob("*/children")),
+    reason="needs /proc/<pid>/task/<tid>/children",
+)
+def test_process_resources_include_worker_processes() -> None:
+    # A supervisor that only waits on a worker, like uvicorn --workers N.
+    worker = (
+        "import sys, time; x = bytearray(64 << 20); print(flush=True); time.sleep(30)"
+    )
+    supervisor_code = (
+        f"import subprocess, sys; subprocess.run([sys.executable, '-c', {worker!r}])"
+    )
+    supervisor = subprocess.Popen(
+        [sys.executable, "-c", supervisor_code], stdout=subprocess.PIPE
+    )
+    tree = [supervisor.pid]
+    try:
+        assert supervisor.stdout is not None
+        supervisor.stdout.readline()
+        tree = process_tree(supervisor.pid)
+        assert tree[0] == supervisor.pid
+        assert len(tree) == 2
+        # Only the worker holds the 64 MiB buffer.
+        assert process_memory_mb(supervisor.pid)["rss_mb"] > 64
+        assert process_cpu_seconds(supervisor.pid) is not None
+    finally:
+        for pid in reversed(tree):
+            os.kill(pid, 9)
+        supervisor.wait()
+
+
+def test_stub_server_serves_openai_and_tavily() -> None:
+    with StubServer() as stubs:
+        chat = httpx.post(f"{stubs.url}/v1/chat/completions", json={})
+        search = httpx.post(f"{stubs.url}/search", json={"query": "x"})
+        missing = httpx.post(f"{stubs.url}/nope", json={})
+
+    content = chat.json()["choices"][0]["message"]["content"]
+    assert json.loads(content) == STUB_ADVICE
+    assert search.json()["results"][0]["url"].startswith("https://")
+    assert missing.status_code == 404
+    assert stubs.requests == {"openai": 1, "tavily": 1}
@@ -0,0 +1,153 @@
+"""Unit tests for the buffered prediction event sink."""
+
+import gzip
+import io
+import json
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.events import (
+    EventSink,
+    LocalDestination,
+    LogDestination,
+    S3Destination,
+    destination_from_uri,
+)
+from app.inference import CategoryPrediction, ClassificationResult
+from app.main import app
+
+
+def _ndjson(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in gzip.decompress(data).splitlines()]
+
+
+def test_emit_buffers_until_flush() -> None:
+    destination = MagicMock()
+    sink = EventSink(destination, batch_size=100, flush_interval_seconds=60)
+    for i in range(3):
+        assert sink.emit({"i": i})
+    destination.write.assert_not_called()
+    assert sink.flush() == 3
+    sink.close()
+    destination.write.assert_called_once_with([{"i": 0}, {"i": 1}, {"i": 2}])
+    assert sink.stats() == {"written": 3, "dropped": 0, "failed": 0, "buffered": 0}
+
+
+def test_full_batch_wakes_the_flush_thread() -> None:
+    written = threading.Event()
+    destination = MagicMock()
+    destination.write.side_effect = lambda events: written.set()
+    sink = EventSink(destination, batch_size=2, flush_interval_seconds=60)
+    sink.emit({"i": 0})
+    sink.emit({"i": 1})
+    assert written.wait(5)
+    sink.close()
+    assert sink.stats()["written"] == 2
+
+
+def test_events_are_dropped_when_buffer_is_full() -> None:
+    destination = MagicMock()
+    sink = EventSink(
+        destination, batch_size=100, flush_interval_seconds=60, max_buffered=2
+    )
+    assert sink.emit({"i": 0})
+    assert sink.emit({"i": 1})
+    assert not sink.emit({"i": 2})
+    sink.close()
+    assert sink.stats()["dropped"] == 1
+    destination.write.assert_called_once_with([{"i": 0}, {"i": 1}])
+
+
+def test_failed_batch_is_counted_and_discarded() -> None:
+    destination = MagicMock()
+    destination.write.side_effect = OSError("disk full")
+    sink = EventSink(destination, flush_interval_seconds=60)
+    sink.emit({"i": 0})
+    assert sink.flush() == 0
+    sink.close()
+    assert sink.stats() == {"written": 0, "dropped": 0, "failed": 1, "buffered": 0}
+
+
+def test_close_flushes_remaining_events(tmp_path: Path) -> None:
+    sink = EventSink(LocalDestination(tmp_path), flush_interval_seconds=60)
+    sink.emit({"event": "prediction", "predicted_label": "cartons"})
+    sink.close()
+    files = list(tmp_path.glob("predictions/*/*/*/*.ndjson.gz"))
+    assert len(files) == 1
+    assert _ndjson(files[0].read_bytes()) == [
+        {"event": "prediction", "predicted_label": "cartons"}
+    ]
+
+
+def test_s3_destination_puts_one_object_per_batch() -> None:
+    client = MagicMock()
+    S3Destination(lambda: client, "events-bucket", "api").write([{"i": 0}, {"i": 1}])
+    kwargs = client.put_object.call_args.kwargs
+    assert kwargs["Bucket"] == "events-bucket"
+    assert kwargs["Key"].startswith("api/predictions/")
+    assert kwargs["Key"].endswith(".ndjson.gz")
+    assert _ndjson(kwargs["Body"]) == [{"i": 0}, {"i": 1}]
+
+
+def test_s3_destination_with_moto() -> None:
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="events-bucket")
+        sink = EventSink(
+            S3Destination(client, "events-bucket", "api/"), flush_interval_seconds=60
+        )
+        sink.emit({"i": 0})
+        sink.close()
+        keys = [
+            obj["Key"]
+            for obj in client.list_objects_v2(Bucket="events-bucket")["Contents"]
+        ]
+        assert len(keys) == 1
+        body = client.get_object(Bucket="events-bucket", Key=keys[0])["Body"].read()
+    assert _ndjson(body) == [{"i": 0}]
+
+
+def test_destination_from_uri(tmp_path: Path) -> None:
+    assert isinstance(destination_from_uri(None), LogDestination)
+    assert isinstance(destination_from_uri("log"), LogDestination)
+    local = destination_from_uri(str(tmp_path))
+    assert isinstance(local, LocalDestination)
+    s3 = destination_from_uri("s3://bucket/events", MagicMock())
+    assert isinstance(s3, S3Destination)
+    assert (s3.bucket, s3.prefix) == ("bucket", "events/")
+    with pytest.raises(ValueError):
+        destination_from_uri("s3:///events")
+
+
+def test_predict_emits_event_without_writing() -> None:
+    top = CategoryPrediction(label="cartons", confidence=0.9)
+    model = MagicMock()
+    model.predict.return_value = ClassificationResult(
+        top_prediction=top, alternatives=[top]
+    )
+    sink = MagicMock()
+    app.state.model = model
+    app.state.model_version = "0.3.0"
+    app.state.events = sink
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buf, format="JPEG")
+    try:
+        response = TestClient(app).post(
+            "/predict", files={"file": ("a.jpg", buf.getvalue(), "image/jpeg")}
+        )
+    finally:
+        app.state.events = None
+    assert response.status_code == 200
+    (event,) = sink.emit.call_args.args
+    assert event["predicted_label"] == "cartons"
+    assert event["model_version"] == "0.3.0"
+    assert event["latency_ms"] >= 0
+    sink.flush.assert_not_called()
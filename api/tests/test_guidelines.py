@@ -288,7 +288,9 @@ def _settings_with_no_key():
 
     class _FakeSettings:
         openai_api_key: str | None = None
+        openai_base_url: str | None = None
         tavily_api_key: str | None = None
+        tavily_api_base_url: str | None = None
         guidelines_cache_ttl_seconds: float = 604800.0
         search_cache_ttl_seconds: float = 86400.0
 
@@ -0,0 +1,58 @@
+"""Import-time budget for the API process.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter and
+fails if a heavy stack is imported eagerly or if the cumulative import time of
+``app.main`` exceeds the budget. Override the budget with
+``IMPORT_TIME_BUDGET_MS`` on slow CI machines.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_API_ROOT = Path(__file__).resolve().parents[1]
+
+# Must only be imported on first use (see app.main module docstring).
+_LAZY_MODULES = ("torch", "torchvision", "PIL", "openai", "tavily")
+
+_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Return cumulative import time in microseconds per imported module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_API_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.fixture(scope="module")
+def app_main_import_times() -> dict[str, int]:
+    return _import_times("app.main")
+
+
+@pytest.mark.parametrize("module", _LAZY_MODULES)
+def test_heavy_module_not_imported_by_app_main(
+    app_main_import_times: dict[str, int], module: str
+) -> None:
+    assert module not in app_main_import_times
+
+
+def test_app_main_import_within_budget(app_main_import_times: dict[str, int]) -> None:
+    elapsed_ms = app_main_import_times["app.main"] / 1000
+    assert elapsed_ms <= _BUDGET_MS, (
+        f"import app.main took {elapsed_ms:.0f} ms (budget {_BUDGET_MS:.0f} ms)"
+    )
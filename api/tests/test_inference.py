@@ -13,8 +13,15 @@ import torchvision.models as models
 from PIL import Image
 from safetensors.torch import save_file
 
-from app.inference import CategoryPrediction, ClassificationModel, ClassificationResult
+from app.inference import (
+    CascadeClassifier,
+    CategoryPrediction,
+    ClassificationModel,
+    ClassificationResult,
+    ImageTooLargeError,
+)
 from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.modeling import artifact_metadata, build_architecture
 
 
 # ---------------------------------------------------------------------------
@@ -128,6 +135,53 @@ def test_predict_raises_value_error_on_corrupt_bytes(
         model.predict(b"this-is-not-an-image")
 
 
+def test_predict_bf16_matches_fp32_top_label(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    fp32 = ClassificationModel.from_artifact(model_artifact_path, bf16=False)
+    bf16 = ClassificationModel.from_artifact(model_artifact_path, bf16=True)
+    result = bf16.predict(valid_jpeg_bytes)
+    assert result.top_prediction.label in ALL_LABELS_LIST
+    assert 0.0 <= result.top_prediction.confidence <= 1.0
+    assert (
+        abs(
+            result.top_prediction.confidence
+            - fp32.predict(valid_jpeg_bytes).top_prediction.confidence
+        )
+        < 0.05
+    )
+
+
+def test_predict_without_channels_last_matches_default(
+    model_artifact_path: str, valid_jpeg_bytes: bytes, monkeypatch
+) -> None:
+    default = ClassificationModel.from_artifact(model_artifact_path)
+    monkeypatch.setattr("app.inference.settings.inference_channels_last", False)
+    nchw = ClassificationModel.from_artifact(model_artifact_path)
+    expected = default.predict(valid_jpeg_bytes).top_prediction
+    result = nchw.predict(valid_jpeg_bytes).top_prediction
+    assert result.label == expected.label
+    assert abs(result.confidence - expected.confidence) < 1e-4
+
+
+def _encoded(size: tuple[int, int], fmt: str) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color=(40, 120, 60)).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_decode_downscales_oversize_jpeg(monkeypatch) -> None:
+    monkeypatch.setattr("app.inference.settings.max_image_pixels", 1_000_000)
+    tensor = ClassificationModel._decode(_encoded((2048, 2048), "JPEG"))
+    assert tensor.shape == (1, 3, 224, 224)
+
+
+def test_decode_rejects_oversize_png_before_decoding(monkeypatch) -> None:
+    monkeypatch.setattr("app.inference.settings.max_image_pixels", 1_000_000)
+    with pytest.raises(ImageTooLargeError, match="2048x2048"):
+        ClassificationModel._decode(_encoded((2048, 2048), "PNG"))
+
+
 # ---------------------------------------------------------------------------
 # Value objects
 # ---------------------------------------------------------------------------
@@ -147,3 +201,193 @@ def test_classification_result_is_frozen() -> None:
     )
     with pytest.raises((AttributeError, TypeError)):
         result.top_prediction = pred  # type: ignore[misc]
+
+
+def test_predict_returns_configured_top_k(
+    model_artifact_path: str, valid_jpeg_bytes: bytes, monkeypatch
+) -> None:
+    monkeypatch.setattr("app.inference.settings.inference_top_k", 5)
+    model = ClassificationModel.from_artifact(model_artifact_path)
+    result = model.predict(valid_jpeg_bytes)
+    assert len(result.alternatives) == 5
+    confidences = [p.confidence for p in result.alternatives]
+    assert confidences == sorted(confidences, reverse=True)
+
+
+def test_predict_temperature_keeps_ranking_and_softens(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    base = ClassificationModel.from_artifact(model_artifact_path)
+    warm = ClassificationModel(base._net, temperature=4.0)
+    base_result = base.predict(valid_jpeg_bytes)
+    warm_result = warm.predict(valid_jpeg_bytes)
+    assert warm_result.top_prediction.label == base_result.top_prediction.label
+    assert warm_result.top_prediction.confidence <= (
+        base_result.top_prediction.confidence
+    )
+
+
+def test_predict_flags_low_confidence_below_threshold(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    base = ClassificationModel.from_artifact(model_artifact_path)
+    strict = ClassificationModel(base._net, low_confidence_threshold=1.0)
+    assert strict.predict(valid_jpeg_bytes).low_confidence
+    assert not base.predict(valid_jpeg_bytes).low_confidence
+
+
+def test_invalid_top_k_raises() -> None:
+    with pytest.raises(ValueError, match="top_k"):
+        ClassificationModel(torch.nn.Identity(), top_k=0)
+
+
+# ---------------------------------------------------------------------------
+# ClassificationModel.predict_batch
+# ---------------------------------------------------------------------------
+
+
+def test_predict_batch_matches_single_predictions(model_artifact_path: str) -> None:
+    model = ClassificationModel.from_artifact(model_artifact_path)
+    colours = [(200, 50, 50), (20, 200, 40), (30, 30, 220)]
+    images = []
+    for colour in colours:
+        buf = io.BytesIO()
+        Image.new("RGB", (64, 48), color=colour).save(buf, format="JPEG")
+        images.append(buf.getvalue())
+
+    batch = model.predict_batch(images)
+    assert len(batch) == len(images)
+    for image, result in zip(images, batch):
+        single = model.predict(image).top_prediction
+        assert result.top_prediction.label == single.label
+        assert abs(result.top_prediction.confidence - single.confidence) < 1e-4
+
+
+def test_untimed_model_records_no_stage_metrics(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    from app.inference import untimed
+    from app.metrics import PREDICT_STAGE_SECONDS
+
+    model = ClassificationModel.from_artifact(model_artifact_path, stage_timer=untimed)
+    before = PREDICT_STAGE_SECONDS.count(stage="forward")
+    model.predict(valid_jpeg_bytes)
+    assert PREDICT_STAGE_SECONDS.count(stage="forward") == before
+
+
+def test_decode_draft_mode_keeps_input_shape() -> None:
+    tensor = ClassificationModel._decode(_encoded((2048, 1536), "JPEG"), draft=True)
+    assert tensor.shape == (1, 3, 224, 224)
+
+
+# ---------------------------------------------------------------------------
+# Test-time augmentation
+# ---------------------------------------------------------------------------
+
+
+def test_tta_below_every_confidence_matches_single_pass(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    base = ClassificationModel.from_artifact(model_artifact_path)
+    never = ClassificationModel(base._net, tta_threshold=0.0)
+    expected = base.predict(valid_jpeg_bytes).top_prediction
+    result = never.predict(valid_jpeg_bytes).top_prediction
+    assert result.label == expected.label
+    assert abs(result.confidence - expected.confidence) < 1e-4
+
+
+def test_tta_triggers_below_threshold(
+    model_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    from app.metrics import PREDICT_STAGE_SECONDS
+
+    base = ClassificationModel.from_artifact(model_artifact_path)
+    always = ClassificationModel(base._net, tta_threshold=1.01)
+    before = PREDICT_STAGE_SECONDS.count(stage="tta")
+    results = always.predict_batch([valid_jpeg_bytes, valid_jpeg_bytes])
+    assert PREDICT_STAGE_SECONDS.count(stage="tta") == before + 1
+    for result in results:
+        assert 0.0 <= result.top_prediction.confidence <= 1.0
+        assert result.top_prediction.label in ALL_LABELS_LIST
+
+
+# ---------------------------------------------------------------------------
+# CascadeClassifier
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def first_stage_artifact_path(tmp_path) -> str:
+    """Create a tiny random MobileNetV3-Small safetensors artifact."""
+    net = build_architecture("mobilenet_v3_small", len(ALL_LABELS_LIST))
+    path = tmp_path / "first_stage.safetensors"
+    save_file(
+        net.state_dict(),
+        str(path),
+        metadata=artifact_metadata(len(ALL_LABELS_LIST), "mobilenet_v3_small"),
+    )
+    return str(path)
+
+
+def test_cascade_zero_threshold_answers_from_first_stage(
+    model_artifact_path: str, first_stage_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    from app.metrics import CASCADE_ROUTED_TOTAL
+
+    second = ClassificationModel.from_artifact(model_artifact_path)
+    cascade = CascadeClassifier.from_artifact(
+        first_stage_artifact_path, second, threshold=0.0
+    )
+    before = CASCADE_ROUTED_TOTAL.value(stage="first")
+    result = cascade.predict(valid_jpeg_bytes)
+    expected = cascade._first.predict(valid_jpeg_bytes).top_prediction
+    assert result.top_prediction.label == expected.label
+    assert CASCADE_ROUTED_TOTAL.value(stage="first") == before + 1
+
+
+def test_cascade_full_threshold_escalates_to_second_stage(
+    model_artifact_path: str, first_stage_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    from app.metrics import CASCADE_ROUTED_TOTAL
+
+    second = ClassificationModel.from_artifact(model_artifact_path)
+    cascade = CascadeClassifier.from_artifact(
+        first_stage_artifact_path, second, threshold=1.0
+    )
+    before = CASCADE_ROUTED_TOTAL.value(stage="second")
+    results = cascade.predict_batch([valid_jpeg_bytes, valid_jpeg_bytes])
+    expected = second.predict(valid_jpeg_bytes).top_prediction
+    assert all(r.top_prediction.label == expected.label for r in results)
+    assert CASCADE_ROUTED_TOTAL.value(stage="second") == before + 2
+
+
+def test_cascade_routes_every_stage_through_stage_timer(
+    model_artifact_path: str, first_stage_artifact_path: str, valid_jpeg_bytes: bytes
+) -> None:
+    from contextlib import nullcontext
+
+    from app.inference import untimed
+    from app.metrics import PREDICT_STAGE_SECONDS
+
+    stages: list[str] = []
+
+    def record(stage: str):
+        stages.append(stage)
+        return nullcontext()
+
+    second = ClassificationModel.from_artifact(model_artifact_path, stage_timer=untimed)
+    cascade = CascadeClassifier.from_artifact(
+        first_stage_artifact_path, second, threshold=1.0
+    )
+    assert cascade.stage_timer is untimed  # inherited from the second stage
+    cascade.stage_timer = record
+    before = PREDICT_STAGE_SECONDS.count(stage="cascade_first")
+    cascade.predict(valid_jpeg_bytes)
+    assert stages == ["decode", "cascade_first", "forward", "postprocess"]
+    assert PREDICT_STAGE_SECONDS.count(stage="cascade_first") == before
+
+
+def test_cascade_rejects_threshold_outside_unit_interval() -> None:
+    model = ClassificationModel(torch.nn.Identity())
+    with pytest.raises(ValueError, match="threshold"):
+        CascadeClassifier(model, model, threshold=1.5)
@@ -0,0 +1,51 @@
+"""Unit tests for the ClassificationModel micro-benchmark."""
+
+import io
+
+import pytest
+import torch
+from PIL import Image
+
+from benchmarks.inference import benchmark_config, build_corpus, sweep, synthetic_jpeg
+from app.inference import ClassificationModel
+from recbuddy.labels import ALL_LABELS_LIST
+
+
+def _tiny_model() -> ClassificationModel:
+    net = torch.nn.Sequential(
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(3, len(ALL_LABELS_LIST)),
+    ).eval()
+    return ClassificationModel(net)
+
+
+def test_synthetic_jpeg_is_deterministic_and_sized() -> None:
+    data = synthetic_jpeg((320, 240), seed=3)
+    assert data == synthetic_jpeg((320, 240), seed=3)
+    assert Image.open(io.BytesIO(data)).size == (320, 240)
+
+
+def test_build_corpus_cycles_resolutions() -> None:
+    corpus = build_corpus(None, ((64, 48), (96, 72)), size=3)
+    sizes = [Image.open(io.BytesIO(b)).size for b in corpus]
+    assert sizes == [(64, 48), (96, 72), (64, 48)]
+
+
+def test_build_corpus_empty_directory_raises(tmp_path) -> None:
+    with pytest.raises(ValueError, match="No images"):
+        build_corpus(tmp_path)
+
+
+def test_benchmark_config_reports_stages_and_throughput() -> None:
+    corpus = build_corpus(None, ((64, 48),), size=4)
+    result = benchmark_config(_tiny_model(), corpus, batch_size=2, iterations=3)
+    assert set(result["stages"]) == {"decode", "forward", "postprocess"}
+    assert result["images_per_sec"] > 0
+
+
+def test_sweep_covers_every_combination() -> None:
+    corpus = build_corpus(None, ((64, 48),), size=2)
+    results = sweep(_tiny_model(), corpus, [1, 2], [1], ["full", "draft"], 1)
+    combos = {(r["decode"], r["batch_size"]) for r in results}
+    assert combos == {("full", 1), ("full", 2), ("draft", 1), ("draft", 2)}
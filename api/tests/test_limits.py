@@ -0,0 +1,50 @@
+"""Unit tests for BodySizeLimitMiddleware."""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.limits import BodySizeLimitMiddleware
+
+_LIMIT = 1024
+
+
+def _make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=_LIMIT, paths=("/echo",))
+
+    @app.post("/echo")
+    async def echo(request: Request) -> dict[str, int]:
+        return {"size": len(await request.body())}
+
+    @app.post("/other")
+    async def other(request: Request) -> dict[str, int]:
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_body_under_limit_passes_through() -> None:
+    response = _make_client().post("/echo", content=b"x" * _LIMIT)
+    assert response.status_code == 200
+    assert response.json() == {"size": _LIMIT}
+
+
+def test_declared_content_length_over_limit_returns_413() -> None:
+    response = _make_client().post("/echo", content=b"x" * (_LIMIT + 1))
+    assert response.status_code == 413
+    assert str(_LIMIT) in response.json()["detail"]
+
+
+def test_streamed_body_over_limit_returns_413() -> None:
+    def chunks():
+        for _ in range(4):
+            yield b"x" * 512
+
+    # A generator body is sent chunked, without Content-Length.
+    response = _make_client().post("/echo", content=chunks())
+    assert response.status_code == 413
+
+
+def test_unlisted_path_is_not_limited() -> None:
+    response = _make_client().post("/other", content=b"x" * (_LIMIT * 4))
+    assert response.status_code == 200
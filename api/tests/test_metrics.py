@@ -0,0 +1,102 @@
+"""Unit tests for app.metrics and the GET /metrics endpoint."""
+
+import io
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.inference import CategoryPrediction, ClassificationResult
+from app.main import app
+from app.metrics import PREDICT_RESPONSES_TOTAL, Registry
+
+# ---------------------------------------------------------------------------
+# Counter / Histogram
+# ---------------------------------------------------------------------------
+
+
+def test_counter_renders_labelled_series() -> None:
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ("status",))
+    counter.inc(status="200")
+    counter.inc(2, status="200")
+    counter.inc(status="400")
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 3.0' in text
+    assert 'requests_total{status="400"} 1.0' in text
+
+
+def test_counter_rejects_wrong_labels() -> None:
+    counter = Registry().counter("c_total", "C.", ("status",))
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(code="200")
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = Registry()
+    hist = registry.histogram("latency_seconds", "L.", ("stage",), buckets=(0.1, 1.0))
+    hist.observe(0.05, stage="decode")
+    hist.observe(0.1, stage="decode")
+    hist.observe(5.0, stage="decode")
+    text = registry.render()
+    assert 'latency_seconds_bucket{stage="decode",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{stage="decode",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="decode"} 3' in text
+    assert hist.count(stage="decode") == 3
+
+
+def test_histogram_time_records_one_observation() -> None:
+    hist = Registry().histogram("t_seconds", "T.")
+    with hist.time():
+        pass
+    assert hist.count() == 1
+
+
+def test_registry_rejects_duplicate_names() -> None:
+    registry = Registry()
+    registry.counter("dup_total", "D.")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("dup_total", "D.")
+
+
+# ---------------------------------------------------------------------------
+# GET /metrics
+# ---------------------------------------------------------------------------
+
+
+def _jpeg_bytes() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), color=(10, 20, 30)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_metrics_endpoint_reports_predict_stages_and_statuses() -> None:
+    model = MagicMock()
+    model.predict.return_value = ClassificationResult(
+        top_prediction=CategoryPrediction(label="cartons", confidence=0.9),
+        alternatives=[
+            CategoryPrediction(label="cartons", confidence=0.9),
+            CategoryPrediction(label="cds-dvds", confidence=0.05),
+            CategoryPrediction(label="cars", confidence=0.01),
+        ],
+    )
+    app.state.model = model
+    client = TestClient(app)
+    ok_before = PREDICT_RESPONSES_TOTAL.value(status="200")
+    bad_before = PREDICT_RESPONSES_TOTAL.value(status="400")
+
+    client.post("/predict", files={"file": ("a.jpg", _jpeg_bytes(), "image/jpeg")})
+    client.post("/predict", files={"file": ("a.txt", b"hello", "text/plain")})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("read_body", "queue_wait", "serialise"):
+        assert f'recbuddy_predict_stage_seconds_count{{stage="{stage}"}}' in (
+            response.text
+        )
+    assert PREDICT_RESPONSES_TOTAL.value(status="200") == ok_before + 1
+    assert PREDICT_RESPONSES_TOTAL.value(status="400") == bad_before + 1
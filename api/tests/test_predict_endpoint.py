@@ -5,6 +5,7 @@ The model is injected via app.state to avoid loading a real artifact.
 """
 
 import asyncio
+import hashlib
 import io
 import logging
 from unittest.mock import MagicMock, patch
@@ -15,7 +16,7 @@ from PIL import Image
 
 from app.config import settings
 from app.inference import CategoryPrediction, ClassificationResult
-from app.main import app
+from app.main import PredictionResponse, app
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -102,6 +103,19 @@ def test_predict_response_categories_has_three_entries(
     assert len(body["categories"]) == 3
 
 
+def test_predict_response_matches_prediction_response_schema(
+    client: TestClient, valid_jpeg_bytes: bytes
+) -> None:
+    response = client.post(
+        "/predict",
+        files={"file": ("photo.jpg", valid_jpeg_bytes, "image/jpeg")},
+    )
+    body = PredictionResponse.model_validate(response.json())
+    assert body.label == "paper-cardboard"
+    assert body.categories[1] == {"cartons": 0.041}
+    assert body.low_confidence is False
+
+
 # ---------------------------------------------------------------------------
 # Error paths
 # ---------------------------------------------------------------------------
@@ -122,6 +136,18 @@ def test_predict_returns_400_for_non_image_content_type(
     assert response.status_code == 400
 
 
+def test_predict_returns_413_for_oversize_upload(
+    client: TestClient, mock_model: MagicMock
+) -> None:
+    body = b"\xff" * (settings.max_upload_bytes + 1)
+    response = client.post(
+        "/predict",
+        files={"file": ("big.jpg", body, "image/jpeg")},
+    )
+    assert response.status_code == 413
+    mock_model.predict.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # Privacy: no image written to disk
 # ---------------------------------------------------------------------------
@@ -257,3 +283,85 @@ def test_predict_logs_model_version_on_load(
             files={"file": ("photo.jpg", valid_jpeg_bytes, "image/jpeg")},
         )
     assert any("0.2.0" in record.message for record in caplog.records)
+
+
+def test_predict_resolves_model_channel_through_cache(
+    monkeypatch, mock_model: MagicMock, valid_jpeg_bytes: bytes, tmp_path, caplog
+) -> None:
+    """With MODEL_CHANNEL set, the pointer is read and the artifact cached by hash."""
+    weights = b"weights"
+    sha = hashlib.sha256(weights).hexdigest()
+    monkeypatch.setattr(app.state, "model", None, raising=False)
+    monkeypatch.setattr(app.state, "model_lock", asyncio.Lock(), raising=False)
+    monkeypatch.setattr(settings, "model_channel", "stable")
+    monkeypatch.setattr(settings, "model_registry_bucket", "registry-bucket")
+    monkeypatch.setattr(settings, "model_cache_dir", str(tmp_path))
+
+    def download(key: str, local_path: str, bucket: str | None = None) -> None:
+        with open(local_path, "wb") as f:
+            f.write(weights)
+
+    with (
+        patch(
+            "app.main.s3_service.get_json",
+            return_value={
+                "version": "0.3.0",
+                "artifact_key": "artifacts/0.3.0/model.safetensors",
+                "sha256": sha,
+            },
+        ) as mock_get_json,
+        patch("app.main.s3_service.download_artifact", side_effect=download),
+        patch(
+            "app.main.ClassificationModel.from_artifact", return_value=mock_model
+        ) as mock_from_artifact,
+        caplog.at_level(logging.INFO),
+    ):
+        client = TestClient(app)
+        response = client.post(
+            "/predict",
+            files={"file": ("photo.jpg", valid_jpeg_bytes, "image/jpeg")},
+        )
+    assert response.status_code == 200
+    mock_get_json.assert_called_once_with(
+        "artifacts/channels/stable.json", bucket="registry-bucket"
+    )
+    mock_from_artifact.assert_called_once_with(str(tmp_path / f"{sha}.safetensors"))
+    assert app.state.model_version == "0.3.0"
+    assert any("0.3.0" in record.message for record in caplog.records)
+
+
+def test_channel_refresh_swaps_in_new_version(
+    monkeypatch, mock_model: MagicMock, tmp_path
+) -> None:
+    """A moved MODEL_CHANNEL pointer replaces the served model without a restart."""
+    from app.main import _reload_if_moved
+
+    old_model = MagicMock()
+    monkeypatch.setattr(app.state, "model", old_model, raising=False)
+    monkeypatch.setattr(app.state, "model_version", "0.3.0", raising=False)
+    monkeypatch.setattr(settings, "model_channel", "stable")
+    monkeypatch.setattr(settings, "model_cache_dir", str(tmp_path))
+    pointer = {"version": "0.3.0", "artifact_key": "artifacts/0.3.0/model.safetensors"}
+
+    def download(key: str, local_path: str, bucket: str | None = None) -> None:
+        with open(local_path, "wb") as f:
+            f.write(b"weights")
+
+    with (
+        patch("app.main.s3_service.get_json", side_effect=lambda *a, **k: pointer),
+        patch("app.main.s3_service.download_artifact", side_effect=download),
+        patch(
+            "app.main.ClassificationModel.from_artifact", return_value=mock_model
+        ) as mock_from_artifact,
+    ):
+        assert not asyncio.run(_reload_if_moved(app))
+        mock_from_artifact.assert_not_called()
+        assert app.state.model is old_model
+
+        pointer = {
+            "version": "0.4.0",
+            "artifact_key": "artifacts/0.4.0/model.safetensors",
+        }
+        assert asyncio.run(_reload_if_moved(app))
+    assert app.state.model is mock_model
+    assert app.state.model_version == "0.4.0"
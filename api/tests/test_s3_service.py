@@ -32,3 +32,46 @@ def test_download_artifact_creates_parent_directory(tmp_path: Path) -> None:
         service.download_artifact("artifacts/model.safetensors", local_path)
 
     assert (tmp_path / "nested" / "dir").exists()
+
+
+def test_client_is_created_on_first_use() -> None:
+    from app.services.s3 import S3Service
+
+    with patch("app.services.s3.boto3.client") as mock_boto:
+        service = S3Service(bucket="my-bucket")
+        mock_boto.assert_not_called()
+        service.upload_training_image(data=b"\xff\xd8\xff", label="cartons")
+        service.upload_training_image(data=b"\xff\xd8\xff", label="cartons")
+
+    mock_boto.assert_called_once()
+
+
+def test_get_json_parses_object() -> None:
+    import io
+
+    from app.services.s3 import S3Service
+
+    with patch("app.services.s3.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.get_object.return_value = {"Body": io.BytesIO(b'{"version": "1"}')}
+        mock_boto.return_value = mock_client
+        result = S3Service(bucket="my-bucket").get_json("artifacts/channels/a.json")
+
+    assert result == {"version": "1"}
+    mock_client.get_object.assert_called_once_with(
+        Bucket="my-bucket", Key="artifacts/channels/a.json"
+    )
+
+
+def test_get_json_returns_none_for_missing_key() -> None:
+    from botocore.exceptions import ClientError
+
+    from app.services.s3 import S3Service
+
+    with patch("app.services.s3.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+        mock_boto.return_value = mock_client
+        assert S3Service(bucket="my-bucket").get_json("missing.json") is None
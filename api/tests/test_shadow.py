@@ -0,0 +1,176 @@
+"""Unit tests for shadow inference of a candidate model."""
+
+import io
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.inference import CategoryPrediction, ClassificationResult
+from app.main import app
+from app.shadow import ShadowRunner
+
+
+def _result(label: str) -> ClassificationResult:
+    top = CategoryPrediction(label=label, confidence=0.9)
+    return ClassificationResult(top_prediction=top, alternatives=[top])
+
+
+def _candidate(label: str) -> MagicMock:
+    candidate = MagicMock()
+    candidate.predict.return_value = _result(label)
+    return candidate
+
+
+def test_shadow_records_agreement_and_latency_delta() -> None:
+    runner = ShadowRunner(_candidate("cartons"), sample_rate=1.0)
+    assert runner.submit(b"img", _result("cartons"), seconds=0.01)
+    assert runner.submit(b"img", _result("aerosols"), seconds=0.01)
+    runner.join()
+    summary = runner.summary()
+    runner.close()
+    assert summary["agree"] == 1
+    assert summary["disagree"] == 1
+    assert summary["agreement"] == 0.5
+    assert summary["mean_latency_delta_ms"] is not None
+
+
+def test_shadow_respects_sample_rate() -> None:
+    candidate = _candidate("cartons")
+    runner = ShadowRunner(candidate, sample_rate=0.0)
+    assert not runner.submit(b"img", _result("cartons"), seconds=0.01)
+    runner.close()
+    candidate.predict.assert_not_called()
+
+
+def test_shadow_drops_samples_when_queue_is_full() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    candidate = MagicMock()
+
+    def slow_predict(image_bytes: bytes) -> ClassificationResult:
+        started.set()
+        release.wait(5)
+        return _result("cartons")
+
+    candidate.predict.side_effect = slow_predict
+    runner = ShadowRunner(candidate, sample_rate=1.0, queue_size=1)
+    assert runner.submit(b"1", _result("cartons"), seconds=0.01)
+    assert started.wait(5)
+    assert runner.submit(b"2", _result("cartons"), seconds=0.01)  # queued
+    assert not runner.submit(b"3", _result("cartons"), seconds=0.01)  # dropped
+    release.set()
+    runner.join()
+    runner.close()
+    assert runner.summary()["dropped"] == 1
+    assert runner.summary()["agree"] == 2
+
+
+def test_shadow_counts_candidate_errors() -> None:
+    candidate = MagicMock()
+    candidate.predict.side_effect = RuntimeError("boom")
+    runner = ShadowRunner(candidate, sample_rate=1.0)
+    runner.submit(b"img", _result("cartons"), seconds=0.01)
+    runner.join()
+    runner.close()
+    assert runner.summary()["error"] == 1
+    assert runner.summary()["agreement"] is None
+
+
+def test_predict_hands_result_to_shadow() -> None:
+    primary = _result("cartons")
+    model = MagicMock()
+    model.predict.return_value = primary
+    shadow = MagicMock()
+    app.state.model = model
+    app.state.shadow = shadow
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buf, format="JPEG")
+    try:
+        response = TestClient(app).post(
+            "/predict", files={"file": ("a.jpg", buf.getvalue(), "image/jpeg")}
+        )
+    finally:
+        app.state.shadow = None
+    assert response.status_code == 200
+    image_bytes, result, seconds = shadow.submit.call_args.args
+    assert image_bytes == buf.getvalue()
+    assert result is primary
+    assert seconds >= 0
+    assert shadow.submit.call_args.kwargs["in_flight"] == 1
+
+
+def test_shadow_sheds_samples_while_primary_is_busy() -> None:
+    candidate = _candidate("cartons")
+    runner = ShadowRunner(candidate, sample_rate=1.0, max_in_flight=2)
+    assert not runner.submit(b"img", _result("cartons"), seconds=0.01, in_flight=3)
+    assert runner.submit(b"img", _result("cartons"), seconds=0.01, in_flight=2)
+    runner.join()
+    runner.close()
+    assert runner.summary()["shed"] == 1
+    assert candidate.predict.call_count == 1
+
+
+def test_shadow_queue_is_bounded_by_bytes() -> None:
+    release = threading.Event()
+    candidate = MagicMock()
+
+    def blocked_predict(image_bytes: bytes) -> ClassificationResult:
+        release.wait(5)
+        return _result("cartons")
+
+    candidate.predict.side_effect = blocked_predict
+    runner = ShadowRunner(candidate, sample_rate=1.0, queue_bytes=10)
+    assert runner.submit(b"x" * 6, _result("cartons"), seconds=0.01)
+    assert not runner.submit(b"x" * 6, _result("cartons"), seconds=0.01)
+    release.set()
+    runner.join()
+    assert runner.submit(b"x" * 6, _result("cartons"), seconds=0.01)
+    runner.join()
+    runner.close()
+    assert runner.summary()["dropped"] == 1
+    assert runner.summary()["agree"] == 2
+
+
+def test_shadow_loads_after_primary_without_blocking_predict(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import asyncio
+
+    import app.main as main
+    from app.config import settings
+
+    loaded = threading.Event()
+    release = threading.Event()
+    runner = MagicMock()
+
+    def slow_load(path: str) -> MagicMock:
+        release.wait(5)
+        loaded.set()
+        return runner
+
+    model = MagicMock()
+    model.predict.return_value = _result("cartons")
+    monkeypatch.setattr(app.state, "model", None, raising=False)
+    monkeypatch.setattr(app.state, "model_lock", asyncio.Lock(), raising=False)
+    monkeypatch.setattr(app.state, "shadow", None, raising=False)
+    monkeypatch.setattr(settings, "shadow_artifact_path", "candidate.safetensors")
+    monkeypatch.setattr(main, "_load_shadow", slow_load)
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buf, format="JPEG")
+    with patch("app.main.ClassificationModel.from_artifact", return_value=model):
+        response = TestClient(app).post(
+            "/predict", files={"file": ("a.jpg", buf.getvalue(), "image/jpeg")}
+        )
+    assert response.status_code == 200
+    assert app.state.shadow is None  # still loading
+    release.set()
+    assert loaded.wait(5)
+    for _ in range(100):
+        if app.state.shadow is runner:
+            break
+        time.sleep(0.01)
+    assert app.state.shadow is runner
@@ -0,0 +1,287 @@
+"""Micro-benchmarks for training-step, inference and model-load performance.
+
+Compares variants of the shared options in :mod:`recbuddy.optimize` on
+synthetic inputs, and artifact loaders on a real or random artifact. Each
+variant runs in a freshly spawned process so its peak RSS is measured in
+isolation.
+
+Usage:
+    uv run python -m recbuddy.benchmark train --variants fp32,channels_last,bf16 \\
+        --batch-size 32 --steps 20
+    uv run python -m recbuddy.benchmark infer \\
+        --variants fp32,channels_last,fused,compile --batch-size 1 --steps 100
+    uv run python -m recbuddy.benchmark load --variants eager,meta --steps 5 \\
+        [--artifact artifacts/model.safetensors]
+
+``fused`` and ``compile`` are inference-only. ``load`` variants are loaders
+(see ``LOADERS``); ``--steps`` is the number of fresh-process repetitions.
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+import torch
+import torch.nn as nn
+from safetensors.torch import load_file, save_file
+
+from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.modeling import artifact_metadata, build_efficientnet, load_model
+from recbuddy.optimize import (
+    bf16_autocast,
+    optimize_for_inference,
+    optimize_for_training,
+)
+from recbuddy.profiling import latency_ms, peak_rss_mb
+
+# Named option sets; keys mirror the keyword options of recbuddy.optimize.
+VARIANTS: dict[str, dict[str, bool]] = {
+    "fp32": {},
+    "bf16": {"bf16": True},
+    "channels_last": {"channels_last": True},
+    "fused": {"channels_last": True, "fuse": True},
+    "compile": {"channels_last": True, "fuse": True, "compile": True},
+}
+
+_INFERENCE_ONLY: tuple[str, ...] = ("fuse", "compile")
+
+
+def _summarise(times: list[float], batch_size: int) -> dict:
+    """Return latency percentiles, throughput and peak RSS for step times."""
+    mean = statistics.fmean(times) if times else 0.0
+    return {
+        "steps": len(times),
+        **latency_ms(times),
+        "images_per_sec": round(batch_size / mean, 2) if mean else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def _build(variant: str, train: bool) -> tuple[nn.Module, dict[str, bool]]:
+    from recbuddy.train import build_model
+
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant {variant!r}; choose from {sorted(VARIANTS)}")
+    options = VARIANTS[variant]
+    model = build_model(num_classes=len(ALL_LABELS_LIST), pretrained=False)
+    channels_last = options.get("channels_last", False)
+    if train:
+        if any(options.get(key) for key in _INFERENCE_ONLY):
+            raise ValueError(f"Variant {variant!r} is inference-only")
+        model.train()
+        model = optimize_for_training(model, channels_last=channels_last)
+    else:
+        model = optimize_for_inference(
+            model,
+            channels_last=channels_last,
+            fuse=options.get("fuse", False),
+            compile=options.get("compile", False),
+        )
+    return model, options
+
+
+def benchmark_train_step(
+    variant: str,
+    batch_size: int = 32,
+    steps: int = 20,
+    warmup: int = 3,
+    image_size: int = 224,
+    threads: Optional[int] = None,
+) -> dict:
+    """Time full optimisation steps (forward, loss, backward, AdamW step)."""
+    from recbuddy.train import get_optimizer
+
+    if threads:
+        torch.set_num_threads(threads)
+    model, options = _build(variant, train=True)
+    optimizer = get_optimizer(model)
+    criterion = nn.CrossEntropyLoss()
+    images = torch.randn(batch_size, 3, image_size, image_size)
+    labels = torch.randint(0, len(ALL_LABELS_LIST), (batch_size,))
+
+    times: list[float] = []
+    for i in range(warmup + steps):
+        start = time.perf_counter()
+        optimizer.zero_grad()
+        with bf16_autocast(options.get("bf16", False)):
+            loss = criterion(model(images), labels)
+        loss.backward()
+        optimizer.step()
+        if i >= warmup:
+            times.append(time.perf_counter() - start)
+    return _summarise(times, batch_size)
+
+
+def benchmark_inference(
+    variant: str,
+    batch_size: int = 1,
+    steps: int = 100,
+    warmup: int = 5,
+    image_size: int = 224,
+    threads: Optional[int] = None,
+) -> dict:
+    """Time eval-mode forward passes."""
+    if threads:
+        torch.set_num_threads(threads)
+    model, options = _build(variant, train=False)
+    images = torch.randn(batch_size, 3, image_size, image_size)
+
+    times: list[float] = []
+    with torch.inference_mode():
+        for i in range(warmup + steps):
+            start = time.perf_counter()
+            with bf16_autocast(options.get("bf16", False)):
+                model(images)
+            if i >= warmup:
+                times.append(time.perf_counter() - start)
+    return _summarise(times, batch_size)
+
+
+def _load_eager(artifact_path: str) -> nn.Module:
+    """Pre-meta loader: random init, then copy the weights in."""
+    net = build_efficientnet(len(ALL_LABELS_LIST))
+    net.load_state_dict(load_file(artifact_path))
+    return optimize_for_inference(net)
+
+
+# Artifact loaders compared by the ``load`` mode.
+LOADERS: dict[str, Callable[[str], nn.Module]] = {
+    "eager": _load_eager,
+    "meta": load_model,
+}
+
+
+def benchmark_load(loader: str, artifact_path: str) -> dict:
+    """Time one artifact load and measure the RSS it adds.
+
+    Meant to run in a fresh process (see :func:`run_isolated`): peak RSS is
+    monotonic, so the figure before loading is the import baseline.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader {loader!r}; choose from {sorted(LOADERS)}")
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    LOADERS[loader](artifact_path)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    return {
+        "load_ms": round(1000 * elapsed, 3),
+        "peak_rss_mb": round(peak, 1),
+        "load_rss_mb": round(peak - baseline, 1),
+    }
+
+
+def _summarise_loads(runs: list[dict]) -> dict:
+    """Aggregate repeated :func:`benchmark_load` results."""
+    load_ms = sorted(r["load_ms"] for r in runs)
+    return {
+        "runs": len(runs),
+        "mean_load_ms": round(statistics.fmean(load_ms), 3),
+        "p50_load_ms": load_ms[len(load_ms) // 2],
+        "max_peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "max_load_rss_mb": max(r["load_rss_mb"] for r in runs),
+    }
+
+
+def write_random_artifact(path: Path) -> Path:
+    """Write a randomly initialised artifact for load benchmarks."""
+    net = build_efficientnet(len(ALL_LABELS_LIST))
+    save_file(
+        net.state_dict(),
+        str(path),
+        metadata=artifact_metadata(len(ALL_LABELS_LIST)),
+    )
+    return path
+
+
+_MODES: dict[str, Callable[..., dict]] = {
+    "train": benchmark_train_step,
+    "infer": benchmark_inference,
+}
+
+
+def run_isolated(fn: Callable[..., dict], *args: object, **kwargs: object) -> dict:
+    """Run a benchmark function in a fresh process and return its result."""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(fn, *args, **kwargs).result()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark training-step and inference performance options."
+    )
+    parser.add_argument(
+        "mode", choices=sorted([*_MODES, "load"]), help="What to benchmark"
+    )
+    parser.add_argument(
+        "--variants",
+        default=None,
+        help=(
+            f"Comma-separated variants (available: {', '.join(VARIANTS)}; "
+            f"for load: {', '.join(LOADERS)})"
+        ),
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=None, help="Timed iterations")
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument(
+        "--artifact",
+        default=None,
+        help="Artifact for the load mode (default: a random one in a temp dir)",
+    )
+    parser.add_argument("--output", default=None, help="Also write JSON here")
+    return parser.parse_args()
+
+
+def _run_load(variants: list[str], artifact: Optional[str], repeats: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = artifact or str(write_random_artifact(Path(tmp) / "model.safetensors"))
+        return {
+            loader: _summarise_loads(
+                [run_isolated(benchmark_load, loader, path) for _ in range(repeats)]
+            )
+            for loader in variants
+        }
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    kwargs: dict[str, object] = {"image_size": args.image_size, "threads": args.threads}
+    if args.batch_size is not None:
+        kwargs["batch_size"] = args.batch_size
+    if args.steps is not None:
+        kwargs["steps"] = args.steps
+
+    if args.mode == "load":
+        variants = (args.variants or ",".join(LOADERS)).split(",")
+        kwargs = {"artifact": args.artifact, "repeats": args.steps or 5}
+        results = _run_load(variants, args.artifact, args.steps or 5)
+    else:
+        variants = (args.variants or "fp32,channels_last").split(",")
+        results = {
+            variant: run_isolated(_MODES[args.mode], variant, **kwargs)
+            for variant in variants
+        }
+    report = {
+        "mode": args.mode,
+        "config": kwargs,
+        "torch": torch.__version__,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
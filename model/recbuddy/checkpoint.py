@@ -0,0 +1,419 @@
+"""Background checkpoint writing with retention and optional S3 upload.
+
+``train()`` hands each epoch's ``state_dict`` to :class:`AsyncCheckpointWriter`,
+which snapshots the tensors to CPU immediately and does the disk write (and
+S3 upload) on a single background thread, so training continues while the
+checkpoint is serialised. Old checkpoints are pruned to the last ``keep_last``
+plus the best one seen so far. When resuming, the checkpoints already in the
+directory can be adopted on construction so they count towards both.
+
+Each checkpoint is a pair of files:
+  checkpoint_epoch_NNN.safetensors        — model weights (loadable as an artifact)
+  checkpoint_epoch_NNN.state.safetensors  — optimizer, scheduler, phase, epoch,
+                                            best_val_acc and RNG states
+
+Tensors go in the safetensors body; everything else is JSON in its metadata,
+so resuming never unpickles anything.
+"""
+
+import json
+import logging
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import torch
+from safetensors import safe_open
+from safetensors.torch import save_file
+
+logger = logging.getLogger(__name__)
+
+
+_STATE_SUFFIX: str = ".state.safetensors"
+# Weights-file metadata key holding the retention metric (keep-best).
+_METRIC_KEY: str = "checkpoint_metric"
+
+
+def checkpoint_name(epoch: int) -> str:
+    """Return the checkpoint filename for ``epoch``."""
+    return f"checkpoint_epoch_{epoch:03d}.safetensors"
+
+
+def state_path(checkpoint_path: Path) -> Path:
+    """Return the training-state sidecar path for a weights checkpoint."""
+    checkpoint_path = Path(checkpoint_path)
+    return checkpoint_path.with_name(
+        checkpoint_path.name.removesuffix(".safetensors") + _STATE_SUFFIX
+    )
+
+
+# ---------------------------------------------------------------------------
+# Training state
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class TrainingState:
+    """Everything besides the weights needed to resume ``train()`` exactly.
+
+    Attributes:
+        phase: 1 (head only) or 2 (full fine-tune).
+        epoch: Last completed global epoch.
+        best_val_acc: Best validation accuracy so far.
+        optimizer: ``optimizer.state_dict()`` of the active phase.
+        scheduler: ``scheduler.state_dict()`` in Phase 2, else ``None``.
+        rng: ``{"torch": ByteTensor, "numpy": tuple, "python": tuple}``.
+    """
+
+    phase: int
+    epoch: int
+    best_val_acc: float
+    optimizer: dict
+    scheduler: Optional[dict]
+    rng: dict
+
+    @classmethod
+    def capture(
+        cls,
+        phase: int,
+        epoch: int,
+        best_val_acc: float,
+        optimizer: torch.optim.Optimizer,
+        scheduler: Optional[Any] = None,
+    ) -> "TrainingState":
+        """Capture the current optimizer, scheduler and global RNG states."""
+        return cls(
+            phase=phase,
+            epoch=epoch,
+            best_val_acc=best_val_acc,
+            optimizer=optimizer.state_dict(),
+            scheduler=scheduler.state_dict() if scheduler is not None else None,
+            rng={
+                "torch": torch.get_rng_state(),
+                "numpy": np.random.get_state(),
+                "python": random.getstate(),
+            },
+        )
+
+    def restore_rng(self) -> None:
+        """Reset the torch, NumPy and Python global RNGs to the captured state."""
+        torch.set_rng_state(self.rng["torch"])
+        np.random.set_state(self.rng["numpy"])
+        random.setstate(self.rng["python"])
+
+    def to_safetensors(self) -> tuple[dict[str, torch.Tensor], dict[str, str]]:
+        """Split into (tensors, string metadata) for ``save_file``."""
+        tensors: dict[str, torch.Tensor] = {"rng.torch": self.rng["torch"]}
+        np_name, np_keys, np_pos, np_has_gauss, np_gauss = self.rng["numpy"]
+        tensors["rng.numpy"] = torch.from_numpy(np.asarray(np_keys, dtype=np.int64))
+
+        opt_scalars: dict[str, Any] = {}
+        for param_id, param_state in self.optimizer["state"].items():
+            for name, value in param_state.items():
+                if isinstance(value, torch.Tensor):
+                    tensors[f"optimizer.{param_id}.{name}"] = value
+                else:
+                    opt_scalars[f"{param_id}.{name}"] = value
+
+        version, py_internal, py_gauss = self.rng["python"]
+        meta = {
+            "phase": self.phase,
+            "epoch": self.epoch,
+            "best_val_acc": self.best_val_acc,
+            "optimizer": {
+                "param_groups": self.optimizer["param_groups"],
+                "scalars": opt_scalars,
+            },
+            "scheduler": self.scheduler,
+            "rng": {
+                "numpy": [np_name, int(np_pos), int(np_has_gauss), float(np_gauss)],
+                "python": [version, list(py_internal), py_gauss],
+            },
+        }
+        return tensors, {"training_state": json.dumps(meta)}
+
+    @classmethod
+    def from_safetensors(
+        cls, tensors: dict[str, torch.Tensor], metadata: dict[str, str]
+    ) -> "TrainingState":
+        """Inverse of :meth:`to_safetensors`."""
+        meta = json.loads(metadata["training_state"])
+
+        opt_state: dict[int, dict[str, Any]] = defaultdict(dict)
+        for key, value in tensors.items():
+            if key.startswith("optimizer."):
+                _, param_id, name = key.split(".", 2)
+                opt_state[int(param_id)][name] = value
+        for key, value in meta["optimizer"]["scalars"].items():
+            param_id, name = key.split(".", 1)
+            opt_state[int(param_id)][name] = value
+
+        np_name, np_pos, np_has_gauss, np_gauss = meta["rng"]["numpy"]
+        version, py_internal, py_gauss = meta["rng"]["python"]
+        return cls(
+            phase=meta["phase"],
+            epoch=meta["epoch"],
+            best_val_acc=meta["best_val_acc"],
+            optimizer={
+                "state": dict(opt_state),
+                "param_groups": meta["optimizer"]["param_groups"],
+            },
+            scheduler=meta["scheduler"],
+            rng={
+                "torch": tensors["rng.torch"],
+                "numpy": (
+                    np_name,
+                    tensors["rng.numpy"].numpy().astype(np.uint32),
+                    np_pos,
+                    np_has_gauss,
+                    np_gauss,
+                ),
+                "python": (version, tuple(py_internal), py_gauss),
+            },
+        )
+
+
+def load_training_state(checkpoint_path: str | Path) -> Optional[TrainingState]:
+    """Load the training-state sidecar of a checkpoint, if it has one.
+
+    Returns ``None`` for weights-only checkpoints (written before training
+    state was recorded, or final artifacts).
+    """
+    path = state_path(Path(checkpoint_path))
+    if not path.exists():
+        return None
+    with safe_open(str(path), framework="pt") as f:
+        tensors = {key: f.get_tensor(key) for key in f.keys()}
+        metadata = f.metadata() or {}
+    return TrainingState.from_safetensors(tensors, metadata)
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+
+class AsyncCheckpointWriter:
+    """Writes checkpoints on a background thread.
+
+    Writes happen in submission order on one thread, so retention never
+    races with a write. At most ``max_pending`` snapshots are held in
+    memory; :meth:`save` blocks on the oldest write beyond that.
+
+    With ``adopt``, checkpoints already in ``checkpoint_dir`` are adopted in
+    epoch order, with the metric each was saved with, so a resumed run
+    prunes them and keeps the best across both runs. Only the local
+    directory is scanned: earlier uploads live under their own run's
+    ``s3_prefix``. Without it, files from other runs are never touched.
+
+    Args:
+        checkpoint_dir: Local directory for checkpoint files.
+        keep_last: Number of most recent checkpoints to keep. ``None``
+            keeps every checkpoint.
+        keep_best: Also keep the checkpoint with the highest metric.
+        s3_client: Optional boto3 S3 client; when set with ``s3_bucket``,
+            every checkpoint is uploaded after it is written.
+        s3_bucket: Bucket for checkpoint uploads.
+        s3_prefix: Key prefix for checkpoint uploads.
+        max_pending: Maximum snapshots queued before :meth:`save` blocks.
+        adopt: Adopt existing checkpoints in ``checkpoint_dir`` (for a
+            resumed run).
+    """
+
+    def __init__(
+        self,
+        checkpoint_dir: Path,
+        keep_last: Optional[int] = 3,
+        keep_best: bool = True,
+        s3_client: Optional[Any] = None,
+        s3_bucket: Optional[str] = None,
+        s3_prefix: str = "checkpoints/",
+        max_pending: int = 2,
+        adopt: bool = False,
+    ) -> None:
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self._keep_last = keep_last
+        self._keep_best = keep_best
+        self._s3 = s3_client if s3_bucket else None
+        self._s3_bucket = s3_bucket
+        self._s3_prefix = s3_prefix
+        self._max_pending = max(max_pending, 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="checkpoint-writer"
+        )
+        self._pending: list[Future] = []
+        self._written: list[Path] = []
+        self._metrics: dict[Path, float] = {}
+        if adopt:
+            self._adopt_existing()
+
+    def save(
+        self,
+        state_dict: dict[str, torch.Tensor],
+        epoch: int,
+        metric: Optional[float] = None,
+        training_state: Optional[TrainingState] = None,
+    ) -> Future:
+        """Snapshot ``state_dict`` and queue it for writing.
+
+        Args:
+            state_dict: Tensors to save (typically ``model.state_dict()``).
+            epoch: Global epoch number, used in the filename.
+            metric: Higher-is-better score for keep-best retention.
+            training_state: Optional resume state written to the sidecar.
+
+        Returns:
+            Future resolving to the written local path.
+        """
+        self._reap(block=len(self._pending) >= self._max_pending)
+        snapshot = _snapshot(state_dict)
+        state: Optional[tuple[dict[str, torch.Tensor], dict[str, str]]] = None
+        if training_state is not None:
+            state_tensors, state_meta = training_state.to_safetensors()
+            state = (_snapshot(state_tensors), state_meta)
+        future = self._executor.submit(self._write, snapshot, epoch, metric, state)
+        self._pending.append(future)
+        return future
+
+    def wait(self) -> None:
+        """Block until every queued checkpoint is written; re-raise failures."""
+        self._reap(block=True, drain=True)
+
+    def close(self) -> None:
+        """Wait for outstanding writes and stop the background thread."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "AsyncCheckpointWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _adopt_existing(self) -> None:
+        existing = [
+            (epoch, path)
+            for path in self.checkpoint_dir.glob("checkpoint_epoch_*.safetensors")
+            if (epoch := _checkpoint_epoch(path)) is not None
+        ]
+        for _, path in sorted(existing):
+            self._written.append(path)
+            with safe_open(str(path), framework="pt") as f:
+                metric = (f.metadata() or {}).get(_METRIC_KEY)
+            if metric is not None:
+                self._metrics[path] = float(metric)
+        if existing:
+            logger.info(
+                "Adopted %d existing checkpoint(s) in %s",
+                len(existing),
+                self.checkpoint_dir,
+            )
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def _write(
+        self,
+        snapshot: dict[str, torch.Tensor],
+        epoch: int,
+        metric: Optional[float],
+        state: Optional[tuple[dict[str, torch.Tensor], dict[str, str]]],
+    ) -> Path:
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        path = self.checkpoint_dir / checkpoint_name(epoch)
+        files = [path]
+        # Sidecar first: a weights file on disk implies its state is complete.
+        if state is not None:
+            _atomic_save(state[0], state_path(path), state[1])
+            files.insert(0, state_path(path))
+        _atomic_save(
+            snapshot, path, {_METRIC_KEY: repr(metric)} if metric is not None else None
+        )
+        logger.info("Checkpoint saved: %s", path)
+
+        if self._s3 is not None:
+            for file in files:
+                key = f"{self._s3_prefix}{file.name}"
+                self._s3.upload_file(str(file), self._s3_bucket, key)
+                logger.info("Checkpoint uploaded: s3://%s/%s", self._s3_bucket, key)
+
+        # A resumed run rewrites the epochs after its starting checkpoint.
+        if path in self._written:
+            self._written.remove(path)
+        self._written.append(path)
+        self._metrics.pop(path, None)
+        if metric is not None:
+            self._metrics[path] = metric
+        self._apply_retention()
+        return path
+
+    def _apply_retention(self) -> None:
+        if self._keep_last is None:
+            return
+        keep = set(self._written[-self._keep_last :]) if self._keep_last > 0 else set()
+        if self._keep_best and self._metrics:
+            keep.add(max(self._metrics, key=self._metrics.__getitem__))
+        for path in [p for p in self._written if p not in keep]:
+            for file in (path, state_path(path)):
+                if not file.exists():
+                    continue
+                file.unlink()
+                if self._s3 is not None:
+                    self._s3.delete_object(
+                        Bucket=self._s3_bucket, Key=f"{self._s3_prefix}{file.name}"
+                    )
+            self._written.remove(path)
+            self._metrics.pop(path, None)
+            logger.info("Checkpoint pruned: %s", path)
+
+    # ------------------------------------------------------------------
+    # Caller thread
+    # ------------------------------------------------------------------
+
+    def _reap(self, block: bool, drain: bool = False) -> None:
+        """Drop finished futures, re-raising the first failure.
+
+        With ``block``, waits for the oldest pending write (or all of them
+        when ``drain`` is set).
+        """
+        while self._pending:
+            oldest = self._pending[0]
+            if not oldest.done() and not block:
+                break
+            self._pending.pop(0)
+            oldest.result()  # re-raises write/upload errors
+            if not drain:
+                block = False
+
+
+def _snapshot(tensors: dict[str, torch.Tensor]) -> dict[str, torch.Tensor]:
+    """Copy tensors to contiguous CPU memory the caller can no longer mutate."""
+    return {
+        k: v.detach().to("cpu", memory_format=torch.contiguous_format, copy=True)
+        for k, v in tensors.items()
+    }
+
+
+def _checkpoint_epoch(path: Path) -> Optional[int]:
+    """Return the epoch of a weights checkpoint, or ``None`` for other files."""
+    number = path.name.removeprefix("checkpoint_epoch_").removesuffix(".safetensors")
+    return int(number) if number.isdigit() else None
+
+
+def _atomic_save(
+    tensors: dict[str, torch.Tensor],
+    path: Path,
+    metadata: Optional[dict[str, str]] = None,
+) -> None:
+    """Write a safetensors file via a temporary file and rename."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    save_file(tensors, str(tmp_path), metadata=metadata)
+    os.replace(tmp_path, path)
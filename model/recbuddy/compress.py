@@ -0,0 +1,367 @@
+"""Structured pruning of a trained artifact, between ``train`` and ``promote``.
+
+Every inverted-residual block (EfficientNet-B0 ``MBConv``, MobileNetV3
+``InvertedResidual``) expands its input with a 1x1 convolution, runs a
+depthwise convolution over the expanded channels and projects back. Those
+expansion channels hold most of the backbone's weights and multiply-adds,
+and removing one shrinks four convolutions and two BatchNorms without
+touching the block's input or output shape. This stage:
+
+1. ranks each block's expansion channels by magnitude — the depthwise
+   BatchNorm scale times the L1 norm of the projection weights reading the
+   channel — and keeps the top ``1 - prune_ratio`` (rounded to a multiple
+   of 8);
+2. fine-tunes the pruned model for a few epochs on the training split;
+3. re-evaluates both models on the validation split with
+   :func:`recbuddy.evaluate.compute_metrics` and times them with
+   :func:`recbuddy.evaluate.measure_latency_ms`;
+4. writes the smaller artifact (its widths in the safetensors metadata, so
+   :func:`recbuddy.modeling.load_model` and the API load it directly) and a
+   ``compression.json`` manifest next to it.
+
+``recbuddy.promote`` reads that manifest and refuses artifacts whose
+accuracy or latency regress beyond its thresholds.
+
+Usage:
+    uv run python -m recbuddy.compress \
+        --artifact artifacts/model.safetensors \
+        --s3-bucket recycling-buddy-training \
+        --output-dir artifacts/pruned \
+        --prune-ratio 0.3
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import torch
+import torch.nn as nn
+from safetensors.torch import save_file
+from torch.utils.data import DataLoader
+
+from recbuddy.dataset import WasteDataset
+from recbuddy.evaluate import compute_metrics, measure_latency_ms
+from recbuddy.logit_cache import file_sha256
+from recbuddy.modeling import (
+    artifact_metadata,
+    expansion_blocks,
+    expansion_widths,
+    load_model,
+    prune_expansion,
+    read_header,
+)
+from recbuddy.optimize import contiguous_state_dict, optimize_for_training
+from recbuddy.train import set_seeds, train_one_epoch
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME: str = "compression.json"
+DEFAULT_PRUNE_RATIO: float = 0.3
+CHANNEL_MULTIPLE: int = 8
+
+
+# ---------------------------------------------------------------------------
+# Pruning
+# ---------------------------------------------------------------------------
+
+
+def channel_importance(block: nn.Sequential) -> torch.Tensor:
+    """Return a magnitude score for each expansion channel of ``block``.
+
+    The depthwise BatchNorm scale says how strongly a channel is passed on;
+    the L1 norm of the projection weights reading it says how much the
+    block's output depends on it.
+    """
+    dw_bn = block[1][1]
+    project = block[-1][0]
+    outgoing = project.weight.detach().abs().sum(dim=(0, 2, 3))
+    return dw_bn.weight.detach().abs() * outgoing
+
+
+def _kept_width(width: int, prune_ratio: float) -> int:
+    kept = round(width * (1 - prune_ratio) / CHANNEL_MULTIPLE) * CHANNEL_MULTIPLE
+    return min(width, max(CHANNEL_MULTIPLE, kept))
+
+
+def prune_model(net: nn.Module, prune_ratio: float) -> list[int]:
+    """Remove the lowest-scoring expansion channels of every block, in place.
+
+    Args:
+        net: Model with stock or already-pruned widths.
+        prune_ratio: Fraction of each block's expansion channels to remove.
+
+    Returns:
+        The new expansion widths, for :func:`recbuddy.modeling.artifact_metadata`.
+
+    Raises:
+        ValueError: If ``prune_ratio`` is outside [0, 1).
+    """
+    if not 0.0 <= prune_ratio < 1.0:
+        raise ValueError(f"prune_ratio must be in [0, 1), got {prune_ratio}")
+    for block in expansion_blocks(net):
+        scores = channel_importance(block)
+        width = _kept_width(len(scores), prune_ratio)
+        if width == len(scores):
+            continue
+        keep = torch.topk(scores, width).indices.sort().values
+        prune_expansion(block, keep)
+    return expansion_widths(net)
+
+
+def parameter_count(net: nn.Module) -> int:
+    """Return the number of parameters in ``net``."""
+    return sum(p.numel() for p in net.parameters())
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+def _macro_f1(metrics: dict) -> float:
+    detail = metrics["per_category_detail"].values()
+    return sum(d["f1"] for d in detail) / max(len(detail), 1)
+
+
+def _summary(metrics: dict, latency_ms: float, size_bytes: int, params: int) -> dict:
+    return {
+        "top1_accuracy": round(metrics["overall_top1_accuracy"], 4),
+        "top3_accuracy": round(metrics["overall_top3_accuracy"], 4),
+        "macro_f1": round(_macro_f1(metrics), 4),
+        "latency_ms": round(latency_ms, 3),
+        "size_bytes": size_bytes,
+        "parameters": params,
+    }
+
+
+def compression_report(before: dict, after: dict) -> dict:
+    """Return ``after - before`` for every summary field, plus size/latency ratios.
+
+    Args:
+        before: Summary of the source artifact.
+        after: Summary of the compressed artifact.
+    """
+    deltas = {
+        key: round(after[key] - before[key], 4)
+        for key in ("top1_accuracy", "top3_accuracy", "macro_f1", "latency_ms")
+    }
+    deltas["size_bytes"] = after["size_bytes"] - before["size_bytes"]
+    deltas["parameters"] = after["parameters"] - before["parameters"]
+    return {
+        "before": before,
+        "after": after,
+        "deltas": deltas,
+        "size_ratio": round(after["size_bytes"] / max(before["size_bytes"], 1), 4),
+        "latency_ratio": round(
+            after["latency_ms"] / max(before["latency_ms"], 1e-9), 4
+        ),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+def compress(
+    artifact: Path,
+    s3_bucket: str,
+    output_dir: Path,
+    prune_ratio: float = DEFAULT_PRUNE_RATIO,
+    fine_tune_epochs: int = 2,
+    lr: float = 1e-4,
+    batch_size: int = 32,
+    seed: int = 42,
+    bf16: bool = False,
+    latency_iterations: int = 20,
+    s3_endpoint_url: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    region_name: str = "us-east-1",
+) -> Path:
+    """Prune, fine-tune and re-evaluate ``artifact``.
+
+    Args:
+        artifact: Trained ``.safetensors`` artifact.
+        s3_bucket: S3 bucket with the labeled images.
+        output_dir: Directory for ``model.safetensors`` and ``compression.json``.
+        prune_ratio: Fraction of each block's expansion channels to remove.
+        fine_tune_epochs: Epochs of full fine-tuning after pruning.
+        lr: AdamW learning rate for the fine-tune.
+        batch_size: DataLoader batch size.
+        seed: Random seed; also selects the train/val split.
+        bf16: Fine-tune under bfloat16 autocast.
+        latency_iterations: Timed single-image forwards per model.
+        s3_endpoint_url: Optional S3 endpoint for LocalStack.
+        aws_access_key_id: Optional AWS access key.
+        aws_secret_access_key: Optional AWS secret key.
+        region_name: AWS region.
+
+    Returns:
+        Path to the compressed artifact.
+    """
+    set_seeds(seed)
+    artifact = Path(artifact)
+    output_dir = Path(output_dir)
+    num_classes, metadata = read_header(str(artifact))
+    architecture = metadata["architecture"]
+
+    dataset = WasteDataset(
+        s3_bucket=s3_bucket,
+        endpoint_url=s3_endpoint_url,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+    )
+    dataset.download()
+    train_ds, val_ds, _ = dataset.get_splits(seed=seed)
+    class_to_idx = dataset.class_to_idx
+    labels = sorted(class_to_idx, key=lambda k: class_to_idx[k])
+    # A dedicated generator fixes the shuffle order and any worker seeds
+    # independently of how much global RNG pruning and fine-tuning consume.
+    train_loader = DataLoader(
+        train_ds,
+        batch_size=batch_size,
+        shuffle=True,
+        generator=torch.Generator().manual_seed(seed),
+    )
+    val_loader = DataLoader(val_ds, batch_size=batch_size, shuffle=False)
+
+    # Parameters are counted before inference optimisation folds BatchNorm.
+    net = load_model(str(artifact), num_classes=num_classes, optimize=False)
+    params_before = parameter_count(net)
+    widths = prune_model(net, prune_ratio)
+    params_after = parameter_count(net)
+    logger.info(
+        "Pruned %.0f%% of expansion channels: %d -> %d parameters",
+        prune_ratio * 100,
+        params_before,
+        params_after,
+    )
+
+    source = load_model(str(artifact), num_classes=num_classes)
+    before = _summary(
+        compute_metrics(source, val_loader, labels),
+        measure_latency_ms(source, iterations=latency_iterations),
+        artifact.stat().st_size,
+        params_before,
+    )
+    del source
+
+    optimize_for_training(net)
+    optimizer = torch.optim.AdamW(net.parameters(), lr=lr)
+    criterion = nn.CrossEntropyLoss(label_smoothing=0.1)
+    for epoch in range(1, fine_tune_epochs + 1):
+        loss = train_one_epoch(net, train_loader, optimizer, criterion, bf16=bf16)
+        logger.info("Fine-tune epoch %d/%d — loss %.4f", epoch, fine_tune_epochs, loss)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    artifact_path = output_dir / "model.safetensors"
+    save_file(
+        contiguous_state_dict(net),
+        str(artifact_path),
+        metadata=artifact_metadata(num_classes, architecture, widths=widths),
+    )
+    del net
+
+    # Reload through the same loader the API uses.
+    pruned = load_model(str(artifact_path), num_classes=num_classes)
+    after = _summary(
+        compute_metrics(pruned, val_loader, labels),
+        measure_latency_ms(pruned, iterations=latency_iterations),
+        artifact_path.stat().st_size,
+        params_after,
+    )
+
+    manifest = {
+        "source": str(artifact),
+        "source_sha256": file_sha256(artifact),
+        "artifact": str(artifact_path),
+        "artifact_sha256": file_sha256(artifact_path),
+        "architecture": architecture,
+        "prune_ratio": prune_ratio,
+        "fine_tune_epochs": fine_tune_epochs,
+        "seed": seed,
+        "split": "val",
+        "widths": widths,
+        "timestamp": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()),
+        **compression_report(before, after),
+    }
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    # Carry the training sidecar along so promote still records provenance.
+    sidecars = sorted(artifact.parent.glob("training_run_*.json"), reverse=True)
+    if sidecars and artifact.parent.resolve() != output_dir.resolve():
+        shutil.copy2(sidecars[0], output_dir / sidecars[0].name)
+    logger.info(
+        "Compressed artifact: %s (%.0f%% size, top-1 %+.4f, latency %+.2f ms)",
+        artifact_path,
+        manifest["size_ratio"] * 100,
+        manifest["deltas"]["top1_accuracy"],
+        manifest["deltas"]["latency_ms"],
+    )
+    return artifact_path
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Prune and fine-tune a trained artifact before promotion."
+    )
+    parser.add_argument("--artifact", required=True, help="Trained .safetensors")
+    parser.add_argument(
+        "--s3-bucket", required=True, help="S3 bucket with labeled images"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="artifacts/pruned",
+        help="Directory for the compressed artifact (default: artifacts/pruned)",
+    )
+    parser.add_argument(
+        "--prune-ratio",
+        type=float,
+        default=DEFAULT_PRUNE_RATIO,
+        help="Fraction of expansion channels to remove per block "
+        f"(default: {DEFAULT_PRUNE_RATIO})",
+    )
+    parser.add_argument("--fine-tune-epochs", type=int, default=2)
+    parser.add_argument("--lr", type=float, default=1e-4)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--bf16", action="store_true", help="Fine-tune with bfloat16 autocast"
+    )
+    parser.add_argument(
+        "--s3-endpoint-url", default=None, help="S3 endpoint URL (for LocalStack)"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = _parse_args()
+    path = compress(
+        artifact=Path(args.artifact),
+        s3_bucket=args.s3_bucket,
+        output_dir=Path(args.output_dir),
+        prune_ratio=args.prune_ratio,
+        fine_tune_epochs=args.fine_tune_epochs,
+        lr=args.lr,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        bf16=args.bf16,
+        s3_endpoint_url=args.s3_endpoint_url,
+        aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.environ.get("AWS_REGION", "us-east-1"),
+    )
+    print(f"Compression complete. Artifact: {path}")
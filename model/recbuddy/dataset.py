@@ -2,18 +2,125 @@
 
 Downloads labeled images from S3 into model/data/ and wraps them as a
 torchvision ImageFolder dataset with train/val/test splits.
+
+Splits are stratified by label and ordered by a hash of each image's
+S3-style key (``<label>/<filename>``), so they are deterministic and adding
+images to one label never moves images of another.
 """
 
+import hashlib
+import logging
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 import boto3
 from botocore.exceptions import ClientError
 from torch.utils.data import Subset
 from torchvision.datasets import ImageFolder
 
+from recbuddy.labels import ALL_LABELS_LIST
 from recbuddy.transforms import inference_transform, training_transform
 
+logger = logging.getLogger(__name__)
+
+# 2**64 — maps the first 8 bytes of a sha256 digest onto [0, 1).
+_HASH_SPACE: int = 1 << 64
+
+# Labels with fewer images are split by rank so each split gets at least one;
+# larger labels are split by fixed bucket thresholds.
+SMALL_LABEL_SIZE: int = 20
+
+
+def split_bucket(key: str, seed: int = 42) -> float:
+    """Return a stable pseudo-random value in [0, 1) for a sample key.
+
+    The value depends only on ``key`` and ``seed``, never on which other
+    images exist, so a given image always lands in the same split.
+
+    Args:
+        key: Sample key relative to the data root, e.g. ``"cartons/abc.jpg"``.
+        seed: Salt; changing it deliberately reshuffles every split.
+    """
+    digest = hashlib.sha256(f"{seed}:{key}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / _HASH_SPACE
+
+
+def _split_cuts(n: int, val_frac: float, test_frac: float) -> tuple[int, int]:
+    """Return ``(test_end, val_end)`` positions for ``n`` ranked images.
+
+    Only used for labels below :data:`SMALL_LABEL_SIZE`.
+
+    With at least three images, every split with a non-zero fraction gets
+    at least one of them.
+    """
+    test_end = round(n * test_frac)
+    val_end = round(n * (test_frac + val_frac))
+    if n >= 3:
+        if test_frac > 0:
+            test_end = max(test_end, 1)
+        if val_frac > 0:
+            val_end = max(val_end, test_end + 1)
+        val_end = min(val_end, n - 1)
+        test_end = min(test_end, val_end - (1 if val_frac > 0 else 0))
+    return test_end, val_end
+
+
+def stratified_split(
+    keys: Sequence[str],
+    labels: Sequence[int],
+    val_frac: float = 0.15,
+    test_frac: float = 0.15,
+    seed: int = 42,
+) -> tuple[list[int], list[int], list[int]]:
+    """Split sample indices into train, val and test by :func:`split_bucket`.
+
+    An image goes to test if its bucket is below ``test_frac``, to
+    validation if it is below ``test_frac + val_frac`` and to training
+    otherwise. Its split therefore depends only on its key and ``seed``:
+    adding or removing other images never moves it, so no image can leak
+    from val/test into train, and each label is stratified in expectation.
+
+    Labels with fewer than :data:`SMALL_LABEL_SIZE` images are instead
+    ranked by bucket and cut at ``round(n * test_frac)`` and
+    ``round(n * (test_frac + val_frac))``, so one with at least three
+    images appears in every split. Their assignment is fixed once they
+    reach that size.
+
+    Args:
+        keys: Sample key of each index (see :meth:`WasteDataset.sample_keys`).
+        labels: Class index of each sample.
+        val_frac: Fraction of each label reserved for validation.
+        test_frac: Fraction of each label reserved for testing.
+        seed: Hash salt for :func:`split_bucket`.
+
+    Returns:
+        ``(train, val, test)`` index lists, each in ascending order.
+    """
+    by_label: dict[int, list[tuple[float, int]]] = defaultdict(list)
+    for idx, (key, label) in enumerate(zip(keys, labels)):
+        by_label[label].append((split_bucket(key, seed), idx))
+
+    train_idx: list[int] = []
+    val_idx: list[int] = []
+    test_idx: list[int] = []
+    for members in by_label.values():
+        if len(members) >= SMALL_LABEL_SIZE:
+            for bucket, idx in members:
+                if bucket < test_frac:
+                    test_idx.append(idx)
+                elif bucket < test_frac + val_frac:
+                    val_idx.append(idx)
+                else:
+                    train_idx.append(idx)
+            continue
+        ranked = [idx for _, idx in sorted(members)]
+        test_end, val_end = _split_cuts(len(ranked), val_frac, test_frac)
+        test_idx.extend(ranked[:test_end])
+        val_idx.extend(ranked[test_end:val_end])
+        train_idx.extend(ranked[val_end:])
+    return sorted(train_idx), sorted(val_idx), sorted(test_idx)
+
 
 class WasteDataset:
     """Downloads labeled waste images from S3 and provides train/val/test splits.
@@ -78,10 +185,14 @@ class WasteDataset:
     ) -> tuple[Subset, Subset, Subset]:
         """Return (train, val, test) datasets derived from the downloaded images.
 
+        See :func:`stratified_split`. Each image's split is fixed by its
+        key and ``seed`` (for labels of at least :data:`SMALL_LABEL_SIZE`
+        images), so adding images never moves an existing one.
+
         Args:
             val_frac: Fraction of images reserved for validation.
             test_frac: Fraction of images reserved for testing.
-            seed: Random seed for reproducible splits.
+            seed: Hash salt for reproducible splits.
 
         Returns:
             Tuple of (train_dataset, val_dataset, test_dataset).
@@ -100,28 +211,72 @@ class WasteDataset:
             transform=inference_transform(),
         )
 
-        n = len(full_dataset)
-        n_val = int(n * val_frac)
-        n_test = int(n * test_frac)
-        n_train = n - n_val - n_test
-
-        import torch
-
-        generator = torch.Generator().manual_seed(seed)
-        train_ds, val_ds, test_ds = torch.utils.data.random_split(
-            full_dataset,
-            [n_train, n_val, n_test],
-            generator=generator,
+        train_idx, val_idx, test_idx = stratified_split(
+            self.sample_keys(full_dataset),
+            full_dataset.targets,
+            val_frac=val_frac,
+            test_frac=test_frac,
+            seed=seed,
         )
 
-        # Override transform on training subset to use augmented pipeline
-        train_ds.dataset = ImageFolder(
-            root=str(self.data_dir),
-            transform=training_transform(),
+        self._log_split_counts(full_dataset, train_idx, val_idx, test_idx)
+
+        # Training subset uses the augmented pipeline
+        train_ds = Subset(
+            ImageFolder(root=str(self.data_dir), transform=training_transform()),
+            train_idx,
         )
+        val_ds = Subset(full_dataset, val_idx)
+        test_ds = Subset(full_dataset, test_idx)
 
         return train_ds, val_ds, test_ds
 
+    def sample_keys(self, dataset: ImageFolder) -> list[str]:
+        """Return the ``<label>/<filename>`` key of every sample in ``dataset``.
+
+        Keys mirror the S3 object keys, so they are stable across machines.
+        """
+        return [
+            Path(path).relative_to(self.data_dir).as_posix()
+            for path, _ in dataset.samples
+        ]
+
+    @staticmethod
+    def _log_split_counts(
+        dataset: ImageFolder,
+        train_idx: list[int],
+        val_idx: list[int],
+        test_idx: list[int],
+    ) -> None:
+        """Log per-label split sizes in ``ALL_LABELS_LIST`` order."""
+        idx_to_class = {i: c for c, i in dataset.class_to_idx.items()}
+        counts = {
+            name: Counter(idx_to_class[dataset.targets[i]] for i in indices)
+            for name, indices in (
+                ("train", train_idx),
+                ("val", val_idx),
+                ("test", test_idx),
+            )
+        }
+        ordered = [lbl for lbl in ALL_LABELS_LIST if lbl in dataset.class_to_idx]
+        unknown = sorted(set(dataset.class_to_idx) - set(ALL_LABELS_LIST))
+        if unknown:
+            logger.warning("Data contains labels not in ALL_LABELS_LIST: %s", unknown)
+        for label in ordered + unknown:
+            logger.debug(
+                "Split %s: train=%d val=%d test=%d",
+                label,
+                counts["train"][label],
+                counts["val"][label],
+                counts["test"][label],
+            )
+        logger.info(
+            "Splits: train=%d val=%d test=%d",
+            len(train_idx),
+            len(val_idx),
+            len(test_idx),
+        )
+
     @property
     def class_to_idx(self) -> dict[str, int]:
         """Return the label → class index mapping from the ImageFolder."""
@@ -0,0 +1,178 @@
+"""Knowledge distillation from a trained teacher artifact.
+
+``recbuddy.train --teacher <artifact>`` trains a (usually smaller) student
+with the standard distillation loss (Hinton et al., 2015):
+
+    loss = alpha * T**2 * KL(softmax(teacher / T) || softmax(student / T))
+           + (1 - alpha) * CE(student, label)
+
+Matching the teacher at temperature ``T`` transfers its ranking of the
+wrong classes; the ``T**2`` factor keeps that term's gradients on the same
+scale as the cross-entropy. The student is served at ``T = 1``, so its
+confidences stay comparable with a model trained on labels alone.
+
+Teacher logits for the training split are computed once, on the
+un-augmented inference view of each image, and stored in the logit cache
+(:mod:`recbuddy.logit_cache`) keyed by the teacher's sha256 and the split's
+membership (see :func:`teacher_split_id`). Every epoch, and every later run
+with the same teacher and data, reuses them without loading the teacher.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, Dataset, Subset
+
+from recbuddy import logit_cache
+from recbuddy.modeling import load_model
+from recbuddy.transforms import inference_transform, with_transform
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPERATURE: float = 4.0
+DEFAULT_ALPHA: float = 0.7
+
+
+def teacher_split_id(keys: Sequence[str]) -> str:
+    """Return the logit-cache split id for the teacher's training-split logits.
+
+    The view is part of the id: ``evaluate --split train`` caches logits of
+    the augmented training view under ``split_id("train", ...)``, which must
+    not be read back as teacher targets.
+    """
+    return logit_cache.split_id("train.inference", keys)
+
+
+def teacher_logits(
+    teacher_artifact: str,
+    subset: Subset,
+    split: str,
+    num_classes: int,
+    cache_dir: str | Path | None = "cache/logits",
+    batch_size: int = 64,
+    bf16: bool = False,
+) -> logit_cache.LogitRecord:
+    """Return the teacher's logits for ``subset``, computing them on a cache miss.
+
+    Args:
+        teacher_artifact: Path to the teacher's ``.safetensors`` artifact.
+        subset: Training split; read through the inference transform.
+        split: Split id from :func:`teacher_split_id`.
+        num_classes: Expected number of classes of the teacher.
+        cache_dir: Logit store root, or ``None`` to always run the teacher.
+        batch_size: Teacher inference batch size.
+        bf16: Run the teacher under bfloat16 autocast.
+    """
+    inference_subset = with_transform(subset, inference_transform())
+
+    def _infer() -> logit_cache.LogitRecord:
+        teacher = load_model(teacher_artifact, num_classes=num_classes)
+        loader = DataLoader(inference_subset, batch_size=batch_size, shuffle=False)
+        return logit_cache.collect_logits(
+            teacher, loader, inference_subset.indices, bf16=bf16
+        )
+
+    if cache_dir is None:
+        return _infer()
+    sha256 = logit_cache.file_sha256(teacher_artifact)
+    return logit_cache.load_or_compute(cache_dir, sha256, split, _infer)
+
+
+class DistillationLoss(nn.Module):
+    """Hinton distillation loss against precomputed teacher logits.
+
+    Called as ``criterion(student_logits, (labels, teacher_logits))``, the
+    target batch that :class:`TeacherLogitDataset` yields.
+
+    Args:
+        temperature: Softmax temperature for both models in the KL term;
+            higher values expose more of the teacher's ranking of the
+            wrong classes.
+        alpha: Weight of the KL term; ``0`` is plain cross-entropy.
+        label_smoothing: Applied to the cross-entropy term only.
+
+    Raises:
+        ValueError: If ``alpha`` is outside [0, 1] or ``temperature`` <= 0.
+    """
+
+    def __init__(
+        self,
+        temperature: float = DEFAULT_TEMPERATURE,
+        alpha: float = DEFAULT_ALPHA,
+        label_smoothing: float = 0.0,
+    ) -> None:
+        super().__init__()
+        if not 0.0 <= alpha <= 1.0:
+            raise ValueError(f"alpha must be in [0, 1], got {alpha}")
+        if temperature <= 0:
+            raise ValueError(f"temperature must be positive, got {temperature}")
+        self.temperature = temperature
+        self.alpha = alpha
+        self.hard = nn.CrossEntropyLoss(label_smoothing=label_smoothing)
+
+    def forward(
+        self,
+        student_logits: torch.Tensor,
+        target: tuple[torch.Tensor, torch.Tensor],
+    ) -> torch.Tensor:
+        labels, teacher = target
+        student = student_logits.float()
+        t = self.temperature
+        kd = F.kl_div(
+            F.log_softmax(student / t, dim=1),
+            F.log_softmax(teacher.float() / t, dim=1),
+            reduction="batchmean",
+            log_target=True,
+        )
+        return self.alpha * t * t * kd + (1 - self.alpha) * self.hard(student, labels)
+
+
+class TeacherLogitDataset(Dataset):
+    """Yield ``(image, (label, teacher_logits))`` for a training subset.
+
+    Teacher rows are matched to samples by dataset index, so the record may
+    be in any order but must cover every sample.
+
+    Args:
+        subset: Training split (its own transform, e.g. augmentation, is kept).
+        record: Teacher logits from :func:`teacher_logits`.
+
+    Raises:
+        ValueError: If the record is missing samples of ``subset``.
+    """
+
+    def __init__(self, subset: Subset, record: logit_cache.LogitRecord) -> None:
+        position = {idx: row for row, idx in enumerate(record.indices.tolist())}
+        missing = [i for i in subset.indices if i not in position]
+        if missing:
+            raise ValueError(
+                f"Teacher logits are missing {len(missing)} training samples"
+            )
+        rows = torch.as_tensor([position[i] for i in subset.indices])
+        self.subset = subset
+        self.logits = record.logits[rows].float()
+
+    def __len__(self) -> int:
+        return len(self.subset)
+
+    def __getitem__(self, i: int) -> tuple[torch.Tensor, tuple[int, torch.Tensor]]:
+        image, label = self.subset[i]
+        return image, (label, self.logits[i])
+
+
+def distillation_metadata(
+    teacher_artifact: Optional[str], temperature: float, alpha: float
+) -> Optional[dict]:
+    """Return the ``distillation`` entry of the training-run sidecar."""
+    if teacher_artifact is None:
+        return None
+    return {
+        "teacher": str(teacher_artifact),
+        "teacher_sha256": logit_cache.file_sha256(teacher_artifact),
+        "temperature": temperature,
+        "alpha": alpha,
+    }
@@ -2,11 +2,42 @@
 
 Loads a trained safetensors artifact and computes:
   - overall top-1 and top-3 accuracy
-  - per-category top-1 accuracy
+  - per-category top-1 accuracy (plus precision / recall / F1)
   - most-confused category pairs (sorted by confusion count)
 
+All metrics are derived from a single confusion matrix accumulated with
+``torch.bincount``; there is no per-sample Python loop.
+
+Per-sample logits are cached per (artifact sha256, split id) by
+:mod:`recbuddy.logit_cache`, so re-running with a different ``--top-k`` or
+``--low-accuracy-threshold`` does not re-run the model.
+
+With ``--workers N`` inference is sharded across N processes, each loading
+the artifact once with ``--threads-per-worker`` intra-op threads; the
+shards' logits are concatenated in dataset order before metrics are built.
+
+With ``--bf16`` inference runs under bfloat16 autocast and the report gains a
+``bf16_parity`` section comparing it against fp32 logits for the same split.
+
+Every report has a ``calibration`` section with the softmax temperature that
+minimises NLL on the split; fit it on ``--split val`` and serve it with the
+API's ``INFERENCE_TEMPERATURE``.
+
+With ``--cascade-artifact`` a cheaper first-stage model (e.g. a
+``mobilenet_v3_small`` artifact from ``recbuddy.train --architecture``) is
+evaluated too. The ``cascade`` section reports accuracy, the first stage's
+share of images and the expected per-image latency at each
+``--cascade-thresholds`` value, for the API's ``CASCADE_THRESHOLD``.
+
+With ``--tta`` the logits of every test-time augmentation view
+(:mod:`recbuddy.tta`) are collected in one batched pass per batch, and the
+report gains a ``tta`` section. It compares single-pass accuracy, always-on
+TTA, and adaptive TTA at each ``--tta-thresholds`` value with the forward
+passes per image it costs. Use it to pick the API's
+``INFERENCE_TTA_THRESHOLD``.
+
 Usage:
-    uv run python -m src.evaluate \\
+    uv run python -m recbuddy.evaluate \\
         --artifact model/artifacts/efficientnet_b0_recycling_v1.safetensors \\
         --s3-bucket recycling-buddy-training \\
         --split test
@@ -15,57 +46,75 @@ Usage:
 import argparse
 import json
 import logging
+import multiprocessing
 import os
+import statistics
 import sys
-from collections import defaultdict
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence
 
 import torch
 import torch.nn as nn
-import torchvision.models as models
-from safetensors.torch import load_file
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, Subset
 
+from recbuddy import logit_cache
 from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.modeling import load_model
+from recbuddy.optimize import bf16_autocast
+from recbuddy.transforms import tta_transform, with_transform
+from recbuddy.tta import TTA_VIEWS, TTAModel, average_probabilities
 
 logger = logging.getLogger(__name__)
 
-_EFFICIENTNET_FEATURE_DIM: int = 1280
 _NUM_CLASSES: int = len(ALL_LABELS_LIST)
 
 # Low-accuracy threshold — categories below this trigger a stderr warning.
 _LOW_ACCURACY_THRESHOLD: float = 0.60
 
+_DEFAULT_CACHE_DIR: str = "cache/logits"
+
+_DEFAULT_TTA_THRESHOLDS: tuple[float, ...] = (0.3, 0.5, 0.7)
+_DEFAULT_CASCADE_THRESHOLDS: tuple[float, ...] = (0.7, 0.8, 0.9, 0.95)
+
+# Model held by each sharded-evaluation worker process; set by _init_worker.
+_WORKER_MODEL: Optional[nn.Module] = None
+
 
 # ---------------------------------------------------------------------------
 # Artifact loading
 # ---------------------------------------------------------------------------
 
 
-def load_artifact(artifact_path: str, num_classes: int = _NUM_CLASSES) -> nn.Module:
-    """Load a trained EfficientNet-B0 from a safetensors file.
+def load_artifact(
+    artifact_path: str,
+    num_classes: int = _NUM_CLASSES,
+    optimize: bool = True,
+    compile: bool = False,
+) -> nn.Module:
+    """Load a trained classifier from a safetensors file.
+
+    The architecture is read from the artifact's metadata (see
+    :func:`recbuddy.modeling.read_header`).
 
     Args:
         artifact_path: Path to a ``.safetensors`` state-dict file.
         num_classes: Number of output classes the model was trained with.
+        optimize: Apply channels_last and Conv-BN fusion, as the API does
+            (see :func:`recbuddy.optimize.optimize_for_inference`).
+        compile: Additionally wrap the model with ``torch.compile``.
 
     Returns:
-        EfficientNet-B0 in ``eval()`` mode with loaded weights.
+        The model in ``eval()`` mode with loaded weights.
 
     Raises:
         FileNotFoundError: If ``artifact_path`` does not exist.
+        ValueError: If the artifact does not have ``num_classes`` outputs.
     """
-    if not os.path.exists(artifact_path):
-        raise FileNotFoundError(
-            f"Model artifact not found: {artifact_path}. "
-            "Run the training pipeline to produce an artifact first."
-        )
-
-    net = models.efficientnet_b0(weights=None)
-    net.classifier[1] = nn.Linear(_EFFICIENTNET_FEATURE_DIM, num_classes)
-    net.load_state_dict(load_file(artifact_path))
-    net.eval()
-    logger.info("Loaded artifact: %s", artifact_path)
-    return net
+    return load_model(
+        artifact_path, num_classes=num_classes, optimize=optimize, compile=compile
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -73,6 +122,85 @@ def load_artifact(artifact_path: str, num_classes: int = _NUM_CLASSES) -> nn.Mod
 # ---------------------------------------------------------------------------
 
 
+def confusion_matrix(
+    targets: torch.Tensor, preds: torch.Tensor, num_classes: int
+) -> torch.Tensor:
+    """Return the ``(num_classes, num_classes)`` confusion count matrix.
+
+    Rows are true labels, columns are predicted labels.
+    """
+    flat = targets.long() * num_classes + preds.long()
+    counts = torch.bincount(flat, minlength=num_classes * num_classes)
+    return counts.reshape(num_classes, num_classes)
+
+
+def topk_hits(logits: torch.Tensor, targets: torch.Tensor, k: int = 3) -> int:
+    """Return how many rows of ``logits`` contain their target in the top ``k``."""
+    k = min(k, logits.size(1))
+    top = logits.topk(k, dim=1).indices
+    return int((top == targets.unsqueeze(1)).any(dim=1).sum())
+
+
+def metrics_from_confusion(
+    confusion: torch.Tensor,
+    topk_correct: int,
+    labels: list[str],
+    top_k: int = 3,
+) -> dict:
+    """Build the metrics report from an accumulated confusion matrix.
+
+    Args:
+        confusion: ``(C, C)`` count matrix from :func:`confusion_matrix`.
+        topk_correct: Number of samples whose target was in the top ``top_k``.
+        labels: ``labels[i]`` is the class name for class index ``i``.
+        top_k: The k used to compute ``topk_correct``.
+
+    Returns:
+        The report described in :func:`compute_metrics`.
+    """
+    confusion = confusion.double()
+    correct = confusion.diagonal()
+    support = confusion.sum(dim=1)
+    predicted = confusion.sum(dim=0)
+    total = max(int(support.sum()), 1)
+
+    recall = correct / support.clamp(min=1)
+    precision = correct / predicted.clamp(min=1)
+    denom = precision + recall
+    f1 = torch.where(denom > 0, 2 * precision * recall / denom.clamp(min=1e-12), 0.0)
+
+    off_diagonal = confusion.clone()
+    off_diagonal.fill_diagonal_(0)
+    pairs = off_diagonal.nonzero()
+    pair_counts = off_diagonal[pairs[:, 0], pairs[:, 1]]
+    order = torch.argsort(pair_counts, descending=True, stable=True)
+    confused_pairs: list[tuple[str, str, int]] = [
+        (labels[t], labels[p], int(c))
+        for (t, p), c in zip(pairs[order].tolist(), pair_counts[order].tolist())
+    ]
+
+    recall_l = recall.tolist()
+    precision_l = precision.tolist()
+    f1_l = f1.tolist()
+    support_l = support.long().tolist()
+
+    return {
+        "overall_top1_accuracy": float(correct.sum()) / total,
+        f"overall_top{top_k}_accuracy": topk_correct / total,
+        "per_category": {lbl: recall_l[i] for i, lbl in enumerate(labels)},
+        "per_category_detail": {
+            lbl: {
+                "precision": precision_l[i],
+                "recall": recall_l[i],
+                "f1": f1_l[i],
+                "support": support_l[i],
+            }
+            for i, lbl in enumerate(labels)
+        },
+        "confused_pairs": confused_pairs,
+    }
+
+
 def compute_metrics(
     model: nn.Module,
     loader: DataLoader,
@@ -91,72 +219,462 @@ def compute_metrics(
           - ``overall_top1_accuracy``: float in [0, 1]
           - ``overall_top3_accuracy``: float in [0, 1]
           - ``per_category``: dict[str, float] — top-1 per label
+          - ``per_category_detail``: dict[str, dict] — precision, recall,
+                F1 and support per label
           - ``confused_pairs``: list of (true_label, pred_label, count)
                 sorted descending by count; only misclassifications.
     """
     num_classes = len(labels)
-    # per_class_correct[i] = (correct_top1, total)
-    per_class_correct: list[int] = [0] * num_classes
-    per_class_total: list[int] = [0] * num_classes
-    # confusion_counts[(true_idx, pred_idx)] = count (only misclassifications)
-    confusion_counts: dict[tuple[int, int], int] = defaultdict(int)
-
-    top1_correct = 0
+    confusion = torch.zeros(num_classes, num_classes, dtype=torch.long)
     top3_correct = 0
-    total = 0
 
     model.eval()
     with torch.inference_mode():
         for images, label_indices in loader:
             logits = model(images)  # (B, num_classes)
-            batch_size = label_indices.size(0)
+            confusion += confusion_matrix(
+                label_indices, logits.argmax(dim=1), num_classes
+            )
+            top3_correct += topk_hits(logits, label_indices, k=3)
 
-            # Top-1
-            top1_preds = logits.argmax(dim=1)
+    return metrics_from_confusion(confusion, top3_correct, labels)
 
-            # Top-3 (clamp to available classes)
-            k = min(3, num_classes)
-            top3_preds = logits.topk(k, dim=1).indices  # (B, k)
 
-            for b in range(batch_size):
-                true_idx = int(label_indices[b])
-                pred_idx = int(top1_preds[b])
+def metrics_from_logits(
+    logits: torch.Tensor,
+    targets: torch.Tensor,
+    labels: list[str],
+    top_k: int = 3,
+) -> dict:
+    """Compute the :func:`compute_metrics` report from stored logits.
 
-                # top-1
-                if pred_idx == true_idx:
-                    top1_correct += 1
-                    per_class_correct[true_idx] += 1
-                else:
-                    confusion_counts[(true_idx, pred_idx)] += 1
+    Args:
+        logits: ``(N, C)`` logits (any float dtype, e.g. cached float16).
+        targets: ``(N,)`` true class indices.
+        labels: ``labels[i]`` is the class name for class index ``i``.
+        top_k: k for the ``overall_top{k}_accuracy`` key.
+    """
+    logits = logits.float()
+    confusion = confusion_matrix(targets, logits.argmax(dim=1), len(labels))
+    return metrics_from_confusion(
+        confusion, topk_hits(logits, targets, k=top_k), labels, top_k=top_k
+    )
 
-                # top-3
-                if true_idx in top3_preds[b].tolist():
-                    top3_correct += 1
 
-                per_class_total[true_idx] += 1
+# ---------------------------------------------------------------------------
+# Sharded evaluation
+# ---------------------------------------------------------------------------
 
-            total += batch_size
 
-    overall_top1 = top1_correct / max(total, 1)
-    overall_top3 = top3_correct / max(total, 1)
+def _init_worker(
+    artifact_path: str, num_classes: int, num_threads: int, tta: bool = False
+) -> None:
+    """Load the artifact once per worker process."""
+    global _WORKER_MODEL
+    torch.set_num_threads(num_threads)
+    _WORKER_MODEL = load_artifact(artifact_path, num_classes=num_classes)
+    if tta:
+        _WORKER_MODEL = TTAModel(_WORKER_MODEL)
+
+
+def _eval_shard(shard: Subset, batch_size: int, bf16: bool) -> logit_cache.LogitRecord:
+    """Run the worker's model over one shard."""
+    assert _WORKER_MODEL is not None, "worker not initialised"
+    loader = DataLoader(shard, batch_size=batch_size, shuffle=False)
+    return logit_cache.collect_logits(_WORKER_MODEL, loader, shard.indices, bf16=bf16)
+
+
+def collect_logits_sharded(
+    artifact_path: str,
+    subset: Subset,
+    num_classes: int,
+    workers: int,
+    threads_per_worker: Optional[int] = None,
+    batch_size: int = 32,
+    bf16: bool = False,
+    tta: bool = False,
+) -> logit_cache.LogitRecord:
+    """Run inference over ``subset`` split into ``workers`` contiguous shards.
+
+    Each worker process loads the artifact once and sets its own intra-op
+    thread count so the workers together use the machine without
+    oversubscribing it.
 
-    per_category = {
-        labels[i]: per_class_correct[i] / max(per_class_total[i], 1)
-        for i in range(num_classes)
-    }
+    Args:
+        artifact_path: Path to the ``.safetensors`` artifact.
+        subset: Split returned by :meth:`WasteDataset.get_splits`.
+        num_classes: Number of output classes of the artifact.
+        workers: Number of worker processes.
+        threads_per_worker: Intra-op threads per worker. Defaults to
+            ``cpu_count // workers`` (at least 1).
+        batch_size: Inference batch size within each worker.
+        bf16: Run the model under bfloat16 autocast.
+        tta: Collect ``(N, V, C)`` logits for every TTA view; ``subset``
+            must yield :func:`recbuddy.transforms.tta_transform` inputs.
 
-    # Build sorted confused pairs list
-    confused_pairs: list[tuple[str, str, int]] = [
-        (labels[true_idx], labels[pred_idx], count)
-        for (true_idx, pred_idx), count in confusion_counts.items()
+    Returns:
+        A single :class:`LogitRecord` in the same order as ``subset``.
+    """
+    indices = list(subset.indices)
+    n = len(indices)
+    shards = [
+        Subset(subset.dataset, indices[i * n // workers : (i + 1) * n // workers])
+        for i in range(workers)
     ]
-    confused_pairs.sort(key=lambda x: x[2], reverse=True)
+    shards = [shard for shard in shards if len(shard) > 0]
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+
+    logger.info(
+        "Evaluating %d samples in %d shards (%d threads each)",
+        n,
+        len(shards),
+        threads_per_worker,
+    )
+    with ProcessPoolExecutor(
+        max_workers=len(shards) or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(artifact_path, num_classes, threads_per_worker, tta),
+    ) as pool:
+        records = list(
+            pool.map(
+                _eval_shard,
+                shards,
+                [batch_size] * len(shards),
+                [bf16] * len(shards),
+            )
+        )
+
+    if not records:
+        shape = (0, len(TTA_VIEWS), num_classes) if tta else (0, num_classes)
+        return logit_cache.LogitRecord(
+            logits=torch.empty(shape, dtype=torch.float16),
+            indices=torch.empty(0, dtype=torch.long),
+            targets=torch.empty(0, dtype=torch.long),
+        )
+    return logit_cache.LogitRecord(
+        logits=torch.cat([r.logits for r in records]),
+        indices=torch.cat([r.indices for r in records]),
+        targets=torch.cat([r.targets for r in records]),
+    )
+
+
+def evaluate_split(
+    artifact_path: str,
+    subset: Subset,
+    split: str,
+    labels: list[str],
+    cache_dir: str | Path | None = _DEFAULT_CACHE_DIR,
+    top_k: int = 3,
+    batch_size: int = 32,
+    workers: int = 1,
+    threads_per_worker: Optional[int] = None,
+    bf16: bool = False,
+    tta: bool = False,
+    tta_thresholds: Sequence[float] = _DEFAULT_TTA_THRESHOLDS,
+    cascade_artifact: Optional[str] = None,
+    cascade_thresholds: Sequence[float] = _DEFAULT_CASCADE_THRESHOLDS,
+) -> dict:
+    """Evaluate an artifact on a dataset split, reusing cached logits.
+
+    Args:
+        artifact_path: Path to the ``.safetensors`` artifact.
+        subset: Split returned by :meth:`WasteDataset.get_splits`.
+        split: Split id from :func:`recbuddy.logit_cache.split_id`.
+        labels: ``labels[i]`` is the class name for class index ``i``.
+        cache_dir: Logit store root, or ``None`` to always run inference.
+        top_k: k for the ``overall_top{k}_accuracy`` key.
+        batch_size: Inference batch size on a cache miss.
+        workers: Worker processes for inference; 1 runs in-process.
+        threads_per_worker: Intra-op threads per worker when ``workers > 1``.
+        bf16: Run inference under bfloat16 autocast and add a
+            ``bf16_parity`` section comparing against fp32 logits.
+        tta: Also collect logits for every TTA view and add a ``tta``
+            section (see :func:`tta_report`). The main metrics still
+            describe single-pass inference.
+        tta_thresholds: Confidence thresholds reported for adaptive TTA.
+        cascade_artifact: A cheaper first-stage artifact; adds a ``cascade``
+            section (see :func:`cascade_report`) treating ``artifact_path``
+            as the second stage.
+        cascade_thresholds: First-stage confidence thresholds to report.
+
+    Returns:
+        The :func:`compute_metrics` report.
+    """
+    tta_subset = with_transform(subset, tta_transform()) if tta else subset
+
+    def _record(
+        use_bf16: bool, path: str = artifact_path, with_tta: bool = tta
+    ) -> logit_cache.LogitRecord:
+        data = tta_subset if with_tta else subset
+
+        def _infer() -> logit_cache.LogitRecord:
+            if workers > 1:
+                return collect_logits_sharded(
+                    path,
+                    data,
+                    num_classes=len(labels),
+                    workers=workers,
+                    threads_per_worker=threads_per_worker,
+                    batch_size=batch_size,
+                    bf16=use_bf16,
+                    tta=with_tta,
+                )
+            model = load_artifact(path, num_classes=len(labels))
+            if with_tta:
+                model = TTAModel(model)
+            loader = DataLoader(data, batch_size=batch_size, shuffle=False)
+            return logit_cache.collect_logits(
+                model, loader, data.indices, bf16=use_bf16
+            )
+
+        if cache_dir is None:
+            return _infer()
+        key = f"{split}.bf16" if use_bf16 else split
+        if with_tta:
+            key += ".tta"
+        sha256 = logit_cache.file_sha256(path)
+        return logit_cache.load_or_compute(cache_dir, sha256, key, _infer)
+
+    def _single_pass(record: logit_cache.LogitRecord) -> torch.Tensor:
+        # View 0 is "center", i.e. the standard inference input.
+        return record.logits[:, 0] if tta else record.logits
+
+    record = _record(bf16)
+    logits = _single_pass(record)
+    metrics = metrics_from_logits(logits, record.targets, labels, top_k=top_k)
+    metrics["calibration"] = fit_temperature(logits, record.targets)
+    if tta:
+        metrics["tta"] = tta_report(
+            record.logits,
+            record.targets,
+            tta_thresholds,
+            temperature=metrics["calibration"]["temperature"],
+            top_k=top_k,
+        )
+    if cascade_artifact is not None:
+        first = _record(bf16, path=cascade_artifact, with_tta=False)
+        metrics["cascade"] = cascade_report(
+            first.logits,
+            logits,
+            record.targets,
+            cascade_thresholds,
+            first_ms=measure_latency_ms(
+                load_artifact(cascade_artifact, num_classes=len(labels)), bf16=bf16
+            ),
+            second_ms=measure_latency_ms(
+                load_artifact(artifact_path, num_classes=len(labels)), bf16=bf16
+            ),
+            top_k=top_k,
+        )
+    if bf16:
+        reference = _record(False)
+        metrics["bf16_parity"] = precision_parity(
+            _single_pass(reference), logits, record.targets
+        )
+    return metrics
+
+
+def tta_report(
+    logits: torch.Tensor,
+    targets: torch.Tensor,
+    thresholds: Sequence[float] = _DEFAULT_TTA_THRESHOLDS,
+    temperature: float = 1.0,
+    top_k: int = 3,
+) -> dict:
+    """Compare single-pass, always-on and adaptive test-time augmentation.
+
+    Adaptive TTA mirrors the API: the single-pass (``center``) prediction is
+    kept unless its top-1 confidence is below the threshold, in which case
+    the probabilities of all views are averaged.
 
+    Args:
+        logits: ``(N, V, C)`` logits, view 0 being ``center``.
+        targets: ``(N,)`` true class indices.
+        thresholds: Top-1 confidence thresholds to report.
+        temperature: Softmax temperature applied to every view, so
+            thresholds match the confidences the API reports.
+        top_k: k for the ``top{k}_accuracy`` keys.
+
+    Returns:
+        Dictionary with ``views``, ``single``, ``always`` and ``adaptive``
+        (one entry per threshold). Each has top-1/top-k accuracy and
+        ``forward_passes_per_image``; adaptive entries add ``tta_fraction``.
+    """
+    n, n_views = logits.shape[0], logits.shape[1]
+    single = torch.softmax(logits[:, 0].float() / temperature, dim=1)
+    averaged = average_probabilities(logits, temperature)
+
+    def _accuracy(probs: torch.Tensor, passes: float) -> dict:
+        return {
+            **_accuracies(probs, targets, top_k),
+            "forward_passes_per_image": round(passes, 4),
+        }
+
+    adaptive = []
+    for threshold in thresholds:
+        triggered = single.max(dim=1).values < threshold
+        probs = torch.where(triggered.unsqueeze(1), averaged, single)
+        fraction = float(triggered.sum()) / max(n, 1)
+        adaptive.append(
+            {
+                "threshold": threshold,
+                "tta_fraction": round(fraction, 4),
+                **_accuracy(probs, 1 + fraction * (n_views - 1)),
+            }
+        )
     return {
-        "overall_top1_accuracy": overall_top1,
-        "overall_top3_accuracy": overall_top3,
-        "per_category": per_category,
-        "confused_pairs": confused_pairs,
+        "views": list(TTA_VIEWS[:n_views]),
+        "single": _accuracy(single, 1),
+        "always": _accuracy(averaged, n_views),
+        "adaptive": adaptive,
+    }
+
+
+def cascade_report(
+    first_logits: torch.Tensor,
+    second_logits: torch.Tensor,
+    targets: torch.Tensor,
+    thresholds: Sequence[float] = _DEFAULT_CASCADE_THRESHOLDS,
+    first_ms: float = 0.0,
+    second_ms: float = 0.0,
+    top_k: int = 3,
+) -> dict:
+    """Report the accuracy/latency trade-off of a two-stage cascade.
+
+    Mirrors ``CascadeClassifier`` in the API: the first stage answers when
+    its top-1 softmax confidence is at or above the threshold; otherwise
+    the image escalates to the second stage.
+
+    Args:
+        first_logits: ``(N, C)`` logits of the cheap first stage.
+        second_logits: ``(N, C)`` logits of the full model.
+        targets: ``(N,)`` true class indices.
+        thresholds: First-stage confidence thresholds to report.
+        first_ms: Per-image latency of the first stage.
+        second_ms: Per-image latency of the second stage.
+        top_k: k for the ``top{k}_accuracy`` keys.
+
+    Returns:
+        Dictionary with ``first_stage`` and ``second_stage`` (each model
+        alone) and ``thresholds`` (one entry per threshold, with
+        ``first_stage_fraction`` and ``expected_latency_ms``).
+    """
+    n = max(targets.numel(), 1)
+    first = torch.softmax(first_logits.float(), dim=1)
+    second = torch.softmax(second_logits.float(), dim=1)
+    entries = []
+    for threshold in thresholds:
+        accepted = first.max(dim=1).values >= threshold
+        probs = torch.where(accepted.unsqueeze(1), first, second)
+        fraction = float(accepted.sum()) / n
+        entries.append(
+            {
+                "threshold": threshold,
+                "first_stage_fraction": round(fraction, 4),
+                **_accuracies(probs, targets, top_k),
+                "expected_latency_ms": round(first_ms + (1 - fraction) * second_ms, 3),
+            }
+        )
+    return {
+        "first_stage": {
+            **_accuracies(first, targets, top_k),
+            "latency_ms": round(first_ms, 3),
+        },
+        "second_stage": {
+            **_accuracies(second, targets, top_k),
+            "latency_ms": round(second_ms, 3),
+        },
+        "thresholds": entries,
+    }
+
+
+def _accuracies(probs: torch.Tensor, targets: torch.Tensor, top_k: int) -> dict:
+    """Return top-1 and top-k accuracy of ``(N, C)`` scores."""
+    n = max(targets.numel(), 1)
+    return {
+        "top1_accuracy": float((probs.argmax(dim=1) == targets).sum()) / n,
+        f"top{top_k}_accuracy": topk_hits(probs, targets, k=top_k) / n,
+    }
+
+
+def measure_latency_ms(
+    model: nn.Module, iterations: int = 20, warmup: int = 3, bf16: bool = False
+) -> float:
+    """Return the median single-image forward latency of ``model`` in ms."""
+    image = torch.randn(1, 3, 224, 224)
+    samples = []
+    with torch.inference_mode(), bf16_autocast(bf16):
+        for step in range(warmup + iterations):
+            start = time.perf_counter()
+            model(image)
+            if step >= warmup:
+                samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def fit_temperature(
+    logits: torch.Tensor, targets: torch.Tensor, max_iter: int = 50
+) -> dict:
+    """Fit a single softmax temperature by minimising NLL (temperature scaling).
+
+    Dividing logits by the temperature changes confidences but never the
+    ranking, so accuracy is unaffected.
+
+    Returns:
+        Dictionary with ``temperature``, ``nll_before`` (at T=1) and
+        ``nll_after``.
+    """
+    logits = logits.float()
+    if targets.numel() == 0:
+        return {"temperature": 1.0, "nll_before": 0.0, "nll_after": 0.0}
+    # Optimise log T so the temperature stays positive.
+    log_t = torch.zeros(1, requires_grad=True)
+    optimizer = torch.optim.LBFGS([log_t], lr=0.1, max_iter=max_iter)
+
+    def _closure() -> torch.Tensor:
+        optimizer.zero_grad()
+        loss = nn.functional.cross_entropy(logits / log_t.exp(), targets)
+        loss.backward()
+        return loss
+
+    with torch.enable_grad():
+        optimizer.step(_closure)
+    temperature = float(log_t.detach().exp())
+    with torch.no_grad():
+        return {
+            "temperature": round(temperature, 4),
+            "nll_before": float(nn.functional.cross_entropy(logits, targets)),
+            "nll_after": float(
+                nn.functional.cross_entropy(logits / temperature, targets)
+            ),
+        }
+
+
+def precision_parity(
+    reference: torch.Tensor, candidate: torch.Tensor, targets: torch.Tensor
+) -> dict:
+    """Compare reduced-precision logits against fp32 logits for the same samples.
+
+    Returns:
+        Dictionary with ``top1_agreement`` (fraction of identical top-1
+        predictions), ``top1_accuracy_delta`` (candidate minus reference) and
+        ``max_abs_prob_diff`` (largest softmax probability difference).
+    """
+    reference = reference.float()
+    candidate = candidate.float()
+    ref_pred = reference.argmax(dim=1)
+    cand_pred = candidate.argmax(dim=1)
+    n = max(targets.numel(), 1)
+    prob_diff = (reference.softmax(dim=1) - candidate.softmax(dim=1)).abs()
+    return {
+        "top1_agreement": float((ref_pred == cand_pred).sum()) / n,
+        "top1_accuracy_delta": (
+            float((cand_pred == targets).sum()) - float((ref_pred == targets).sum())
+        )
+        / n,
+        "max_abs_prob_diff": float(prob_diff.max()) if prob_diff.numel() else 0.0,
     }
 
 
@@ -190,6 +708,70 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="S3 endpoint URL (for LocalStack in dev)",
     )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=3,
+        help="k for the top-k accuracy metric (default: 3)",
+    )
+    parser.add_argument(
+        "--low-accuracy-threshold",
+        type=float,
+        default=_LOW_ACCURACY_THRESHOLD,
+        help="Warn about categories below this top-1 accuracy (default: 0.60)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=_DEFAULT_CACHE_DIR,
+        help=f"Logit cache directory (default: {_DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes to shard inference across (default: 1)",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="Intra-op threads per worker (default: cpu_count // workers)",
+    )
+    parser.add_argument(
+        "--bf16",
+        action="store_true",
+        help="Run inference under bfloat16 autocast and report parity with fp32",
+    )
+    parser.add_argument(
+        "--tta",
+        action="store_true",
+        help="Also evaluate test-time augmentation and report its accuracy/cost",
+    )
+    parser.add_argument(
+        "--tta-thresholds",
+        type=lambda s: [float(v) for v in s.split(",") if v],
+        default=list(_DEFAULT_TTA_THRESHOLDS),
+        help="Comma-separated adaptive TTA confidence thresholds "
+        "(default: 0.3,0.5,0.7)",
+    )
+    parser.add_argument(
+        "--cascade-artifact",
+        default=None,
+        help="Cheaper first-stage artifact; report the cascade trade-off "
+        "with --artifact as the second stage",
+    )
+    parser.add_argument(
+        "--cascade-thresholds",
+        type=lambda s: [float(v) for v in s.split(",") if v],
+        default=list(_DEFAULT_CASCADE_THRESHOLDS),
+        help="Comma-separated first-stage confidence thresholds "
+        "(default: 0.7,0.8,0.9,0.95)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run inference; do not read or write the logit cache",
+    )
     return parser.parse_args()
 
 
@@ -197,8 +779,6 @@ if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     args = _parse_args()
 
-    from torch.utils.data import DataLoader
-
     from recbuddy.dataset import WasteDataset
 
     # Resolve the label list from the dataset
@@ -214,28 +794,40 @@ if __name__ == "__main__":
 
     split_map = {"train": train_ds, "val": val_ds, "test": test_ds}
     eval_ds = split_map[args.split]
-    loader = DataLoader(eval_ds, batch_size=32, shuffle=False, num_workers=0)
+    all_keys = dataset_obj.sample_keys(eval_ds.dataset)
+    split = logit_cache.split_id(args.split, [all_keys[i] for i in eval_ds.indices])
 
     # Derive label list from class_to_idx (sorted by index)
     class_to_idx = dataset_obj.class_to_idx
     label_list = sorted(class_to_idx.keys(), key=lambda k: class_to_idx[k])
 
-    model = load_artifact(args.artifact, num_classes=len(label_list))
-    metrics = compute_metrics(model, loader, label_list)
+    metrics = evaluate_split(
+        args.artifact,
+        eval_ds,
+        split,
+        label_list,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        top_k=args.top_k,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        bf16=args.bf16,
+        tta=args.tta,
+        tta_thresholds=args.tta_thresholds,
+        cascade_artifact=args.cascade_artifact,
+        cascade_thresholds=args.cascade_thresholds,
+    )
 
     # Print JSON report to stdout
     print(json.dumps(metrics, indent=2))
 
     # Warn on categories below accuracy threshold
+    threshold = args.low_accuracy_threshold
     low_accuracy = [
-        (lbl, acc)
-        for lbl, acc in metrics["per_category"].items()
-        if acc < _LOW_ACCURACY_THRESHOLD
+        (lbl, acc) for lbl, acc in metrics["per_category"].items() if acc < threshold
     ]
     if low_accuracy:
         for lbl, acc in sorted(low_accuracy, key=lambda x: x[1]):
             print(
-                f"WARNING: {lbl} accuracy {acc:.2%} is below "
-                f"{_LOW_ACCURACY_THRESHOLD:.0%} threshold",
+                f"WARNING: {lbl} accuracy {acc:.2%} is below {threshold:.0%} threshold",
                 file=sys.stderr,
             )
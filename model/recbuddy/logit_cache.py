@@ -0,0 +1,166 @@
+"""On-disk store of per-sample logits for evaluation.
+
+Running the model is the only expensive part of evaluation. Every report
+(top-k accuracy, low-accuracy flags, confused pairs, calibration) can be
+recomputed from the logits alone, so they are persisted once per
+(artifact, split) pair and reused:
+
+  <cache_dir>/<artifact_sha256[:16]>/<split_id>.safetensors
+
+Each file holds three tensors:
+  - ``logits``:  float16, shape (N, num_classes)
+  - ``indices``: int64, position of each sample in the underlying dataset
+  - ``targets``: int64, true class index of each sample
+"""
+
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence
+
+import torch
+import torch.nn as nn
+from safetensors.torch import load_file, save_file
+from torch.utils.data import DataLoader
+
+from recbuddy.optimize import bf16_autocast
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE: int = 1 << 20  # 1 MiB
+
+
+@dataclass(frozen=True)
+class LogitRecord:
+    """Logits, dataset indices and targets for one evaluated split."""
+
+    logits: torch.Tensor
+    indices: torch.Tensor
+    targets: torch.Tensor
+
+
+def file_sha256(path: str | Path) -> str:
+    """Return the hex sha256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_id(split: str, keys: Sequence[str]) -> str:
+    """Return an identifier for a split's exact membership.
+
+    Args:
+        split: Split name, e.g. ``"test"``.
+        keys: Sample keys in the split (order does not matter).
+
+    Returns:
+        ``"<split>-<hash>"``; changes whenever an image is added or removed.
+    """
+    digest = hashlib.sha256("\n".join(sorted(keys)).encode()).hexdigest()
+    return f"{split}-{digest[:12]}"
+
+
+def cache_path(cache_dir: str | Path, artifact_sha256: str, split: str) -> Path:
+    """Return the store location for an (artifact, split id) pair."""
+    return Path(cache_dir) / artifact_sha256[:16] / f"{split}.safetensors"
+
+
+def collect_logits(
+    model: nn.Module,
+    loader: DataLoader,
+    indices: Sequence[int],
+    bf16: bool = False,
+) -> LogitRecord:
+    """Run ``model`` over ``loader`` and return the stacked logits.
+
+    Args:
+        model: Classifier in eval mode.
+        loader: Unshuffled DataLoader yielding (images, label_indices).
+        indices: Dataset index of each sample, in loader order.
+        bf16: Run the model under bfloat16 autocast.
+    """
+    logits: list[torch.Tensor] = []
+    targets: list[torch.Tensor] = []
+    model.eval()
+    with torch.inference_mode(), bf16_autocast(bf16):
+        for images, label_indices in loader:
+            logits.append(model(images).to(torch.float16))
+            targets.append(label_indices.long())
+    return LogitRecord(
+        logits=torch.cat(logits) if logits else torch.empty(0, 0, dtype=torch.float16),
+        indices=torch.as_tensor(list(indices), dtype=torch.long),
+        targets=torch.cat(targets) if targets else torch.empty(0, dtype=torch.long),
+    )
+
+
+def save(record: LogitRecord, path: Path, metadata: dict[str, str]) -> None:
+    """Write ``record`` to ``path`` as safetensors with string metadata.
+
+    The file is written under a per-process temporary name and renamed, so
+    an interrupted or concurrent write never leaves a truncated file at
+    ``path`` for :func:`load_or_compute` to treat as a hit.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        save_file(
+            {
+                "logits": record.logits.contiguous(),
+                "indices": record.indices.contiguous(),
+                "targets": record.targets.contiguous(),
+            },
+            str(tmp_path),
+            metadata=metadata,
+        )
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def load(path: Path) -> LogitRecord:
+    """Read a record previously written by :func:`save`."""
+    tensors = load_file(str(path))
+    return LogitRecord(
+        logits=tensors["logits"],
+        indices=tensors["indices"],
+        targets=tensors["targets"],
+    )
+
+
+def load_or_compute(
+    cache_dir: str | Path,
+    artifact_sha256: str,
+    split: str,
+    compute: Callable[[], LogitRecord],
+) -> LogitRecord:
+    """Return cached logits for (artifact, split), computing them on a miss.
+
+    Args:
+        cache_dir: Root directory of the store.
+        artifact_sha256: Hex digest of the artifact (see :func:`file_sha256`).
+        split: Split id from :func:`split_id`.
+        compute: Called once on a cache miss to run inference.
+    """
+    path = cache_path(cache_dir, artifact_sha256, split)
+    if path.exists():
+        logger.info("Logit cache hit: %s", path)
+        return load(path)
+
+    logger.info("Logit cache miss: %s — running inference", path)
+    record = compute()
+    save(
+        record,
+        path,
+        metadata={
+            "artifact_sha256": artifact_sha256,
+            "split_id": split,
+            "num_samples": str(record.targets.numel()),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+    )
+    return record
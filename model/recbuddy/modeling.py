@@ -0,0 +1,321 @@
+"""Model construction and artifact loading shared by training, evaluation and the API.
+
+Supported backbones are registered in ``_ARCHITECTURES``: EfficientNet-B0
+(the default, full model) and MobileNetV3-Small (the cheap first stage of a
+cascade, see ``CascadeClassifier`` in the API). The architecture of an
+artifact is read from its safetensors header — the ``architecture`` metadata
+key (written by :func:`artifact_metadata`) and the shape of the classifier
+weight — so callers no longer have to know the architecture or number of
+classes up front. Loading skips torchvision's random weight
+initialisation and never holds two copies of the weights: the module is built
+on the ``meta`` device and its parameters are then *replaced* by the tensors
+read from the memory-mapped file (``load_state_dict(assign=True)``).
+
+Pruned artifacts (see :mod:`recbuddy.compress`) record the surviving width
+of every inverted-residual block's expansion under the ``widths`` metadata
+key; the loader narrows the freshly built module to those widths before
+adopting the weights.
+"""
+
+import json
+import logging
+import os
+from typing import Callable, Optional
+
+import torch
+import torch.nn as nn
+import torchvision.models as models
+from safetensors import safe_open
+from safetensors.torch import load_file
+from torchvision.models import EfficientNet_B0_Weights, MobileNet_V3_Small_Weights
+from torchvision.ops import SqueezeExcitation
+
+from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.optimize import optimize_for_inference
+
+logger = logging.getLogger(__name__)
+
+ARCHITECTURE: str = "efficientnet_b0"
+EFFICIENTNET_FEATURE_DIM: int = 1280
+MOBILENET_V3_SMALL_HIDDEN_DIM: int = 1024
+
+
+def build_efficientnet(
+    num_classes: int = len(ALL_LABELS_LIST), pretrained: bool = False
+) -> nn.Module:
+    """Construct EfficientNet-B0 with a ``num_classes``-way linear head.
+
+    Args:
+        num_classes: Number of output classes.
+        pretrained: Load ImageNet weights into the backbone.
+    """
+    weights = EfficientNet_B0_Weights.IMAGENET1K_V1 if pretrained else None
+    net = models.efficientnet_b0(weights=weights)
+    net.classifier[1] = nn.Linear(EFFICIENTNET_FEATURE_DIM, num_classes)
+    return net
+
+
+def build_mobilenet_v3_small(
+    num_classes: int = len(ALL_LABELS_LIST), pretrained: bool = False
+) -> nn.Module:
+    """Construct MobileNetV3-Small with a ``num_classes``-way final linear layer.
+
+    About a seventh of EfficientNet-B0's multiply-adds; used as the first
+    stage of a cascade.
+
+    Args:
+        num_classes: Number of output classes.
+        pretrained: Load ImageNet weights into the backbone.
+    """
+    weights = MobileNet_V3_Small_Weights.IMAGENET1K_V1 if pretrained else None
+    net = models.mobilenet_v3_small(weights=weights)
+    net.classifier[3] = nn.Linear(MOBILENET_V3_SMALL_HIDDEN_DIM, num_classes)
+    return net
+
+
+# name -> (builder, state-dict key of the final linear layer's weight)
+_ARCHITECTURES: dict[str, tuple[Callable[..., nn.Module], str]] = {
+    "efficientnet_b0": (build_efficientnet, "classifier.1.weight"),
+    "mobilenet_v3_small": (build_mobilenet_v3_small, "classifier.3.weight"),
+}
+
+ARCHITECTURES: tuple[str, ...] = tuple(_ARCHITECTURES)
+
+
+def build_architecture(
+    architecture: str = ARCHITECTURE,
+    num_classes: int = len(ALL_LABELS_LIST),
+    pretrained: bool = False,
+) -> nn.Module:
+    """Construct a registered architecture with a ``num_classes``-way head.
+
+    Raises:
+        ValueError: If ``architecture`` is not registered.
+    """
+    if architecture not in _ARCHITECTURES:
+        raise ValueError(
+            f"Unsupported architecture {architecture!r}; "
+            f"expected one of {ARCHITECTURES}"
+        )
+    builder, _ = _ARCHITECTURES[architecture]
+    return builder(num_classes=num_classes, pretrained=pretrained)
+
+
+def artifact_metadata(
+    num_classes: int,
+    architecture: str = ARCHITECTURE,
+    widths: Optional[list[int]] = None,
+) -> dict[str, str]:
+    """Return the safetensors metadata describing an artifact's architecture.
+
+    Args:
+        num_classes: Number of output classes.
+        architecture: One of :data:`ARCHITECTURES`.
+        widths: Expansion widths of a pruned model, from
+            :func:`expansion_widths`; ``None`` for the stock widths.
+    """
+    metadata = {"architecture": architecture, "num_classes": str(num_classes)}
+    if widths is not None:
+        metadata["widths"] = json.dumps(widths)
+    return metadata
+
+
+# ---------------------------------------------------------------------------
+# Expansion-channel surgery (structured pruning)
+# ---------------------------------------------------------------------------
+
+
+def expansion_blocks(net: nn.Module) -> list[nn.Sequential]:
+    """Return the ``block`` of every inverted residual with a 1x1 expansion.
+
+    Matches torchvision's ``MBConv`` (EfficientNet) and ``InvertedResidual``
+    (MobileNetV3): a pointwise expansion, a depthwise convolution over the
+    expanded channels, an optional squeeze-excitation and a pointwise
+    projection. Blocks without an expansion (ratio 1) are skipped. The
+    order is the module traversal order, which is stable for an
+    architecture.
+    """
+    blocks = []
+    for module in net.modules():
+        block = getattr(module, "block", None)
+        if (
+            not isinstance(block, nn.Sequential)
+            or len(block) < 3
+            or not isinstance(block[0], nn.Sequential)
+            or not isinstance(block[1], nn.Sequential)
+        ):
+            continue
+        expand, depthwise = block[0][0], block[1][0]
+        if (
+            isinstance(expand, nn.Conv2d)
+            and expand.kernel_size == (1, 1)
+            and expand.groups == 1
+            and isinstance(depthwise, nn.Conv2d)
+            and depthwise.groups == expand.out_channels
+        ):
+            blocks.append(block)
+    return blocks
+
+
+def expansion_widths(net: nn.Module) -> list[int]:
+    """Return the expansion width of every block in :func:`expansion_blocks`."""
+    return [block[0][0].out_channels for block in expansion_blocks(net)]
+
+
+def _select(tensor: torch.Tensor, keep: torch.Tensor, dim: int = 0) -> torch.Tensor:
+    return tensor.index_select(dim, keep.to(tensor.device))
+
+
+def prune_expansion(block: nn.Sequential, keep: torch.Tensor) -> None:
+    """Keep only the expansion channels ``keep`` of ``block``, in place.
+
+    Narrows the expansion conv and its BatchNorm, the depthwise conv and its
+    BatchNorm, the squeeze-excitation's input and output, and the input of
+    the projection conv. Works on ``meta`` tensors too, which is how
+    :func:`load_model` shapes a module for a pruned artifact.
+
+    Args:
+        block: One of :func:`expansion_blocks`.
+        keep: 1-D index tensor of the channels to keep.
+    """
+    width = len(keep)
+    expand_conv, expand_bn = block[0][0], block[0][1]
+    dw_conv, dw_bn = block[1][0], block[1][1]
+    project_conv = block[-1][0]
+
+    expand_conv.weight = nn.Parameter(_select(expand_conv.weight.data, keep))
+    expand_conv.out_channels = width
+    dw_conv.weight = nn.Parameter(_select(dw_conv.weight.data, keep))
+    dw_conv.in_channels = dw_conv.out_channels = dw_conv.groups = width
+    for bn in (expand_bn, dw_bn):
+        bn.weight = nn.Parameter(_select(bn.weight.data, keep))
+        bn.bias = nn.Parameter(_select(bn.bias.data, keep))
+        bn.running_mean = _select(bn.running_mean, keep)
+        bn.running_var = _select(bn.running_var, keep)
+        bn.num_features = width
+
+    se = block[2]
+    if isinstance(se, SqueezeExcitation):
+        se.fc1.weight = nn.Parameter(_select(se.fc1.weight.data, keep, dim=1))
+        se.fc1.in_channels = width
+        se.fc2.weight = nn.Parameter(_select(se.fc2.weight.data, keep))
+        se.fc2.bias = nn.Parameter(_select(se.fc2.bias.data, keep))
+        se.fc2.out_channels = width
+
+    project_conv.weight = nn.Parameter(_select(project_conv.weight.data, keep, dim=1))
+    project_conv.in_channels = width
+
+
+def set_expansion_widths(net: nn.Module, widths: list[int]) -> None:
+    """Narrow every expansion of ``net`` to ``widths`` (keeping the first channels).
+
+    Used to shape a freshly built module before loading a pruned state dict;
+    which channels are kept is irrelevant because the weights are replaced.
+
+    Raises:
+        ValueError: If ``widths`` does not match the number of blocks.
+    """
+    blocks = expansion_blocks(net)
+    if len(widths) != len(blocks):
+        raise ValueError(
+            f"Artifact records {len(widths)} expansion widths, "
+            f"architecture has {len(blocks)} blocks"
+        )
+    for block, width in zip(blocks, widths):
+        if width != block[0][0].out_channels:
+            prune_expansion(block, torch.arange(width))
+
+
+def read_header(artifact_path: str) -> tuple[int, dict[str, str]]:
+    """Return ``(num_classes, metadata)`` from an artifact without loading it.
+
+    Only the JSON header is parsed; tensor data is not read. Artifacts
+    written before the ``architecture`` key existed are EfficientNet-B0;
+    the returned metadata always has the key.
+
+    Raises:
+        ValueError: If the architecture is not registered or the artifact
+            lacks its classifier weight.
+    """
+    with safe_open(artifact_path, framework="pt") as f:
+        metadata = {"architecture": ARCHITECTURE, **(f.metadata() or {})}
+        architecture = metadata["architecture"]
+        if architecture not in _ARCHITECTURES:
+            raise ValueError(
+                f"Unsupported architecture {architecture!r} in {artifact_path}"
+            )
+        head_key = _ARCHITECTURES[architecture][1]
+        if head_key not in f.keys():
+            raise ValueError(f"{artifact_path} has no {head_key} tensor")
+        num_classes = f.get_slice(head_key).get_shape()[0]
+    return num_classes, metadata
+
+
+def load_model(
+    artifact_path: str,
+    num_classes: Optional[int] = None,
+    optimize: bool = True,
+    channels_last: bool = True,
+    compile: bool = False,
+) -> nn.Module:
+    """Load a trained classifier from a safetensors artifact.
+
+    Args:
+        artifact_path: Path to a ``.safetensors`` state-dict file.
+        num_classes: Expected number of classes; checked against the
+            artifact. ``None`` accepts whatever the artifact contains.
+        optimize: Apply :func:`recbuddy.optimize.optimize_for_inference`.
+        channels_last: Passed to the inference optimisation.
+        compile: Passed to the inference optimisation.
+
+    Returns:
+        The model in ``eval()`` mode with loaded weights.
+
+    Raises:
+        FileNotFoundError: If ``artifact_path`` does not exist.
+        ValueError: If the artifact does not match ``num_classes``.
+        RuntimeError: If any parameter or buffer is still on the meta device
+            after loading.
+    """
+    if not os.path.exists(artifact_path):
+        raise FileNotFoundError(
+            f"Model artifact not found: {artifact_path}. "
+            "Run the training pipeline to produce an artifact first."
+        )
+
+    artifact_classes, metadata = read_header(artifact_path)
+    if num_classes is not None and num_classes != artifact_classes:
+        raise ValueError(
+            f"{artifact_path} has {artifact_classes} classes, expected {num_classes}"
+        )
+
+    # Build without allocating or initialising weights, then adopt the
+    # loaded tensors as the parameters instead of copying into them.
+    with torch.device("meta"):
+        net = build_architecture(metadata["architecture"], artifact_classes)
+        if "widths" in metadata:
+            set_expansion_widths(net, json.loads(metadata["widths"]))
+    net.load_state_dict(load_file(artifact_path), assign=True)
+    _check_materialised(net)
+    net.eval()
+
+    if optimize:
+        net = optimize_for_inference(net, channels_last=channels_last, compile=compile)
+    logger.info(
+        "Loaded artifact: %s (%s, %d classes)",
+        artifact_path,
+        metadata["architecture"],
+        artifact_classes,
+    )
+    return net
+
+
+def _check_materialised(net: nn.Module) -> None:
+    """Raise if a parameter or buffer missing from the state dict is still meta."""
+    leftover = [
+        name
+        for name, tensor in [*net.named_parameters(), *net.named_buffers()]
+        if tensor.is_meta
+    ]
+    if leftover:
+        raise RuntimeError(f"Tensors left on the meta device after load: {leftover}")
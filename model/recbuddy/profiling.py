@@ -0,0 +1,179 @@
+"""Lightweight throughput instrumentation for the training loop.
+
+TrainingProfiler accumulates wall-clock time per named phase (data loading,
+forward, backward, optimizer step, evaluation, checkpointing), counts steps
+and images, and can capture a ``torch.profiler`` trace for a window of
+steps. Its :meth:`TrainingProfiler.summary` is written into the
+``training_run_*.json`` sidecar so every run records where its time went.
+
+:func:`percentile` and :func:`latency_ms` are the latency statistics shared
+by every benchmark (``recbuddy.benchmark`` and the API's ``benchmarks``
+package), so their figures are computed the same way.
+"""
+
+import logging
+import resource
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence, TypeVar
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Phases that make up one optimisation step; used for images/sec.
+_STEP_PHASES: tuple[str, ...] = (
+    "data",
+    "mixup",
+    "forward",
+    "backward",
+    "optimizer_step",
+)
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Return the ``q``-th percentile (0–100) by linear interpolation.
+
+    Raises:
+        ValueError: If ``values`` is empty.
+    """
+    if not values:
+        raise ValueError("percentile() of an empty sequence")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_ms(
+    samples_s: Sequence[float],
+    quantiles: Sequence[int] = (50, 95),
+    digits: int = 3,
+) -> dict[str, float]:
+    """Return ``mean_ms`` and ``p<q>_ms`` for latencies given in seconds.
+
+    Empty ``samples_s`` gives 0.0 for every figure.
+    """
+    ms = [1000 * s for s in samples_s]
+    summary = {"mean_ms": round(sum(ms) / len(ms), digits) if ms else 0.0}
+    for q in quantiles:
+        summary[f"p{q}_ms"] = round(percentile(ms, q), digits) if ms else 0.0
+    return summary
+
+
+class TrainingProfiler:
+    """Per-phase timers, throughput counters and an optional trace window.
+
+    Args:
+        trace_dir: Directory for ``torch.profiler`` Chrome traces.
+        trace_window: ``(start_step, end_step)`` global steps to capture,
+            end exclusive. ``None`` disables tracing.
+    """
+
+    def __init__(
+        self,
+        trace_dir: Optional[Path] = None,
+        trace_window: Optional[tuple[int, int]] = None,
+    ) -> None:
+        self._totals: dict[str, float] = defaultdict(float)
+        self._counts: dict[str, int] = defaultdict(int)
+        self._steps = 0
+        self._images = 0
+        self._trace_dir = trace_dir
+        self._trace_window = trace_window
+        self._torch_profiler: Optional[Any] = None
+        self._trace_path: Optional[Path] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._totals[name] += time.perf_counter() - start
+            self._counts[name] += 1
+
+    def timed_iter(self, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from ``iterable``, timing each fetch under phase ``data``."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self._totals["data"] += time.perf_counter() - start
+            self._counts["data"] += 1
+            yield item
+
+    def step(self, batch_size: int) -> None:
+        """Mark the end of one optimisation step over ``batch_size`` images."""
+        self._steps += 1
+        self._images += batch_size
+        if self._trace_window is None:
+            return
+        start, end = self._trace_window
+        if self._steps == start:
+            self._start_trace()
+        elif self._steps == end:
+            self._stop_trace()
+
+    def close(self) -> None:
+        """Finish a trace window that the run ended inside of."""
+        if self._torch_profiler is not None:
+            self._stop_trace()
+
+    def summary(self) -> dict:
+        """Return timings and throughput as a JSON-serialisable dict."""
+        step_time = sum(self._totals[p] for p in _STEP_PHASES)
+        return {
+            "steps": self._steps,
+            "images": self._images,
+            "images_per_sec": round(self._images / step_time, 2) if step_time else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "phases": {
+                name: {
+                    "total_s": round(total, 4),
+                    "count": self._counts[name],
+                    "mean_ms": round(1000 * total / max(self._counts[name], 1), 3),
+                }
+                for name, total in sorted(self._totals.items())
+            },
+            "trace": str(self._trace_path) if self._trace_path else None,
+        }
+
+    def _start_trace(self) -> None:
+        self._torch_profiler = torch.profiler.profile(
+            activities=[torch.profiler.ProfilerActivity.CPU],
+            record_shapes=True,
+            profile_memory=True,
+        )
+        self._torch_profiler.__enter__()
+        logger.info("torch.profiler capture started at step %d", self._steps)
+
+    def _stop_trace(self) -> None:
+        assert self._torch_profiler is not None
+        self._torch_profiler.__exit__(None, None, None)
+        trace_dir = self._trace_dir or Path(".")
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        start, _ = self._trace_window or (0, 0)
+        self._trace_path = trace_dir / f"trace_steps_{start:05d}_{self._steps:05d}.json"
+        self._torch_profiler.export_chrome_trace(str(self._trace_path))
+        self._torch_profiler = None
+        logger.info("torch.profiler trace written: %s", self._trace_path)
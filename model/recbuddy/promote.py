@@ -4,9 +4,24 @@ Uploads to a versioned prefix:
   artifacts/{version}/model.safetensors
   artifacts/{version}/manifest.json
 
+The artifact is read once to compute its sha256, the sha256 of every
+multipart part and the ETag S3 will report, and then uploaded with a tuned
+concurrent multipart transfer (``--chunk-size-mb``, ``--max-concurrency``).
+If a previously promoted version has the same sha256, the bytes are copied
+server-side instead of uploaded again. The manifest records the size, the
+checksums and the part layout. With ``--channel`` (the CLI defaults to
+``latest``) the channel pointer of :mod:`recbuddy.registry` is moved to the
+new version afterwards.
+
 The version is read from pyproject.toml (semver). Errors if the version
 already exists in S3 — bump the version in pyproject.toml first.
 
+If the artifact directory has a ``compression.json`` (written by
+``recbuddy.compress``), the compressed artifact is refused when its top-1
+accuracy dropped by more than ``--max-accuracy-drop`` or its latency grew
+beyond ``--max-latency-ratio`` times the source's; the compression summary is
+copied into the manifest.
+
 Usage:
     uv run python -m recbuddy.promote \
         --artifact artifacts/model.safetensors \
@@ -14,8 +29,10 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
 import logging
+import math
 import os
 import subprocess
 import time
@@ -23,10 +40,20 @@ from pathlib import Path
 from typing import Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+from recbuddy import registry
 
 logger = logging.getLogger(__name__)
 
 _PYPROJECT_PATH = Path(__file__).parent.parent / "pyproject.toml"
+_COMPRESSION_MANIFEST = "compression.json"
+
+DEFAULT_MAX_ACCURACY_DROP: float = 0.01
+DEFAULT_MAX_LATENCY_RATIO: float = 1.05
+DEFAULT_CHUNK_SIZE: int = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY: int = 8
 
 
 def _read_version(pyproject_path: Path | None = None) -> str:
@@ -47,6 +74,93 @@ def _find_training_metadata(artifact_dir: Path) -> dict | None:
     return json.loads(candidates[0].read_text())
 
 
+def _find_compression_manifest(artifact_dir: Path) -> dict | None:
+    """Return the compression.json written by recbuddy.compress, if any."""
+    path = artifact_dir / _COMPRESSION_MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def file_digest(path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict:
+    """Hash a file in one streaming pass, part by part.
+
+    Args:
+        path: File to hash.
+        chunk_size: Multipart part size the file will be uploaded with.
+
+    Returns:
+        ``sha256`` of the whole file, ``size_bytes``, the ``etag`` S3 reports
+        for an upload with this part size (the plain MD5 below one part,
+        otherwise the MD5 of the part MD5s suffixed with the part count) and
+        ``parts`` — ``chunk_size``, ``count`` and each part's ``sha256``.
+    """
+    whole = hashlib.sha256()
+    part_sha256: list[str] = []
+    part_md5: list[bytes] = []
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            whole.update(chunk)
+            part_sha256.append(hashlib.sha256(chunk).hexdigest())
+            part_md5.append(hashlib.md5(chunk, usedforsecurity=False).digest())
+            size += len(chunk)
+    if len(part_md5) > 1:
+        combined = hashlib.md5(b"".join(part_md5), usedforsecurity=False)
+        etag = f"{combined.hexdigest()}-{len(part_md5)}"
+    else:
+        etag = (part_md5[0] if part_md5 else hashlib.md5(b"").digest()).hex()
+    return {
+        "sha256": whole.hexdigest(),
+        "size_bytes": size,
+        "etag": etag,
+        "parts": {
+            "chunk_size": chunk_size,
+            "count": max(math.ceil(size / chunk_size), 1),
+            "sha256": part_sha256,
+        },
+    }
+
+
+def check_compression(
+    compression: dict,
+    artifact_sha256: str,
+    max_accuracy_drop: float | None = DEFAULT_MAX_ACCURACY_DROP,
+    max_latency_ratio: float | None = DEFAULT_MAX_LATENCY_RATIO,
+) -> None:
+    """Refuse a compressed artifact that regresses beyond the thresholds.
+
+    Args:
+        compression: Contents of ``compression.json``.
+        artifact_sha256: sha256 of the artifact being promoted.
+        max_accuracy_drop: Largest allowed top-1 accuracy drop (absolute);
+            ``None`` disables the check.
+        max_latency_ratio: Largest allowed compressed/source latency ratio;
+            ``None`` disables the check.
+
+    Raises:
+        ValueError: If the manifest describes a different artifact or a
+            threshold is exceeded.
+    """
+    if compression.get("artifact_sha256") != artifact_sha256:
+        raise ValueError(
+            f"{_COMPRESSION_MANIFEST} does not describe this artifact "
+            "(sha256 mismatch); re-run recbuddy.compress"
+        )
+    drop = -compression["deltas"]["top1_accuracy"]
+    if max_accuracy_drop is not None and drop > max_accuracy_drop:
+        raise ValueError(
+            f"Compressed artifact regresses top-1 accuracy by {drop:.4f} "
+            f"(max {max_accuracy_drop})"
+        )
+    ratio = compression["latency_ratio"]
+    if max_latency_ratio is not None and ratio > max_latency_ratio:
+        raise ValueError(
+            f"Compressed artifact regresses latency to {ratio:.2f}x the source "
+            f"(max {max_latency_ratio})"
+        )
+
+
 def _git_sha() -> str | None:
     """Return short git SHA of HEAD, or None if not in a repo."""
     try:
@@ -69,6 +183,11 @@ def promote(
     aws_access_key_id: Optional[str] = None,
     aws_secret_access_key: Optional[str] = None,
     region_name: str = "us-east-1",
+    max_accuracy_drop: float | None = DEFAULT_MAX_ACCURACY_DROP,
+    max_latency_ratio: float | None = DEFAULT_MAX_LATENCY_RATIO,
+    channel: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
 ) -> str:
     """Upload a local artifact to a versioned S3 prefix with manifest.
 
@@ -80,18 +199,40 @@ def promote(
         aws_access_key_id: Optional AWS access key.
         aws_secret_access_key: Optional AWS secret key.
         region_name: AWS region.
+        max_accuracy_drop: See :func:`check_compression`; only applies when
+            the artifact has a compression manifest.
+        max_latency_ratio: See :func:`check_compression`.
+        channel: Registry channel to point at the new version once it is
+            uploaded; ``None`` leaves every channel unchanged.
+        chunk_size: Multipart part size in bytes; files of at most one part
+            are uploaded with a single PUT.
+        max_concurrency: Parts uploaded in parallel.
 
     Returns:
         The full S3 URI of the uploaded artifact.
 
     Raises:
         FileNotFoundError: If artifact does not exist.
-        ValueError: If the version already exists in S3.
+        ValueError: If the version already exists in S3, or a compressed
+            artifact regresses beyond the thresholds.
     """
     artifact = Path(artifact)
     if not artifact.exists():
         raise FileNotFoundError(f"Artifact not found: {artifact}")
 
+    if channel is not None:
+        registry.channel_key(channel)  # validate before uploading anything
+    digest = file_digest(artifact, chunk_size)
+    artifact_sha256 = digest["sha256"]
+    compression = _find_compression_manifest(artifact.parent)
+    if compression is not None:
+        check_compression(
+            compression,
+            artifact_sha256,
+            max_accuracy_drop=max_accuracy_drop,
+            max_latency_ratio=max_latency_ratio,
+        )
+
     if version is None:
         version = _read_version()
 
@@ -104,7 +245,7 @@ def promote(
     )
 
     prefix = f"artifacts/{version}/"
-    existing = client.list_objects_v2(Bucket=s3_bucket, Prefix=prefix)
+    existing = client.list_objects_v2(Bucket=s3_bucket, Prefix=prefix, MaxKeys=1)
     if existing.get("Contents"):
         raise ValueError(
             f"Version {version} already exists in s3://{s3_bucket}/{prefix}. "
@@ -112,13 +253,48 @@ def promote(
         )
 
     artifact_key = f"{prefix}model.safetensors"
-    logger.info("Uploading to s3://%s/%s", s3_bucket, artifact_key)
-    client.upload_file(str(artifact), s3_bucket, artifact_key)
+    transfer = TransferConfig(
+        multipart_threshold=chunk_size + 1,
+        multipart_chunksize=chunk_size,
+        max_concurrency=max_concurrency,
+    )
+    source_version = registry.find_by_sha256(client, s3_bucket, artifact_sha256)
+    if source_version is not None:
+        source_key = f"artifacts/{source_version}/model.safetensors"
+        logger.info(
+            "Identical bytes already promoted as %s; copying s3://%s/%s",
+            source_version,
+            s3_bucket,
+            source_key,
+        )
+        try:
+            client.copy(
+                {"Bucket": s3_bucket, "Key": source_key},
+                s3_bucket,
+                artifact_key,
+                Config=transfer,
+            )
+        except ClientError:
+            logger.warning("Copy from %s failed; uploading instead", source_key)
+            source_version = None
+    if source_version is None:
+        logger.info(
+            "Uploading to s3://%s/%s (%d parts)",
+            s3_bucket,
+            artifact_key,
+            digest["parts"]["count"],
+        )
+        client.upload_file(str(artifact), s3_bucket, artifact_key, Config=transfer)
 
     training_meta = _find_training_metadata(artifact.parent)
     manifest = {
         "version": version,
         "artifact_key": artifact_key,
+        "sha256": artifact_sha256,
+        "size_bytes": digest["size_bytes"],
+        "etag": digest["etag"],
+        "parts": digest["parts"],
+        "deduplicated_from": source_version,
         "training": {
             "epochs": training_meta.get("epochs") if training_meta else None,
             "val_accuracy": (
@@ -126,7 +302,27 @@ def promote(
             ),
             "seed": training_meta.get("seed") if training_meta else None,
             "num_classes": training_meta.get("num_classes") if training_meta else None,
+            "architecture": (
+                training_meta.get("architecture") if training_meta else None
+            ),
+            "distillation": (
+                training_meta.get("distillation") if training_meta else None
+            ),
         },
+        "compression": (
+            {
+                key: compression[key]
+                for key in (
+                    "source_sha256",
+                    "prune_ratio",
+                    "size_ratio",
+                    "latency_ratio",
+                    "deltas",
+                )
+            }
+            if compression
+            else None
+        ),
         "promotion": {
             "promoted_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "promoted_by": os.environ.get("USER", "unknown"),
@@ -143,6 +339,11 @@ def promote(
     )
     logger.info("Manifest written to s3://%s/%s", s3_bucket, manifest_key)
 
+    if channel is not None:
+        registry.point_channel(client, s3_bucket, channel, manifest)
+    # Last, so a marker only ever names a fully promoted version.
+    registry.record_digest(client, s3_bucket, artifact_sha256, version)
+
     uri = f"s3://{s3_bucket}/{artifact_key}"
     logger.info("Promoted: %s -> %s", artifact, uri)
     return uri
@@ -161,6 +362,39 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--s3-endpoint-url", default=None, help="S3 endpoint URL (for LocalStack)"
     )
+    parser.add_argument(
+        "--channel",
+        default=registry.LATEST_CHANNEL,
+        help="Registry channel to move to the new version "
+        f"(default: {registry.LATEST_CHANNEL}; '' to leave channels alone)",
+    )
+    parser.add_argument(
+        "--chunk-size-mb",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+        help="Multipart part size in MiB "
+        f"(default: {DEFAULT_CHUNK_SIZE // (1024 * 1024)})",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=f"Parts uploaded in parallel (default: {DEFAULT_MAX_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--max-accuracy-drop",
+        type=float,
+        default=DEFAULT_MAX_ACCURACY_DROP,
+        help="Refuse compressed artifacts losing more top-1 accuracy than this "
+        f"(default: {DEFAULT_MAX_ACCURACY_DROP})",
+    )
+    parser.add_argument(
+        "--max-latency-ratio",
+        type=float,
+        default=DEFAULT_MAX_LATENCY_RATIO,
+        help="Refuse compressed artifacts slower than this multiple of the source "
+        f"(default: {DEFAULT_MAX_LATENCY_RATIO})",
+    )
     return parser.parse_args()
 
 
@@ -174,5 +408,10 @@ if __name__ == "__main__":
         aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
         aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
         region_name=os.environ.get("AWS_REGION", "us-east-1"),
+        max_accuracy_drop=args.max_accuracy_drop,
+        max_latency_ratio=args.max_latency_ratio,
+        channel=args.channel or None,
+        chunk_size=args.chunk_size_mb * 1024 * 1024,
+        max_concurrency=args.max_concurrency,
     )
     print(f"Promoted to {uri}")
@@ -0,0 +1,302 @@
+"""Model registry on top of the versioned artifacts written by ``promote``.
+
+S3 layout (all under the artifacts bucket)::
+
+    artifacts/{version}/model.safetensors
+    artifacts/{version}/manifest.json     # includes sha256 and size_bytes
+    artifacts/channels/{channel}.json     # pointer: version, key, sha256, history
+    artifacts/sha256/{sha256}/{version}   # empty marker: these bytes, that version
+
+The version index is the set of ``artifacts/{version}/`` prefixes, read with
+a single delimited LIST. A channel pointer is a few hundred bytes naming one
+version together with its artifact key and sha256, so the API resolves
+"latest promoted" (the ``latest`` channel, moved by ``promote``) or a named
+channel such as ``stable`` with one small GET, and can reuse a local copy of
+the artifact by hash. Rolling out or back is a pointer update; no artifact
+is copied. The sha256 markers let ``promote`` find an existing copy of
+identical bytes with one LIST and copy it server-side instead of uploading.
+
+Usage:
+    uv run python -m recbuddy.registry --s3-bucket recycling-buddy-data list
+    uv run python -m recbuddy.registry --s3-bucket recycling-buddy-data \
+        set --channel stable --version 0.2.0
+    uv run python -m recbuddy.registry --s3-bucket recycling-buddy-data \
+        rollback --channel stable
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_PREFIX: str = "artifacts/"
+CHANNELS_PREFIX: str = "artifacts/channels/"
+DIGESTS_PREFIX: str = "artifacts/sha256/"
+LATEST_CHANNEL: str = "latest"
+
+# Earlier versions of a channel remembered for rollback, newest last.
+HISTORY_LIMIT: int = 10
+
+_CHANNEL_PATTERN = re.compile(r"^[a-z0-9][a-z0-9._-]*$")
+
+
+def channel_key(channel: str) -> str:
+    """Return the S3 key of ``channel``'s pointer.
+
+    Raises:
+        ValueError: If ``channel`` is not a lowercase slug.
+    """
+    if not _CHANNEL_PATTERN.match(channel):
+        raise ValueError(
+            f"Invalid channel {channel!r}: use lowercase letters, digits, '.', "
+            "'_' and '-'"
+        )
+    return f"{CHANNELS_PREFIX}{channel}.json"
+
+
+def manifest_key(version: str) -> str:
+    """Return the S3 key of ``version``'s manifest."""
+    return f"{ARTIFACTS_PREFIX}{version}/manifest.json"
+
+
+def _version_key(version: str) -> tuple:
+    # Semver-ish ordering; non-numeric parts sort after numeric ones.
+    return tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"[.+-]", version)
+    )
+
+
+def _get_json(client: Any, bucket: str, key: str) -> Optional[dict]:
+    """Return the JSON object at ``key``, or ``None`` if it does not exist."""
+    try:
+        response = client.get_object(Bucket=bucket, Key=key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        raise
+    return json.loads(response["Body"].read())
+
+
+def list_versions(client: Any, bucket: str) -> list[str]:
+    """Return every promoted version, oldest first."""
+    versions: list[str] = []
+    kwargs = {"Bucket": bucket, "Prefix": ARTIFACTS_PREFIX, "Delimiter": "/"}
+    while True:
+        response = client.list_objects_v2(**kwargs)
+        for entry in response.get("CommonPrefixes", []):
+            prefix = entry["Prefix"]
+            if prefix not in (CHANNELS_PREFIX, DIGESTS_PREFIX):
+                versions.append(prefix[len(ARTIFACTS_PREFIX) :].rstrip("/"))
+        if not response.get("IsTruncated"):
+            break
+        kwargs["ContinuationToken"] = response["NextContinuationToken"]
+    return sorted(versions, key=_version_key)
+
+
+def _exists(client: Any, bucket: str, key: str) -> bool:
+    try:
+        client.head_object(Bucket=bucket, Key=key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return False
+        raise
+    return True
+
+
+def find_by_sha256(client: Any, bucket: str, sha256: str) -> Optional[str]:
+    """Return a promoted version whose artifact has ``sha256``, or ``None``.
+
+    Markers whose version has no manifest (a promote that failed part-way)
+    are skipped.
+    """
+    response = client.list_objects_v2(
+        Bucket=bucket, Prefix=f"{DIGESTS_PREFIX}{sha256}/", MaxKeys=10
+    )
+    for entry in response.get("Contents", []):
+        version = entry["Key"].rsplit("/", 1)[-1]
+        if _exists(client, bucket, manifest_key(version)):
+            return version
+        logger.warning("Ignoring digest marker for %s: no manifest", version)
+    return None
+
+
+def record_digest(client: Any, bucket: str, sha256: str, version: str) -> None:
+    """Mark ``version``'s artifact as having ``sha256``; see :func:`find_by_sha256`.
+
+    Write it only after the version's artifact and manifest exist.
+    """
+    client.put_object(
+        Bucket=bucket, Key=f"{DIGESTS_PREFIX}{sha256}/{version}", Body=b""
+    )
+
+
+def read_manifest(client: Any, bucket: str, version: str) -> dict:
+    """Return ``version``'s manifest.
+
+    Raises:
+        ValueError: If the version was never promoted.
+    """
+    manifest = _get_json(client, bucket, manifest_key(version))
+    if manifest is None:
+        raise ValueError(f"No manifest for version {version} in s3://{bucket}")
+    return manifest
+
+
+def read_channel(client: Any, bucket: str, channel: str) -> Optional[dict]:
+    """Return ``channel``'s pointer, or ``None`` if the channel is unset."""
+    return _get_json(client, bucket, channel_key(channel))
+
+
+def _history(pointer: Optional[dict]) -> list[str]:
+    """Return the versions ``pointer`` replaced, newest last."""
+    if pointer is None:
+        return []
+    if "history" in pointer:
+        return list(pointer["history"])
+    # Pointers written before history was kept only name their previous version.
+    return [pointer["previous"]] if pointer.get("previous") else []
+
+
+def point_channel(
+    client: Any,
+    bucket: str,
+    channel: str,
+    manifest: dict,
+    history: Optional[list[str]] = None,
+) -> dict:
+    """Point ``channel`` at the version described by ``manifest``.
+
+    The version being replaced is appended to the pointer's ``history``
+    (up to :data:`HISTORY_LIMIT` entries) so :func:`rollback` can step back
+    through it; ``previous`` is the newest entry. Re-pointing at the current
+    version leaves the history unchanged.
+
+    Args:
+        client: boto3 S3 client.
+        bucket: Artifacts bucket.
+        channel: Channel to move.
+        manifest: Manifest of the target version.
+        history: History to write instead of extending the current one
+            (used by :func:`rollback`).
+
+    Returns:
+        The new pointer.
+    """
+    key = channel_key(channel)
+    current = _get_json(client, bucket, key)
+    if history is None:
+        history = _history(current)
+        if current and current["version"] != manifest["version"]:
+            history.append(current["version"])
+    history = history[-HISTORY_LIMIT:]
+    pointer = {
+        "channel": channel,
+        "version": manifest["version"],
+        "artifact_key": manifest["artifact_key"],
+        "sha256": manifest.get("sha256"),
+        "size_bytes": manifest.get("size_bytes"),
+        "previous": history[-1] if history else None,
+        "history": history,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "updated_by": os.environ.get("USER", "unknown"),
+    }
+    client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(pointer, indent=2).encode(),
+        ContentType="application/json",
+        CacheControl="no-cache",
+    )
+    logger.info(
+        "Channel %s: %s -> %s",
+        channel,
+        current["version"] if current else None,
+        pointer["version"],
+    )
+    return pointer
+
+
+def set_channel(client: Any, bucket: str, channel: str, version: str) -> dict:
+    """Point ``channel`` at an already-promoted ``version``.
+
+    Raises:
+        ValueError: If the version was never promoted.
+    """
+    manifest = read_manifest(client, bucket, version)
+    return point_channel(client, bucket, channel, manifest)
+
+
+def rollback(client: Any, bucket: str, channel: str) -> dict:
+    """Point ``channel`` back at the version it pointed to before.
+
+    The target is popped off the history rather than the current version
+    pushed onto it, so repeated rollbacks keep stepping back instead of
+    alternating between two versions.
+
+    Raises:
+        ValueError: If the channel is unset or has no earlier version.
+    """
+    pointer = read_channel(client, bucket, channel)
+    history = _history(pointer)
+    while history and pointer is not None and history[-1] == pointer["version"]:
+        history.pop()
+    if pointer is None or not history:
+        raise ValueError(f"Channel {channel!r} has no previous version to roll back to")
+    target = history.pop()
+    manifest = read_manifest(client, bucket, target)
+    return point_channel(client, bucket, channel, manifest, history=history)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect and move model channels.")
+    parser.add_argument("--s3-bucket", required=True, help="Artifacts S3 bucket")
+    parser.add_argument(
+        "--s3-endpoint-url", default=None, help="S3 endpoint URL (for LocalStack)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List promoted versions")
+    show = commands.add_parser("show", help="Print a channel pointer")
+    show.add_argument("--channel", default=LATEST_CHANNEL)
+    set_ = commands.add_parser("set", help="Point a channel at a version")
+    set_.add_argument("--channel", required=True)
+    set_.add_argument("--version", required=True)
+    back = commands.add_parser(
+        "rollback", help="Point a channel at its previous version"
+    )
+    back.add_argument("--channel", required=True)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = _parse_args()
+    s3 = boto3.client(
+        "s3",
+        endpoint_url=args.s3_endpoint_url,
+        aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.environ.get("AWS_REGION", "us-east-1"),
+    )
+    if args.command == "list":
+        result: Any = list_versions(s3, args.s3_bucket)
+    elif args.command == "show":
+        result = read_channel(s3, args.s3_bucket, args.channel)
+    elif args.command == "set":
+        result = set_channel(s3, args.s3_bucket, args.channel, args.version)
+    else:
+        result = rollback(s3, args.s3_bucket, args.channel)
+    print(json.dumps(result, indent=2))
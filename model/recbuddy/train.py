@@ -1,9 +1,13 @@
 """Training pipeline for the waste item classifier.
 
-Two-phase transfer learning on EfficientNet-B0:
+Two-phase transfer learning on EfficientNet-B0 (or, with ``--architecture
+mobilenet_v3_small``, the cheap first stage of a serving cascade):
   Phase 1 — Backbone frozen, head-only AdamW, CrossEntropyLoss(label_smoothing=0.1)
   Phase 2 — Full fine-tune with differential LRs, SequentialLR warmup→cosine, Mixup
 
+With ``--teacher <artifact>`` the student is trained with a distillation
+loss against that teacher's logits (see :mod:`recbuddy.distill`).
+
 Usage:
     uv run python -m recbuddy.train \
         --s3-bucket recycling-buddy-data \
@@ -18,42 +22,71 @@ import logging
 import random
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+import boto3
 import numpy as np
 import torch
 import torch.nn as nn
-import torchvision.models as models
 from safetensors.torch import save_file
 from torch.utils.data import DataLoader
-from torchvision.models import EfficientNet_B0_Weights
 
+from recbuddy.checkpoint import (
+    AsyncCheckpointWriter,
+    TrainingState,
+    load_training_state,
+)
 from recbuddy.dataset import WasteDataset
+from recbuddy.distill import (
+    DEFAULT_ALPHA,
+    DEFAULT_TEMPERATURE,
+    DistillationLoss,
+    TeacherLogitDataset,
+    distillation_metadata,
+    teacher_logits,
+    teacher_split_id,
+)
 from recbuddy.labels import ALL_LABELS_LIST
+from recbuddy.modeling import (
+    ARCHITECTURE,
+    ARCHITECTURES,
+    artifact_metadata,
+    build_architecture,
+)
+from recbuddy.optimize import (
+    bf16_autocast,
+    contiguous_state_dict,
+    optimize_for_training,
+)
+from recbuddy.profiling import TrainingProfiler
 
 logger = logging.getLogger(__name__)
 
-_EFFICIENTNET_FEATURE_DIM: int = 1280
-
 
 # ---------------------------------------------------------------------------
 # Model construction
 # ---------------------------------------------------------------------------
 
 
-def build_model(num_classes: int = len(ALL_LABELS_LIST)) -> nn.Module:
-    """Load EfficientNet-B0 with ImageNet weights and replace the head.
+def build_model(
+    num_classes: int = len(ALL_LABELS_LIST),
+    pretrained: bool = True,
+    architecture: str = ARCHITECTURE,
+) -> nn.Module:
+    """Load a backbone with ImageNet weights and replace the head.
 
     Args:
         num_classes: Number of output classes.
+        pretrained: Load ImageNet weights; ``False`` gives a random
+            initialisation (benchmarks, tests).
+        architecture: One of :data:`recbuddy.modeling.ARCHITECTURES`.
 
     Returns:
-        EfficientNet-B0 with the final linear layer replaced to output
-        ``num_classes`` logits. Weights are pre-loaded from ImageNet.
+        The backbone (EfficientNet-B0 by default) with the final linear layer
+        replaced to output ``num_classes`` logits. Weights are pre-loaded
+        from ImageNet.
     """
-    model = models.efficientnet_b0(weights=EfficientNet_B0_Weights.IMAGENET1K_V1)
-    model.classifier[1] = nn.Linear(_EFFICIENTNET_FEATURE_DIM, num_classes)
-    return model
+    return build_architecture(architecture, num_classes, pretrained=pretrained)
 
 
 # ---------------------------------------------------------------------------
@@ -68,7 +101,7 @@ def freeze_backbone(model: nn.Module) -> None:
     ``requires_grad == True``.  All other parameters are frozen.
 
     Args:
-        model: EfficientNet-B0 returned by :func:`build_model`.
+        model: Backbone returned by :func:`build_model`.
     """
     for name, param in model.named_parameters():
         if "classifier" not in name:
@@ -126,6 +159,8 @@ def train_one_epoch(
     loader: DataLoader,
     optimizer: torch.optim.Optimizer,
     criterion: nn.Module,
+    profiler: Optional[TrainingProfiler] = None,
+    bf16: bool = False,
 ) -> float:
     """Run one full pass over ``loader`` and return the mean batch loss.
 
@@ -134,22 +169,29 @@ def train_one_epoch(
         loader: DataLoader yielding (images, labels) batches.
         optimizer: Optimiser; its ``zero_grad`` and ``step`` are called.
         criterion: Loss function (e.g. ``nn.CrossEntropyLoss``).
+        profiler: Optional profiler receiving per-phase step timings.
+        bf16: Run the forward pass and loss under bfloat16 autocast.
 
     Returns:
         Mean loss across all batches as a plain Python float.
     """
+    profiler = profiler or TrainingProfiler()
     model.train()
     total_loss = 0.0
     n_batches = 0
 
-    for images, labels in loader:
-        optimizer.zero_grad()
-        logits = model(images)
-        loss = criterion(logits, labels)
-        loss.backward()
-        optimizer.step()
+    for images, labels in profiler.timed_iter(loader):
+        with profiler.phase("forward"), bf16_autocast(bf16):
+            optimizer.zero_grad()
+            logits = model(images)
+            loss = criterion(logits, labels)
+        with profiler.phase("backward"):
+            loss.backward()
+        with profiler.phase("optimizer_step"):
+            optimizer.step()
         total_loss += loss.item()
         n_batches += 1
+        profiler.step(images.size(0))
 
     return total_loss / max(n_batches, 1)
 
@@ -161,11 +203,14 @@ def train_one_epoch(
 
 def _mixup_batch(
     images: torch.Tensor,
-    labels: torch.Tensor,
+    labels: Any,
     alpha: float = 0.2,
-) -> tuple[torch.Tensor, torch.Tensor, torch.Tensor, float]:
+) -> tuple[torch.Tensor, Any, Any, float]:
     """Apply Mixup augmentation to a batch.
 
+    ``labels`` is a tensor, or a list of tensors (e.g. labels and teacher
+    logits when distilling) that are permuted together.
+
     Returns:
         (mixed_images, labels_a, labels_b, lam) for computing the mixed loss.
     """
@@ -173,19 +218,9 @@ def _mixup_batch(
     batch_size = images.size(0)
     idx = torch.randperm(batch_size)
     mixed = lam * images + (1 - lam) * images[idx]
-    return mixed, labels, labels[idx], lam
-
-
-def _save_checkpoint(
-    model: nn.Module,
-    checkpoint_dir: Path,
-    epoch: int,
-) -> None:
-    """Save a safetensors checkpoint after each epoch."""
-    checkpoint_dir.mkdir(parents=True, exist_ok=True)
-    path = checkpoint_dir / f"checkpoint_epoch_{epoch:03d}.safetensors"
-    save_file(model.state_dict(), str(path))
-    logger.info("Checkpoint saved: %s", path)
+    if isinstance(labels, torch.Tensor):
+        return mixed, labels, labels[idx], lam
+    return mixed, labels, [part[idx] for part in labels], lam
 
 
 def train(
@@ -206,6 +241,16 @@ def train(
     aws_access_key_id: Optional[str] = None,
     aws_secret_access_key: Optional[str] = None,
     region_name: str = "us-east-1",
+    profile_steps: Optional[tuple[int, int]] = None,
+    keep_checkpoints: Optional[int] = 3,
+    checkpoint_s3_bucket: Optional[str] = None,
+    bf16: bool = False,
+    channels_last: bool = True,
+    architecture: str = ARCHITECTURE,
+    teacher: Optional[str] = None,
+    distill_temperature: float = DEFAULT_TEMPERATURE,
+    distill_alpha: float = DEFAULT_ALPHA,
+    teacher_cache_dir: Optional[str] = "cache/logits",
 ) -> Path:
     """Run the full two-phase training pipeline.
 
@@ -220,6 +265,9 @@ def train(
         epochs: Total epochs across both phases.
         seed: Random seed for reproducibility.
         resume: Optional path to a safetensors checkpoint to resume from.
+            If its ``.state.safetensors`` sidecar exists, the optimizer,
+            scheduler, phase, epoch, best accuracy and RNG states are
+            restored and training continues where it stopped.
         num_classes: Number of output classes.
         batch_size: DataLoader batch size.
         phase1_epochs: Number of epochs for Phase 1 (head-only).
@@ -232,13 +280,37 @@ def train(
         aws_access_key_id: Optional AWS access key.
         aws_secret_access_key: Optional AWS secret key.
         region_name: AWS region.
+        profile_steps: Optional ``(start, end)`` global step window to
+            capture with ``torch.profiler``; traces go to
+            ``<output_dir>/profiles/``.
+        keep_checkpoints: Keep only this many recent checkpoints (plus the
+            best by validation accuracy). ``None`` keeps all of them.
+        checkpoint_s3_bucket: If set, upload each checkpoint to
+            ``s3://<bucket>/checkpoints/<run timestamp>/`` in the background.
+        bf16: Run forward passes (training and validation) under bfloat16
+            autocast. Weights and optimizer state stay fp32.
+        channels_last: Train in the NHWC memory format. Checkpoints and the
+            artifact are always written in the default layout.
+        architecture: Backbone to train; recorded in the artifact metadata.
+        teacher: Optional path to a trained artifact to distil from. Its
+            logits on the training split are computed once (cached under
+            ``teacher_cache_dir``) and the student is trained with
+            :class:`~recbuddy.distill.DistillationLoss`;
+            ``label_smoothing`` then applies to its cross-entropy term only.
+        distill_temperature: Softmax temperature of the distillation term.
+        distill_alpha: Weight of the teacher distribution in the targets.
+        teacher_cache_dir: Logit cache root for the teacher, or ``None`` to
+            recompute on every run.
 
     Returns:
         Path to the saved model artifact.
     """
-    _set_seeds(seed)
+    set_seeds(seed)
     output_dir = Path(output_dir)
     checkpoint_dir = output_dir.parent / "checkpoints"
+    profiler = TrainingProfiler(
+        trace_dir=output_dir / "profiles", trace_window=profile_steps
+    )
 
     # ----- data -----
     dataset = WasteDataset(
@@ -251,22 +323,81 @@ def train(
     logger.info("Downloading dataset from s3://%s", s3_bucket)
     dataset.download()
 
+    run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    checkpoints = AsyncCheckpointWriter(
+        checkpoint_dir,
+        keep_last=keep_checkpoints,
+        s3_client=(
+            boto3.client(
+                "s3",
+                endpoint_url=s3_endpoint_url,
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                region_name=region_name,
+            )
+            if checkpoint_s3_bucket
+            else None
+        ),
+        s3_bucket=checkpoint_s3_bucket,
+        s3_prefix=f"checkpoints/{run_id}/",
+        adopt=resume is not None,
+    )
+
     train_ds, val_ds, _ = dataset.get_splits(seed=seed)
+    if teacher is not None:
+        all_keys = dataset.sample_keys(train_ds.dataset)
+        record = teacher_logits(
+            teacher,
+            train_ds,
+            teacher_split_id([all_keys[i] for i in train_ds.indices]),
+            num_classes,
+            cache_dir=teacher_cache_dir,
+            batch_size=batch_size,
+            bf16=bf16,
+        )
+        logger.info(
+            "Distilling from %s (T=%.1f, alpha=%.2f)",
+            teacher,
+            distill_temperature,
+            distill_alpha,
+        )
+        train_ds = TeacherLogitDataset(train_ds, record)
     train_loader = DataLoader(
         train_ds, batch_size=batch_size, shuffle=True, num_workers=0
     )
     val_loader = DataLoader(val_ds, batch_size=batch_size, shuffle=False, num_workers=0)
 
     # ----- model -----
-    model = build_model(num_classes=num_classes)
+    model = build_model(num_classes=num_classes, architecture=architecture)
+    resume_state: Optional[TrainingState] = None
     if resume:
         from safetensors.torch import load_file
 
         state = load_file(resume)
         model.load_state_dict(state)
-        logger.info("Resumed from checkpoint: %s", resume)
+        resume_state = load_training_state(resume)
+        if resume_state is None:
+            logger.warning(
+                "No training state next to %s — resuming weights only", resume
+            )
+        else:
+            logger.info(
+                "Resumed from checkpoint: %s (phase %d, epoch %d)",
+                resume,
+                resume_state.phase,
+                resume_state.epoch,
+            )
+    optimize_for_training(model, channels_last=channels_last)
+    # Last completed global epoch; 0 for a fresh run.
+    start_epoch = resume_state.epoch if resume_state else 0
 
-    criterion = nn.CrossEntropyLoss(label_smoothing=label_smoothing)
+    criterion: nn.Module = (
+        DistillationLoss(
+            distill_temperature, distill_alpha, label_smoothing=label_smoothing
+        )
+        if teacher is not None
+        else nn.CrossEntropyLoss(label_smoothing=label_smoothing)
+    )
 
     # -------------------------------------------------------------------
     # Phase 1: head-only training
@@ -277,10 +408,18 @@ def train(
         [p for p in model.parameters() if p.requires_grad], lr=head_lr
     )
 
-    best_val_acc = 0.0
-    for epoch in range(1, phase1_epochs + 1):
-        train_loss = train_one_epoch(model, train_loader, optimizer, criterion)
-        val_acc = _evaluate(model, val_loader, num_classes)
+    best_val_acc = resume_state.best_val_acc if resume_state else 0.0
+    if resume_state is not None:
+        if resume_state.phase == 1:
+            optimizer.load_state_dict(resume_state.optimizer)
+        resume_state.restore_rng()
+
+    for epoch in range(start_epoch + 1, phase1_epochs + 1):
+        train_loss = train_one_epoch(
+            model, train_loader, optimizer, criterion, profiler=profiler, bf16=bf16
+        )
+        with profiler.phase("evaluate"):
+            val_acc = _evaluate(model, val_loader, num_classes, bf16=bf16)
         if val_acc > best_val_acc:
             best_val_acc = val_acc
         logger.info(
@@ -290,7 +429,18 @@ def train(
             train_loss,
             val_acc,
         )
-        _save_checkpoint(model, checkpoint_dir, epoch)
+        with profiler.phase("checkpoint"):
+            checkpoints.save(
+                model.state_dict(),
+                epoch,
+                metric=val_acc,
+                training_state=TrainingState.capture(
+                    phase=1,
+                    epoch=epoch,
+                    best_val_acc=best_val_acc,
+                    optimizer=optimizer,
+                ),
+            )
 
     # -------------------------------------------------------------------
     # Phase 2: full fine-tuning with differential LRs
@@ -313,28 +463,37 @@ def train(
         schedulers=[warmup_scheduler, cosine_scheduler],
         milestones=[3],
     )
+    if resume_state is not None and resume_state.phase == 2:
+        optimizer2.load_state_dict(resume_state.optimizer)
+        scheduler.load_state_dict(resume_state.scheduler)
 
-    for epoch in range(1, phase2_epochs + 1):
+    for epoch in range(max(start_epoch - phase1_epochs, 0) + 1, phase2_epochs + 1):
         model.train()
         total_loss = 0.0
         n_batches = 0
-        for images, labels in train_loader:
-            mixed_images, labels_a, labels_b, lam = _mixup_batch(
-                images, labels, alpha=mixup_alpha
-            )
-            optimizer2.zero_grad()
-            logits = model(mixed_images)
-            loss = lam * criterion(logits, labels_a) + (1 - lam) * criterion(
-                logits, labels_b
-            )
-            loss.backward()
-            optimizer2.step()
+        for images, labels in profiler.timed_iter(train_loader):
+            with profiler.phase("mixup"):
+                mixed_images, labels_a, labels_b, lam = _mixup_batch(
+                    images, labels, alpha=mixup_alpha
+                )
+            with profiler.phase("forward"), bf16_autocast(bf16):
+                optimizer2.zero_grad()
+                logits = model(mixed_images)
+                loss = lam * criterion(logits, labels_a) + (1 - lam) * criterion(
+                    logits, labels_b
+                )
+            with profiler.phase("backward"):
+                loss.backward()
+            with profiler.phase("optimizer_step"):
+                optimizer2.step()
             total_loss += loss.item()
             n_batches += 1
+            profiler.step(images.size(0))
 
         train_loss = total_loss / max(n_batches, 1)
         scheduler.step()
-        val_acc = _evaluate(model, val_loader, num_classes)
+        with profiler.phase("evaluate"):
+            val_acc = _evaluate(model, val_loader, num_classes, bf16=bf16)
         if val_acc > best_val_acc:
             best_val_acc = val_acc
         global_epoch = phase1_epochs + epoch
@@ -345,22 +504,56 @@ def train(
             train_loss,
             val_acc,
         )
-        _save_checkpoint(model, checkpoint_dir, global_epoch)
+        with profiler.phase("checkpoint"):
+            checkpoints.save(
+                model.state_dict(),
+                global_epoch,
+                metric=val_acc,
+                training_state=TrainingState.capture(
+                    phase=2,
+                    epoch=global_epoch,
+                    best_val_acc=best_val_acc,
+                    optimizer=optimizer2,
+                    scheduler=scheduler,
+                ),
+            )
 
     # -------------------------------------------------------------------
     # Save final artifact
     # -------------------------------------------------------------------
+    with profiler.phase("checkpoint"):
+        checkpoints.close()
     output_dir.mkdir(parents=True, exist_ok=True)
     artifact_path = output_dir / "model.safetensors"
-    save_file(model.state_dict(), str(artifact_path))
+    save_file(
+        contiguous_state_dict(model),
+        str(artifact_path),
+        metadata=artifact_metadata(num_classes, architecture),
+    )
     logger.info("Artifact saved: %s", artifact_path)
 
+    profiler.close()
+    profile = profiler.summary()
+    logger.info(
+        "Throughput: %.1f images/sec over %d steps, peak RSS %.0f MiB",
+        profile["images_per_sec"],
+        profile["steps"],
+        profile["peak_rss_mb"],
+    )
+
     metadata = {
         "epochs": epochs,
         "val_accuracy": round(best_val_acc, 4),
         "seed": seed,
         "num_classes": num_classes,
+        "architecture": architecture,
         "timestamp": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()),
+        "precision": "bf16" if bf16 else "fp32",
+        "memory_format": "channels_last" if channels_last else "contiguous",
+        "profile": profile,
+        "distillation": distillation_metadata(
+            teacher, distill_temperature, distill_alpha
+        ),
     }
     meta_path = output_dir / f"training_run_{metadata['timestamp']}.json"
     meta_path.write_text(json.dumps(metadata, indent=2))
@@ -374,18 +567,20 @@ def train(
 # ---------------------------------------------------------------------------
 
 
-def _set_seeds(seed: int) -> None:
-    """Set all random seeds for reproducibility."""
+def set_seeds(seed: int) -> None:
+    """Seed the Python, NumPy and torch global RNGs for reproducibility."""
     random.seed(seed)
     np.random.seed(seed)
     torch.manual_seed(seed)
 
 
-def _evaluate(model: nn.Module, loader: DataLoader, num_classes: int) -> float:
+def _evaluate(
+    model: nn.Module, loader: DataLoader, num_classes: int, bf16: bool = False
+) -> float:
     """Return top-1 accuracy on ``loader``."""
     model.eval()
     correct = total = 0
-    with torch.inference_mode():
+    with torch.inference_mode(), bf16_autocast(bf16):
         for images, labels in loader:
             logits = model(images)
             preds = logits.argmax(dim=1)
@@ -423,6 +618,63 @@ def _parse_args() -> argparse.Namespace:
         default=None,
         help="S3 endpoint URL (for LocalStack in dev)",
     )
+    parser.add_argument(
+        "--keep-checkpoints",
+        type=int,
+        default=3,
+        help="Keep only the last K checkpoints plus the best (default: 3)",
+    )
+    parser.add_argument(
+        "--checkpoint-s3-bucket",
+        default=None,
+        help="Upload checkpoints to this S3 bucket in the background",
+    )
+    parser.add_argument(
+        "--bf16",
+        action="store_true",
+        help="Train with bfloat16 autocast (CPUs with AVX512-BF16/AMX)",
+    )
+    parser.add_argument(
+        "--no-channels-last",
+        action="store_true",
+        help="Train in the default NCHW memory format instead of channels_last",
+    )
+    parser.add_argument(
+        "--architecture",
+        choices=ARCHITECTURES,
+        default=ARCHITECTURE,
+        help=f"Backbone to train (default: {ARCHITECTURE})",
+    )
+    parser.add_argument(
+        "--teacher",
+        default=None,
+        help="Distil from this trained .safetensors artifact",
+    )
+    parser.add_argument(
+        "--distill-temperature",
+        type=float,
+        default=DEFAULT_TEMPERATURE,
+        help=f"Distillation softmax temperature (default: {DEFAULT_TEMPERATURE})",
+    )
+    parser.add_argument(
+        "--distill-alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help=f"Weight of the distillation term (default: {DEFAULT_ALPHA})",
+    )
+    parser.add_argument(
+        "--teacher-cache-dir",
+        default="cache/logits",
+        help="Where to cache the teacher's logits (default: cache/logits)",
+    )
+    parser.add_argument(
+        "--profile-steps",
+        type=int,
+        nargs=2,
+        metavar=("START", "END"),
+        default=None,
+        help="Capture a torch.profiler trace for global steps [START, END)",
+    )
     return parser.parse_args()
 
 
@@ -442,5 +694,15 @@ if __name__ == "__main__":
         aws_access_key_id=os.environ.get("AWS_ACCESS_KEY_ID"),
         aws_secret_access_key=os.environ.get("AWS_SECRET_ACCESS_KEY"),
         region_name=os.environ.get("AWS_REGION", "us-east-1"),
+        profile_steps=tuple(args.profile_steps) if args.profile_steps else None,
+        keep_checkpoints=args.keep_checkpoints,
+        checkpoint_s3_bucket=args.checkpoint_s3_bucket,
+        bf16=args.bf16,
+        channels_last=not args.no_channels_last,
+        architecture=args.architecture,
+        teacher=args.teacher,
+        distill_temperature=args.distill_temperature,
+        distill_alpha=args.distill_alpha,
+        teacher_cache_dir=args.teacher_cache_dir,
     )
     print(f"Training complete. Artifact: {artifact}")
@@ -4,7 +4,10 @@ Uses torchvision.transforms.v2 (the current API).
 ImageNet normalisation constants are used for all pretrained torchvision backbones.
 """
 
+import copy
+
 import torch
+from torch.utils.data import Subset
 from torchvision.transforms import v2 as T
 
 _IMAGENET_MEAN: list[float] = [0.485, 0.456, 0.406]
@@ -27,6 +30,24 @@ def inference_transform() -> T.Compose:
     )
 
 
+def tta_transform() -> T.Compose:
+    """Return the test-time augmentation input pipeline.
+
+    Resize → CenterCrop 256 → float tensor → ImageNet normalise. Views are
+    cut from the 256×256 square by :func:`recbuddy.tta.tta_views`; its
+    ``center`` view equals :func:`inference_transform`'s output.
+    """
+    return T.Compose(
+        [
+            T.Resize(256),
+            T.CenterCrop(256),
+            T.ToImage(),
+            T.ToDtype(torch.float32, scale=True),
+            T.Normalize(mean=_IMAGENET_MEAN, std=_IMAGENET_STD),
+        ]
+    )
+
+
 def training_transform() -> T.Compose:
     """Return the augmented training transform pipeline.
 
@@ -44,3 +65,14 @@ def training_transform() -> T.Compose:
             T.RandomErasing(p=0.25),
         ]
     )
+
+
+def with_transform(subset: Subset, transform: object) -> Subset:
+    """Return ``subset`` over a shallow copy of its dataset using ``transform``.
+
+    Used to read the same samples through a different pipeline, e.g. the
+    training split through :func:`inference_transform`.
+    """
+    dataset = copy.copy(subset.dataset)
+    dataset.transform = transform
+    return Subset(dataset, subset.indices)
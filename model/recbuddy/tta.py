@@ -0,0 +1,91 @@
+"""Test-time augmentation (TTA) shared by evaluation and the API.
+
+TTA inputs are 256×256 tensors (:func:`recbuddy.transforms.tta_transform`);
+every view is a 224×224 crop or rescale of that square, built with tensor
+slicing and one interpolation so all views of a batch go through the model
+as a single ``(N * V, 3, 224, 224)`` forward pass. The ``center`` view is
+exactly the standard :func:`~recbuddy.transforms.inference_transform` input,
+so callers that already have single-pass logits can run only the remaining
+views and average.
+"""
+
+from typing import Callable, Sequence
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+TTA_INPUT_SIZE: int = 256
+CROP_SIZE: int = 224
+
+_MARGIN: int = (TTA_INPUT_SIZE - CROP_SIZE) // 2  # 16
+_EDGE: int = TTA_INPUT_SIZE - CROP_SIZE  # 32
+
+
+def _resize(x: torch.Tensor) -> torch.Tensor:
+    return F.interpolate(
+        x, size=(CROP_SIZE, CROP_SIZE), mode="bilinear", antialias=True
+    )
+
+
+_VIEWS: dict[str, Callable[[torch.Tensor], torch.Tensor]] = {
+    "center": lambda x: x[..., _MARGIN:-_MARGIN, _MARGIN:-_MARGIN],
+    "hflip": lambda x: x[..., _MARGIN:-_MARGIN, _MARGIN:-_MARGIN].flip(-1),
+    "top_left": lambda x: x[..., :CROP_SIZE, :CROP_SIZE],
+    "bottom_right": lambda x: x[..., _EDGE:, _EDGE:],
+    # Scale variants: the whole square shrunk, and its centre enlarged.
+    "zoom_out": _resize,
+    "zoom_in": lambda x: _resize(x[..., _EDGE:-_EDGE, _EDGE:-_EDGE]),
+}
+
+# "center" must stay first; see the module docstring.
+TTA_VIEWS: tuple[str, ...] = tuple(_VIEWS)
+
+
+def center_view(batch: torch.Tensor) -> torch.Tensor:
+    """Return the ``center`` view of a ``(N, 3, 256, 256)`` batch."""
+    return _VIEWS["center"](batch)
+
+
+def tta_views(batch: torch.Tensor, views: Sequence[str] = TTA_VIEWS) -> torch.Tensor:
+    """Expand a ``(N, 3, 256, 256)`` batch into ``(N * V, 3, 224, 224)``.
+
+    Rows are sample-major: the views of sample ``i`` are rows
+    ``i * V`` to ``(i + 1) * V - 1``, in ``views`` order.
+
+    Raises:
+        ValueError: If the batch is not 256×256 or a view name is unknown.
+    """
+    if batch.shape[-2:] != (TTA_INPUT_SIZE, TTA_INPUT_SIZE):
+        raise ValueError(
+            f"TTA expects {TTA_INPUT_SIZE}x{TTA_INPUT_SIZE} inputs, "
+            f"got {tuple(batch.shape[-2:])}"
+        )
+    unknown = [v for v in views if v not in _VIEWS]
+    if unknown:
+        raise ValueError(f"Unknown TTA views: {unknown}")
+    stacked = torch.stack([_VIEWS[v](batch) for v in views], dim=1)
+    return stacked.reshape(-1, *stacked.shape[2:])
+
+
+def average_probabilities(
+    logits: torch.Tensor, temperature: float = 1.0
+) -> torch.Tensor:
+    """Average softmax probabilities over views: ``(N, V, C)`` → ``(N, C)``."""
+    return torch.softmax(logits.float() / temperature, dim=2).mean(dim=1)
+
+
+class TTAModel(nn.Module):
+    """Run a classifier on every TTA view in one forward pass.
+
+    Takes ``(N, 3, 256, 256)`` inputs and returns ``(N, V, C)`` logits.
+    """
+
+    def __init__(self, net: nn.Module, views: Sequence[str] = TTA_VIEWS) -> None:
+        super().__init__()
+        self.net = net
+        self.views = tuple(views)
+
+    def forward(self, batch: torch.Tensor) -> torch.Tensor:
+        logits = self.net(tta_views(batch, self.views))
+        return logits.view(batch.shape[0], len(self.views), -1)
@@ -0,0 +1,64 @@
+"""Smoke tests for the performance benchmark harness (tiny sizes)."""
+
+from pathlib import Path
+
+import pytest
+
+from recbuddy.benchmark import (
+    LOADERS,
+    VARIANTS,
+    benchmark_inference,
+    benchmark_load,
+    benchmark_train_step,
+    write_random_artifact,
+)
+
+_TRAIN_VARIANTS = sorted(v for v in VARIANTS if v not in ("fused", "compile"))
+# torch.compile needs a C++ toolchain and takes minutes; smoke-test the rest.
+_INFER_VARIANTS = sorted(v for v in VARIANTS if v != "compile")
+
+_EXPECTED_KEYS = {
+    "steps",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "images_per_sec",
+    "peak_rss_mb",
+}
+
+
+@pytest.mark.parametrize("variant", _TRAIN_VARIANTS)
+def test_benchmark_train_step_reports_stats(variant: str) -> None:
+    result = benchmark_train_step(
+        variant, batch_size=2, steps=1, warmup=0, image_size=64
+    )
+    assert set(result) == _EXPECTED_KEYS
+    assert result["steps"] == 1
+    assert result["images_per_sec"] > 0
+
+
+@pytest.mark.parametrize("variant", _INFER_VARIANTS)
+def test_benchmark_inference_reports_stats(variant: str) -> None:
+    result = benchmark_inference(
+        variant, batch_size=1, steps=2, warmup=0, image_size=64
+    )
+    assert set(result) == _EXPECTED_KEYS
+    assert result["steps"] == 2
+
+
+def test_unknown_variant_raises() -> None:
+    with pytest.raises(ValueError, match="Unknown variant"):
+        benchmark_inference("fp8", steps=1, warmup=0, image_size=64)
+
+
+def test_inference_only_variant_rejected_for_training() -> None:
+    with pytest.raises(ValueError, match="inference-only"):
+        benchmark_train_step("fused", steps=1, warmup=0, image_size=64)
+
+
+@pytest.mark.parametrize("loader", sorted(LOADERS))
+def test_benchmark_load_reports_stats(loader: str, tmp_path: Path) -> None:
+    artifact = write_random_artifact(tmp_path / "model.safetensors")
+    result = benchmark_load(loader, str(artifact))
+    assert set(result) == {"load_ms", "peak_rss_mb", "load_rss_mb"}
+    assert result["load_ms"] > 0
@@ -0,0 +1,210 @@
+"""Unit tests for the background checkpoint writer."""
+
+import random
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+from safetensors.torch import load_file
+
+from recbuddy.checkpoint import (
+    AsyncCheckpointWriter,
+    TrainingState,
+    checkpoint_name,
+    load_training_state,
+    state_path,
+)
+
+
+def _state(value: float = 0.0) -> dict[str, torch.Tensor]:
+    return {"weight": torch.full((4, 4), value), "bias": torch.zeros(4)}
+
+
+def test_save_writes_safetensors_file(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path) as writer:
+        future = writer.save(_state(1.0), epoch=1)
+    path = future.result()
+    assert path == tmp_path / checkpoint_name(1)
+    assert torch.equal(load_file(str(path))["weight"], torch.full((4, 4), 1.0))
+
+
+def test_save_snapshots_tensors_before_returning(tmp_path: Path) -> None:
+    state = _state(1.0)
+    with AsyncCheckpointWriter(tmp_path) as writer:
+        writer.save(state, epoch=1)
+        state["weight"].fill_(99.0)  # training keeps mutating the parameters
+    saved = load_file(str(tmp_path / checkpoint_name(1)))
+    assert torch.equal(saved["weight"], torch.full((4, 4), 1.0))
+
+
+def test_keep_last_and_keep_best_retention(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path, keep_last=2, keep_best=True) as writer:
+        for epoch, acc in [(1, 0.9), (2, 0.5), (3, 0.6), (4, 0.7)]:
+            writer.save(_state(), epoch=epoch, metric=acc)
+    remaining = sorted(p.name for p in tmp_path.glob("*.safetensors"))
+    assert remaining == [checkpoint_name(1), checkpoint_name(3), checkpoint_name(4)]
+
+
+def test_resumed_writer_adopts_existing_checkpoints(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path, keep_last=2, keep_best=True) as writer:
+        for epoch, acc in [(1, 0.9), (2, 0.5), (3, 0.6)]:
+            writer.save(_state(), epoch=epoch, metric=acc)
+    # --resume from epoch 3: a new writer over the same directory.
+    with AsyncCheckpointWriter(
+        tmp_path, keep_last=2, keep_best=True, adopt=True
+    ) as writer:
+        for epoch, acc in [(4, 0.7), (5, 0.8)]:
+            writer.save(_state(), epoch=epoch, metric=acc)
+    remaining = sorted(p.name for p in tmp_path.glob("*.safetensors"))
+    assert remaining == [checkpoint_name(1), checkpoint_name(4), checkpoint_name(5)]
+
+
+def test_resumed_writer_replaces_rewritten_epochs(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path, keep_last=3, keep_best=True) as writer:
+        for epoch, acc in [(1, 0.5), (2, 0.9), (3, 0.6)]:
+            writer.save(_state(), epoch=epoch, metric=acc)
+    # Resume from epoch 1; epoch 2 is trained again and its 0.9 no longer exists.
+    with AsyncCheckpointWriter(
+        tmp_path, keep_last=1, keep_best=True, adopt=True
+    ) as writer:
+        writer.save(_state(), epoch=2, metric=0.4)
+    remaining = sorted(p.name for p in tmp_path.glob("*.safetensors"))
+    assert remaining == [checkpoint_name(2), checkpoint_name(3)]
+
+
+def test_fresh_writer_leaves_other_runs_checkpoints_alone(tmp_path: Path) -> None:
+    s3 = MagicMock()
+    with AsyncCheckpointWriter(tmp_path, keep_last=1) as writer:
+        writer.save(_state(), epoch=7, metric=0.99)
+    # A new run (no --resume) over the same directory.
+    with AsyncCheckpointWriter(
+        tmp_path, keep_last=1, s3_client=s3, s3_bucket="bucket"
+    ) as writer:
+        for epoch, acc in [(1, 0.5), (2, 0.6)]:
+            writer.save(_state(), epoch=epoch, metric=acc)
+    remaining = sorted(p.name for p in tmp_path.glob("*.safetensors"))
+    assert remaining == [checkpoint_name(2), checkpoint_name(7)]
+    deleted = [c.kwargs["Key"] for c in s3.delete_object.call_args_list]
+    assert all(checkpoint_name(7) not in key for key in deleted)
+
+
+def test_keep_last_none_keeps_everything(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path, keep_last=None) as writer:
+        for epoch in range(1, 6):
+            writer.save(_state(), epoch=epoch)
+    assert len(list(tmp_path.glob("*.safetensors"))) == 5
+
+
+def test_save_snapshots_non_contiguous_tensors(tmp_path: Path) -> None:
+    weight = torch.arange(16.0).reshape(4, 4).t()
+    channels_last = torch.randn(1, 3, 4, 4).to(memory_format=torch.channels_last)
+    with AsyncCheckpointWriter(tmp_path) as writer:
+        path = writer.save({"weight": weight, "conv": channels_last}, epoch=1).result()
+    saved = load_file(str(path))
+    assert torch.equal(saved["weight"], weight)
+    assert torch.equal(saved["conv"], channels_last)
+
+
+def test_uploads_each_checkpoint_to_s3(tmp_path: Path) -> None:
+    s3 = MagicMock()
+    with AsyncCheckpointWriter(
+        tmp_path, s3_client=s3, s3_bucket="bucket", s3_prefix="checkpoints/run/"
+    ) as writer:
+        writer.save(_state(), epoch=1)
+    s3.upload_file.assert_called_once_with(
+        str(tmp_path / checkpoint_name(1)),
+        "bucket",
+        f"checkpoints/run/{checkpoint_name(1)}",
+    )
+
+
+def test_wait_reraises_write_errors(tmp_path: Path) -> None:
+    s3 = MagicMock()
+    s3.upload_file.side_effect = RuntimeError("network down")
+    writer = AsyncCheckpointWriter(tmp_path, s3_client=s3, s3_bucket="bucket")
+    writer.save(_state(), epoch=1)
+    with pytest.raises(RuntimeError, match="network down"):
+        writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Training state
+# ---------------------------------------------------------------------------
+
+
+def _stepped_optimizer_and_scheduler():
+    """A tiny model with a few AdamW + SequentialLR steps taken."""
+    model = nn.Linear(4, 3)
+    optimizer = torch.optim.AdamW(model.parameters(), lr=1e-3)
+    scheduler = torch.optim.lr_scheduler.SequentialLR(
+        optimizer,
+        schedulers=[
+            torch.optim.lr_scheduler.LinearLR(optimizer, start_factor=0.1),
+            torch.optim.lr_scheduler.CosineAnnealingLR(optimizer, T_max=5),
+        ],
+        milestones=[3],
+    )
+    for _ in range(4):
+        optimizer.zero_grad()
+        model(torch.randn(2, 4)).sum().backward()
+        optimizer.step()
+        scheduler.step()
+    return model, optimizer, scheduler
+
+
+def test_training_state_roundtrip_through_writer(tmp_path: Path) -> None:
+    model, optimizer, scheduler = _stepped_optimizer_and_scheduler()
+    state = TrainingState.capture(
+        phase=2, epoch=7, best_val_acc=0.81, optimizer=optimizer, scheduler=scheduler
+    )
+    with AsyncCheckpointWriter(tmp_path) as writer:
+        writer.save(model.state_dict(), epoch=7, training_state=state)
+
+    path = tmp_path / checkpoint_name(7)
+    assert state_path(path).exists()
+    loaded = load_training_state(path)
+    assert loaded is not None
+    assert (loaded.phase, loaded.epoch, loaded.best_val_acc) == (2, 7, 0.81)
+
+    fresh_model, fresh_opt, fresh_sched = _stepped_optimizer_and_scheduler()
+    fresh_opt.load_state_dict(loaded.optimizer)
+    fresh_sched.load_state_dict(loaded.scheduler)
+    assert fresh_sched.last_epoch == scheduler.last_epoch
+    assert fresh_opt.param_groups[0]["lr"] == optimizer.param_groups[0]["lr"]
+    for p_id, p_state in optimizer.state_dict()["state"].items():
+        restored = fresh_opt.state_dict()["state"][p_id]
+        assert torch.equal(restored["exp_avg"], p_state["exp_avg"])
+
+
+def test_restore_rng_replays_random_draws() -> None:
+    optimizer = torch.optim.AdamW(nn.Linear(2, 2).parameters())
+    state = TrainingState.capture(1, 1, 0.0, optimizer)
+    tensors, meta = state.to_safetensors()
+    expected = (torch.rand(3), np.random.rand(3), random.random())
+
+    TrainingState.from_safetensors(tensors, meta).restore_rng()
+    assert torch.equal(torch.rand(3), expected[0])
+    assert np.array_equal(np.random.rand(3), expected[1])
+    assert random.random() == expected[2]
+
+
+def test_load_training_state_returns_none_for_weights_only(tmp_path: Path) -> None:
+    with AsyncCheckpointWriter(tmp_path) as writer:
+        writer.save(_state(), epoch=1)
+    assert load_training_state(tmp_path / checkpoint_name(1)) is None
+
+
+def test_retention_removes_state_sidecar(tmp_path: Path) -> None:
+    optimizer = torch.optim.AdamW(nn.Linear(2, 2).parameters())
+    with AsyncCheckpointWriter(tmp_path, keep_last=1, keep_best=False) as writer:
+        for epoch in (1, 2):
+            writer.save(
+                _state(),
+                epoch=epoch,
+                training_state=TrainingState.capture(1, epoch, 0.0, optimizer),
+            )
+    assert not state_path(tmp_path / checkpoint_name(1)).exists()
+    assert state_path(tmp_path / checkpoint_name(2)).exists()
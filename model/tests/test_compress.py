@@ -0,0 +1,89 @@
+"""Unit tests for structured expansion-channel pruning."""
+
+from pathlib import Path
+
+import pytest
+import torch
+from safetensors.torch import save_file
+
+from recbuddy.compress import (
+    compression_report,
+    parameter_count,
+    prune_model,
+)
+from recbuddy.modeling import (
+    artifact_metadata,
+    build_architecture,
+    expansion_widths,
+    load_model,
+)
+from recbuddy.optimize import contiguous_state_dict
+
+
+@pytest.mark.parametrize("architecture", ["efficientnet_b0", "mobilenet_v3_small"])
+def test_prune_model_shrinks_widths_and_keeps_output_shape(architecture: str) -> None:
+    net = build_architecture(architecture, num_classes=4).eval()
+    stock = expansion_widths(net)
+    params = parameter_count(net)
+
+    widths = prune_model(net, 0.5)
+
+    assert len(widths) == len(stock)
+    assert all(w < s for w, s in zip(widths, stock))
+    assert all(w % 8 == 0 for w in widths)
+    assert parameter_count(net) < params
+    with torch.inference_mode():
+        assert net(torch.randn(2, 3, 224, 224)).shape == (2, 4)
+
+
+def test_prune_model_ratio_zero_is_a_no_op() -> None:
+    net = build_architecture("efficientnet_b0", num_classes=4)
+    stock = expansion_widths(net)
+    assert prune_model(net, 0.0) == stock
+
+
+def test_prune_model_rejects_bad_ratio() -> None:
+    net = build_architecture("efficientnet_b0", num_classes=4)
+    with pytest.raises(ValueError, match="prune_ratio"):
+        prune_model(net, 1.0)
+
+
+def test_pruned_artifact_round_trips_through_load_model(tmp_path: Path) -> None:
+    net = build_architecture("efficientnet_b0", num_classes=4).eval()
+    widths = prune_model(net, 0.3)
+    path = tmp_path / "model.safetensors"
+    save_file(
+        contiguous_state_dict(net),
+        str(path),
+        metadata=artifact_metadata(4, widths=widths),
+    )
+
+    loaded = load_model(str(path), optimize=False)
+
+    assert expansion_widths(loaded) == widths
+    x = torch.randn(1, 3, 224, 224)
+    with torch.inference_mode():
+        assert torch.allclose(loaded(x), net(x), atol=1e-5)
+
+
+def test_compression_report_deltas_and_ratios() -> None:
+    before = {
+        "top1_accuracy": 0.9,
+        "top3_accuracy": 0.97,
+        "macro_f1": 0.88,
+        "latency_ms": 20.0,
+        "size_bytes": 1000,
+        "parameters": 400,
+    }
+    after = {
+        **before,
+        "top1_accuracy": 0.895,
+        "latency_ms": 15.0,
+        "size_bytes": 600,
+        "parameters": 240,
+    }
+    report = compression_report(before, after)
+    assert report["deltas"]["top1_accuracy"] == pytest.approx(-0.005)
+    assert report["deltas"]["size_bytes"] == -400
+    assert report["size_ratio"] == 0.6
+    assert report["latency_ratio"] == 0.75
@@ -10,7 +10,12 @@ from unittest.mock import MagicMock
 import pytest
 from PIL import Image
 
-from recbuddy.dataset import WasteDataset
+from recbuddy.dataset import (
+    SMALL_LABEL_SIZE,
+    WasteDataset,
+    split_bucket,
+    stratified_split,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -78,6 +83,93 @@ def test_get_splits_labels_are_valid_indices(dataset: WasteDataset) -> None:
             assert 0 <= label_idx < len(LABELS)
 
 
+def _split_keys(ds: WasteDataset, subset) -> set[str]:
+    keys = ds.sample_keys(subset.dataset)
+    return {keys[i] for i in subset.indices}
+
+
+def test_get_splits_is_deterministic(dataset: WasteDataset) -> None:
+    first = dataset.get_splits(seed=0)
+    second = dataset.get_splits(seed=0)
+    for a, b in zip(first, second):
+        assert _split_keys(dataset, a) == _split_keys(dataset, b)
+
+
+def test_get_splits_other_labels_keep_their_split(
+    dataset: WasteDataset, data_dir: Path
+) -> None:
+    """Adding images to one label never moves images of another."""
+
+    def others(keys: set[str]) -> set[str]:
+        return {k for k in keys if not k.startswith(f"{LABELS[0]}/")}
+
+    before = [_split_keys(dataset, s) for s in dataset.get_splits(seed=0)]
+
+    for i in range(IMAGES_PER_LABEL, IMAGES_PER_LABEL + 5):
+        img = Image.new("RGB", (32, 32), color=(i * 10, 80, 20))
+        img.save(data_dir / LABELS[0] / f"{i}.jpg")
+
+    after = [_split_keys(dataset, s) for s in dataset.get_splits(seed=0)]
+    for old, new in zip(before, after):
+        assert others(old) == others(new)
+
+
+@pytest.mark.parametrize("seed", [0, 42])
+def test_get_splits_stratifies_every_label(dataset: WasteDataset, seed: int) -> None:
+    splits = dataset.get_splits(seed=seed)
+    for label in LABELS:
+        counts = [
+            sum(k.startswith(f"{label}/") for k in _split_keys(dataset, s))
+            for s in splits
+        ]
+        # Below SMALL_LABEL_SIZE, so split by rank: round(10 * 0.15) == 2 test,
+        # round(10 * 0.3) - 2 == 1 val.
+        assert IMAGES_PER_LABEL < SMALL_LABEL_SIZE
+        assert counts == [7, 1, 2], label
+
+
+def test_stratified_split_large_label_uses_fixed_thresholds() -> None:
+    keys = [f"cartons/{i}.jpg" for i in range(200)]
+    train, val, test = stratified_split(keys, [0] * len(keys), seed=3)
+    for idx in test:
+        assert split_bucket(keys[idx], 3) < 0.15
+    for idx in val:
+        assert 0.15 <= split_bucket(keys[idx], 3) < 0.3
+    for idx in train:
+        assert split_bucket(keys[idx], 3) >= 0.3
+
+
+def test_stratified_split_adding_images_never_moves_existing_ones() -> None:
+    def assignment(keys: list[str]) -> dict[str, str]:
+        splits = stratified_split(keys, [0] * len(keys), seed=0)
+        return {keys[i]: name for name, s in zip("tvs", splits) for i in s}
+
+    keys = [f"cartons/{i}.jpg" for i in range(200)]
+    before = assignment(keys)
+    for extra in range(200, 250):
+        after = assignment(keys + [f"cartons/{extra}.jpg"])
+        assert {k: after[k] for k in before} == before
+
+
+def test_stratified_split_small_labels_reach_every_split() -> None:
+    keys = [f"{label}/{i}.jpg" for label in LABELS for i in range(3)]
+    labels = [j for j in range(len(LABELS)) for _ in range(3)]
+    train, val, test = stratified_split(keys, labels, seed=7)
+    for j in range(len(LABELS)):
+        for split in (train, val, test):
+            assert sum(labels[i] == j for i in split) == 1
+
+
+def test_split_bucket_in_unit_interval() -> None:
+    for i in range(100):
+        assert 0.0 <= split_bucket(f"cartons/{i}.jpg") < 1.0
+
+
+def test_split_bucket_depends_on_seed() -> None:
+    keys = [f"cartons/{i}.jpg" for i in range(20)]
+    assert [split_bucket(k, 0) for k in keys] != [split_bucket(k, 1) for k in keys]
+
+
 def test_get_splits_raises_when_data_dir_empty(tmp_path: Path) -> None:
     ds = WasteDataset(s3_bucket="test-bucket", data_dir=tmp_path / "empty")
     with pytest.raises(FileNotFoundError):
@@ -0,0 +1,141 @@
+"""Unit tests for the knowledge distillation loss and the teacher cache."""
+
+from pathlib import Path
+
+import pytest
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.utils.data import Dataset, Subset
+
+from recbuddy import distill
+from recbuddy.distill import DistillationLoss, TeacherLogitDataset
+from recbuddy.logit_cache import LogitRecord, cache_path, split_id
+
+_NUM_CLASSES = 3
+
+
+class _Images(Dataset):
+    """Constant images with labels ``i % 3``; has a swappable ``transform``."""
+
+    def __init__(self, n: int = 8) -> None:
+        self.n = n
+        self.transform = None
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> tuple[torch.Tensor, int]:
+        return torch.full((3, 4, 4), float(i)), i % _NUM_CLASSES
+
+
+class _MeanNet(nn.Module):
+    def __init__(self) -> None:
+        super().__init__()
+        self.fc = nn.Linear(1, _NUM_CLASSES)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.fc(x.mean(dim=(1, 2, 3)).unsqueeze(1))
+
+
+def test_distillation_loss_matches_formula() -> None:
+    torch.manual_seed(0)
+    student, teacher = torch.randn(4, _NUM_CLASSES), torch.randn(4, _NUM_CLASSES)
+    labels = torch.tensor([0, 1, 2, 0])
+    loss = DistillationLoss(temperature=2.0, alpha=0.5)(student, (labels, teacher))
+    p_teacher = torch.softmax(teacher / 2, dim=1)
+    log_ratio = torch.log(p_teacher) - torch.log_softmax(student / 2, dim=1)
+    kl = (p_teacher * log_ratio).sum(dim=1).mean()
+    expected = 0.5 * 4 * kl + 0.5 * F.cross_entropy(student, labels)
+    assert torch.allclose(loss, expected, atol=1e-6)
+
+
+def test_distillation_loss_alpha_zero_is_cross_entropy() -> None:
+    student = torch.randn(3, _NUM_CLASSES)
+    labels = torch.tensor([2, 0, 1])
+    loss = DistillationLoss(alpha=0.0, label_smoothing=0.1)(
+        student, (labels, torch.randn(3, _NUM_CLASSES))
+    )
+    expected = F.cross_entropy(student, labels, label_smoothing=0.1)
+    assert torch.allclose(loss, expected)
+
+
+def test_distillation_loss_rejects_bad_alpha() -> None:
+    with pytest.raises(ValueError, match="alpha"):
+        DistillationLoss(alpha=1.5)
+
+
+def test_student_of_confident_teacher_is_not_flattened() -> None:
+    # A teacher with a 6-logit margin is ~99% confident at T=1. Blending its
+    # T=4 distribution into the target (the old scheme) capped the student
+    # near 78%; the KD loss lets it match the teacher's logits instead.
+    labels = torch.arange(6) % _NUM_CLASSES
+    teacher = 6.0 * F.one_hot(labels, _NUM_CLASSES).float()
+    student = torch.zeros(6, _NUM_CLASSES, requires_grad=True)
+    optimizer = torch.optim.Adam([student], lr=0.1)
+    criterion = DistillationLoss(temperature=4.0, alpha=0.7)
+    for _ in range(500):
+        optimizer.zero_grad()
+        criterion(student, (labels, teacher)).backward()
+        optimizer.step()
+    confidence = torch.softmax(student.detach(), dim=1).max(dim=1).values
+    assert (confidence > 0.95).all()
+
+
+def test_teacher_logit_dataset_aligns_rows_by_index() -> None:
+    subset = Subset(_Images(), [5, 1, 3])
+    # Record rows in a different order than the subset.
+    record = LogitRecord(
+        logits=torch.tensor([[9.0, 0.0, 0.0], [0.0, 9.0, 0.0], [0.0, 0.0, 9.0]]),
+        indices=torch.tensor([1, 3, 5]),
+        targets=torch.tensor([1, 0, 2]),
+    )
+    ds = TeacherLogitDataset(subset, record)
+    assert len(ds) == 3
+    image, (label, logits) = ds[0]
+    assert torch.equal(image, torch.full((3, 4, 4), 5.0))
+    assert label == 2
+    assert logits.argmax().item() == 2  # row for dataset index 5
+
+
+def test_teacher_logit_dataset_rejects_missing_samples() -> None:
+    record = LogitRecord(
+        logits=torch.zeros(1, _NUM_CLASSES),
+        indices=torch.tensor([0]),
+        targets=torch.tensor([0]),
+    )
+    with pytest.raises(ValueError, match="missing 1"):
+        TeacherLogitDataset(Subset(_Images(), [0, 1]), record)
+
+
+def test_teacher_cache_is_separate_from_evaluate_train_split() -> None:
+    keys = ["cartons/a.jpg", "aerosols/b.jpg"]
+    teacher_path = cache_path("cache", "ab" * 32, distill.teacher_split_id(keys))
+    evaluate_path = cache_path("cache", "ab" * 32, split_id("train", keys))
+    assert teacher_path != evaluate_path
+
+
+def test_teacher_logits_are_cached(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    teacher = tmp_path / "teacher.safetensors"
+    teacher.write_bytes(b"teacher-weights")
+    loads = []
+
+    def fake_load_model(path: str, num_classes: int) -> nn.Module:
+        loads.append(path)
+        return _MeanNet().eval()
+
+    monkeypatch.setattr(distill, "load_model", fake_load_model)
+    subset = Subset(_Images(), [0, 2, 4, 6])
+    first = distill.teacher_logits(
+        str(teacher), subset, "train-abc", _NUM_CLASSES, cache_dir=tmp_path / "c"
+    )
+    second = distill.teacher_logits(
+        str(teacher), subset, "train-abc", _NUM_CLASSES, cache_dir=tmp_path / "c"
+    )
+    assert len(loads) == 1
+    assert torch.equal(first.indices, torch.tensor([0, 2, 4, 6]))
+    assert torch.equal(first.logits, second.logits)
+    # The training subset's own transform is left untouched.
+    assert subset.dataset.transform is None
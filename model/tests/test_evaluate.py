@@ -7,12 +7,25 @@ Uses tiny synthetic models and datasets — no S3 access required.
 from pathlib import Path
 
 import pytest
+import torch
 import torch.nn as nn
 from PIL import Image
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, Subset
 from torchvision.datasets import ImageFolder
 
-from recbuddy.evaluate import compute_metrics, load_artifact
+from recbuddy.evaluate import (
+    cascade_report,
+    collect_logits_sharded,
+    compute_metrics,
+    confusion_matrix,
+    fit_temperature,
+    load_artifact,
+    metrics_from_confusion,
+    metrics_from_logits,
+    precision_parity,
+    topk_hits,
+    tta_report,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -149,3 +162,156 @@ def test_compute_metrics_top3_ge_top1(dataset_and_loader) -> None:
     model = _tiny_efficientnet(num_classes=NUM_CLASSES)
     result = compute_metrics(model, loader, LABELS)
     assert result["overall_top3_accuracy"] >= result["overall_top1_accuracy"]
+
+
+def test_compute_metrics_includes_precision_recall_f1(dataset_and_loader) -> None:
+    ds, loader = dataset_and_loader
+    model = _tiny_efficientnet(num_classes=NUM_CLASSES)
+    result = compute_metrics(model, loader, LABELS)
+    for label in LABELS:
+        detail = result["per_category_detail"][label]
+        assert set(detail) == {"precision", "recall", "f1", "support"}
+        assert detail["recall"] == result["per_category"][label]
+
+
+# ---------------------------------------------------------------------------
+# Vectorised helpers
+# ---------------------------------------------------------------------------
+
+
+def test_confusion_matrix_counts_pairs() -> None:
+    targets = torch.tensor([0, 0, 1, 2, 2, 2])
+    preds = torch.tensor([0, 1, 1, 2, 0, 0])
+    cm = confusion_matrix(targets, preds, NUM_CLASSES)
+    assert cm.tolist() == [[1, 1, 0], [0, 1, 0], [2, 0, 1]]
+
+
+def test_topk_hits_counts_target_in_top_k() -> None:
+    logits = torch.tensor([[3.0, 2.0, 1.0], [3.0, 2.0, 1.0]])
+    targets = torch.tensor([1, 2])
+    assert topk_hits(logits, targets, k=1) == 0
+    assert topk_hits(logits, targets, k=2) == 1
+    assert topk_hits(logits, targets, k=3) == 2
+
+
+def test_metrics_from_confusion_matches_hand_computed() -> None:
+    cm = torch.tensor([[1, 1, 0], [0, 1, 0], [2, 0, 1]])
+    result = metrics_from_confusion(cm, topk_correct=6, labels=LABELS)
+    assert result["overall_top1_accuracy"] == pytest.approx(3 / 6)
+    assert result["overall_top3_accuracy"] == pytest.approx(1.0)
+    assert result["per_category"]["class_02"] == pytest.approx(1 / 3)
+    assert result["per_category_detail"]["class_00"]["precision"] == pytest.approx(
+        1 / 3
+    )
+    assert result["confused_pairs"][0] == ("class_02", "class_00", 2)
+    assert len(result["confused_pairs"]) == 2
+
+
+def test_metrics_from_logits_matches_compute_metrics(dataset_and_loader) -> None:
+    ds, loader = dataset_and_loader
+    model = _tiny_efficientnet(num_classes=NUM_CLASSES)
+    expected = compute_metrics(model, loader, LABELS)
+
+    with torch.inference_mode():
+        batches = [(model(x), y) for x, y in loader]
+    logits = torch.cat([b[0] for b in batches])
+    targets = torch.cat([b[1] for b in batches])
+    result = metrics_from_logits(logits, targets, LABELS)
+
+    assert result["overall_top1_accuracy"] == expected["overall_top1_accuracy"]
+    assert result["per_category"] == expected["per_category"]
+
+
+def test_metrics_from_logits_uses_requested_top_k() -> None:
+    logits = torch.tensor([[3.0, 2.0, 1.0], [3.0, 2.0, 1.0]])
+    targets = torch.tensor([1, 2])
+    result = metrics_from_logits(logits, targets, LABELS, top_k=2)
+    assert result["overall_top2_accuracy"] == 0.5
+
+
+# ---------------------------------------------------------------------------
+# Sharded evaluation
+# ---------------------------------------------------------------------------
+
+
+def test_collect_logits_sharded_matches_single_process(
+    tmp_path: Path, dataset_and_loader
+) -> None:
+    from recbuddy.logit_cache import collect_logits
+
+    ds, loader = dataset_and_loader
+    artifact_path = _save_tiny_artifact(tmp_path, num_classes=NUM_CLASSES)
+    subset = Subset(ds, list(range(len(ds))))
+
+    model = load_artifact(str(artifact_path), num_classes=NUM_CLASSES)
+    expected = collect_logits(model, loader, subset.indices)
+    sharded = collect_logits_sharded(
+        str(artifact_path), subset, NUM_CLASSES, workers=2, threads_per_worker=1
+    )
+
+    assert torch.equal(sharded.indices, expected.indices)
+    assert torch.equal(sharded.targets, expected.targets)
+    assert torch.allclose(sharded.logits.float(), expected.logits.float(), atol=1e-2)
+
+
+def test_precision_parity_identical_logits() -> None:
+    logits = torch.tensor([[3.0, 2.0, 1.0], [1.0, 3.0, 2.0]])
+    targets = torch.tensor([0, 2])
+    parity = precision_parity(logits, logits.clone(), targets)
+    assert parity["top1_agreement"] == 1.0
+    assert parity["top1_accuracy_delta"] == 0.0
+    assert parity["max_abs_prob_diff"] == 0.0
+
+
+def test_precision_parity_counts_disagreements() -> None:
+    reference = torch.tensor([[3.0, 2.0, 1.0], [1.0, 3.0, 2.0]])
+    candidate = torch.tensor([[3.0, 2.0, 1.0], [1.0, 2.0, 3.0]])
+    parity = precision_parity(reference, candidate, torch.tensor([0, 2]))
+    assert parity["top1_agreement"] == 0.5
+    assert parity["top1_accuracy_delta"] == 0.5
+
+
+def test_fit_temperature_softens_overconfident_logits() -> None:
+    torch.manual_seed(0)
+    targets = torch.randint(0, 3, (200,))
+    # Mostly right but far too confident, with 30% of labels shuffled.
+    logits = nn.functional.one_hot(targets, 3).float() * 10
+    noisy = torch.rand(200) < 0.3
+    targets = torch.where(noisy, torch.randint(0, 3, (200,)), targets)
+    result = fit_temperature(logits, targets)
+    assert result["temperature"] > 1.0
+    assert result["nll_after"] < result["nll_before"]
+
+
+def test_tta_report_adaptive_interpolates_single_and_always() -> None:
+    torch.manual_seed(0)
+    n_views = 6
+    targets = torch.randint(0, 3, (100,))
+    logits = torch.randn(100, n_views, 3)
+    report = tta_report(logits, targets, thresholds=[0.0, 1.01])
+
+    never, always = report["adaptive"]
+    assert never["tta_fraction"] == 0.0
+    assert never["top1_accuracy"] == report["single"]["top1_accuracy"]
+    assert never["forward_passes_per_image"] == 1
+    assert always["tta_fraction"] == 1.0
+    assert always["top1_accuracy"] == report["always"]["top1_accuracy"]
+    assert always["forward_passes_per_image"] == n_views
+
+
+def test_cascade_report_threshold_extremes() -> None:
+    torch.manual_seed(0)
+    targets = torch.randint(0, 3, (50,))
+    first = torch.randn(50, 3)
+    second = nn.functional.one_hot(targets, 3).float() * 5
+    report = cascade_report(
+        first, second, targets, thresholds=[0.0, 1.01], first_ms=1.0, second_ms=10.0
+    )
+
+    all_first, all_second = report["thresholds"]
+    assert all_first["first_stage_fraction"] == 1.0
+    assert all_first["top1_accuracy"] == report["first_stage"]["top1_accuracy"]
+    assert all_first["expected_latency_ms"] == 1.0
+    assert all_second["first_stage_fraction"] == 0.0
+    assert all_second["top1_accuracy"] == 1.0
+    assert all_second["expected_latency_ms"] == 11.0
@@ -0,0 +1,92 @@
+"""Unit tests for the per-sample logit store."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from recbuddy import logit_cache
+from recbuddy.logit_cache import LogitRecord
+
+
+def _record(n: int = 6, num_classes: int = 3) -> LogitRecord:
+    return LogitRecord(
+        logits=torch.randn(n, num_classes).to(torch.float16),
+        indices=torch.arange(10, 10 + n),
+        targets=torch.arange(n) % num_classes,
+    )
+
+
+def test_file_sha256_changes_with_content(tmp_path: Path) -> None:
+    a = tmp_path / "a.bin"
+    b = tmp_path / "b.bin"
+    a.write_bytes(b"weights-a")
+    b.write_bytes(b"weights-b")
+    assert logit_cache.file_sha256(a) != logit_cache.file_sha256(b)
+    assert len(logit_cache.file_sha256(a)) == 64
+
+
+def test_split_id_is_order_independent() -> None:
+    keys = ["cartons/1.jpg", "aerosols/2.jpg", "corks/3.jpg"]
+    assert logit_cache.split_id("test", keys) == logit_cache.split_id(
+        "test", list(reversed(keys))
+    )
+
+
+def test_split_id_changes_when_membership_changes() -> None:
+    keys = ["cartons/1.jpg", "aerosols/2.jpg"]
+    assert logit_cache.split_id("test", keys) != logit_cache.split_id(
+        "test", keys + ["corks/3.jpg"]
+    )
+    assert logit_cache.split_id("test", keys).startswith("test-")
+
+
+def test_save_load_roundtrip(tmp_path: Path) -> None:
+    record = _record()
+    path = tmp_path / "store.safetensors"
+    logit_cache.save(record, path, metadata={"split_id": "test-abc"})
+    loaded = logit_cache.load(path)
+    assert loaded.logits.dtype == torch.float16
+    assert torch.equal(loaded.logits, record.logits)
+    assert torch.equal(loaded.indices, record.indices)
+    assert torch.equal(loaded.targets, record.targets)
+
+
+def test_interrupted_save_leaves_no_cache_entry(tmp_path: Path) -> None:
+    path = tmp_path / "store.safetensors"
+
+    def truncated_write(tensors: dict, filename: str, metadata: dict) -> None:
+        Path(filename).write_bytes(b"\x00" * 8)
+        raise KeyboardInterrupt
+
+    with patch("recbuddy.logit_cache.save_file", side_effect=truncated_write):
+        with pytest.raises(KeyboardInterrupt):
+            logit_cache.save(_record(), path, metadata={})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_load_or_compute_only_computes_once(tmp_path: Path) -> None:
+    record = _record()
+    calls = []
+
+    def compute() -> LogitRecord:
+        calls.append(1)
+        return record
+
+    first = logit_cache.load_or_compute(tmp_path, "ab" * 32, "test-abc", compute)
+    second = logit_cache.load_or_compute(tmp_path, "ab" * 32, "test-abc", compute)
+    assert len(calls) == 1
+    assert torch.equal(first.logits, second.logits)
+
+
+def test_load_or_compute_keyed_by_artifact(tmp_path: Path) -> None:
+    calls = []
+
+    def compute() -> LogitRecord:
+        calls.append(1)
+        return _record()
+
+    logit_cache.load_or_compute(tmp_path, "aa" * 32, "test-abc", compute)
+    logit_cache.load_or_compute(tmp_path, "bb" * 32, "test-abc", compute)
+    assert len(calls) == 2
@@ -0,0 +1,111 @@
+"""Unit tests for shared model construction and artifact loading."""
+
+from pathlib import Path
+from typing import Optional
+
+import pytest
+import torch
+import torch.nn as nn
+from safetensors.torch import save_file
+
+from recbuddy.modeling import (
+    _check_materialised,
+    artifact_metadata,
+    build_architecture,
+    build_efficientnet,
+    load_model,
+    read_header,
+)
+
+
+def _save_artifact(
+    path: Path, num_classes: int = 5, metadata: Optional[dict[str, str]] = None
+) -> dict[str, torch.Tensor]:
+    net = build_efficientnet(num_classes)
+    state = net.state_dict()
+    save_file(state, str(path), metadata=metadata)
+    return state
+
+
+def test_build_efficientnet_head_shape() -> None:
+    net = build_efficientnet(num_classes=7)
+    head = net.classifier[1]
+    assert isinstance(head, nn.Linear)
+    assert head.out_features == 7
+
+
+def test_read_header_infers_num_classes(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    _save_artifact(path, num_classes=5, metadata=artifact_metadata(5))
+    num_classes, metadata = read_header(str(path))
+    assert num_classes == 5
+    assert metadata["architecture"] == "efficientnet_b0"
+
+
+def test_read_header_accepts_artifacts_without_metadata(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    _save_artifact(path, num_classes=3)
+    assert read_header(str(path))[0] == 3
+
+
+def test_read_header_rejects_unknown_architecture(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    _save_artifact(path, metadata={"architecture": "resnet50"})
+    with pytest.raises(ValueError, match="Unsupported architecture"):
+        read_header(str(path))
+
+
+def test_load_model_restores_saved_weights(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    state = _save_artifact(path, num_classes=5)
+    net = load_model(str(path), optimize=False)
+    assert not net.training
+    for key, value in net.state_dict().items():
+        assert torch.equal(value, state[key]), key
+
+
+def test_load_model_rejects_num_classes_mismatch(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    _save_artifact(path, num_classes=5)
+    with pytest.raises(ValueError, match="expected 48"):
+        load_model(str(path), num_classes=48)
+
+
+def test_load_model_raises_on_missing_file(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        load_model(str(tmp_path / "missing.safetensors"))
+
+
+def test_load_model_leaves_no_meta_tensors(tmp_path: Path) -> None:
+    path = tmp_path / "model.safetensors"
+    _save_artifact(path)
+    net = load_model(str(path))
+    assert not any(t.is_meta for t in net.parameters())
+    assert not any(t.is_meta for t in net.buffers())
+
+
+def test_check_materialised_reports_meta_buffers() -> None:
+    net = nn.Linear(2, 2)
+    net.register_buffer("scale", torch.empty(2, device="meta"), persistent=False)
+    with pytest.raises(RuntimeError, match="scale"):
+        _check_materialised(net)
+
+
+def test_load_model_builds_architecture_from_metadata(tmp_path: Path) -> None:
+    path = tmp_path / "small.safetensors"
+    net = build_architecture("mobilenet_v3_small", num_classes=5)
+    save_file(
+        net.state_dict(),
+        str(path),
+        metadata=artifact_metadata(5, "mobilenet_v3_small"),
+    )
+    assert read_header(str(path))[0] == 5
+    loaded = load_model(str(path), optimize=False)
+    assert loaded.classifier[3].out_features == 5
+    for key, value in loaded.state_dict().items():
+        assert torch.equal(value, net.state_dict()[key]), key
+
+
+def test_build_architecture_rejects_unknown_name() -> None:
+    with pytest.raises(ValueError, match="Unsupported architecture"):
+        build_architecture("resnet50")
@@ -0,0 +1,64 @@
+"""Unit tests for the shared CPU performance options."""
+
+import pytest
+import torch
+import torch.nn as nn
+import torchvision.models as models
+
+from recbuddy.optimize import (
+    contiguous_state_dict,
+    fuse_conv_bn,
+    optimize_for_inference,
+    optimize_for_training,
+)
+
+
+def _tiny_model() -> nn.Module:
+    torch.manual_seed(0)
+    net = models.efficientnet_b0(weights=None)
+    net.classifier[1] = nn.Linear(1280, 5)
+    # Non-trivial running stats so fusion actually changes the conv weights.
+    net.train()
+    with torch.no_grad():
+        net(torch.randn(4, 3, 64, 64))
+    return net.eval()
+
+
+def test_fuse_conv_bn_replaces_batchnorm_and_preserves_outputs() -> None:
+    net = _tiny_model()
+    images = torch.randn(2, 3, 64, 64)
+    with torch.inference_mode():
+        expected = net(images)
+    fuse_conv_bn(net)
+    assert not any(isinstance(m, nn.BatchNorm2d) for m in net.modules())
+    with torch.inference_mode():
+        assert torch.allclose(net(images), expected, atol=1e-4)
+
+
+def test_fuse_conv_bn_rejects_training_mode() -> None:
+    net = _tiny_model().train()
+    with pytest.raises(ValueError, match="eval mode"):
+        fuse_conv_bn(net)
+
+
+def test_optimize_for_inference_preserves_outputs() -> None:
+    net = _tiny_model()
+    images = torch.randn(2, 3, 64, 64)
+    with torch.inference_mode():
+        expected = net(images)
+    optimized = optimize_for_inference(net)
+    assert not optimized.training
+    assert optimized.features[0][0].weight.is_contiguous(
+        memory_format=torch.channels_last
+    )
+    with torch.inference_mode():
+        assert torch.allclose(optimized(images), expected, atol=1e-4)
+
+
+def test_optimize_for_training_keeps_state_dict_keys() -> None:
+    net = _tiny_model()
+    keys = set(net.state_dict())
+    optimize_for_training(net)
+    assert set(net.state_dict()) == keys
+    state = contiguous_state_dict(net)
+    assert all(t.is_contiguous() for t in state.values())
@@ -0,0 +1,70 @@
+"""Unit tests for the training profiler."""
+
+import time
+from pathlib import Path
+
+import pytest
+import torch
+
+from recbuddy.profiling import TrainingProfiler, latency_ms, peak_rss_mb, percentile
+
+
+def test_phase_accumulates_time_and_count() -> None:
+    profiler = TrainingProfiler()
+    for _ in range(3):
+        with profiler.phase("forward"):
+            time.sleep(0.001)
+    phases = profiler.summary()["phases"]
+    assert phases["forward"]["count"] == 3
+    assert phases["forward"]["total_s"] > 0
+
+
+def test_timed_iter_yields_all_items_and_times_data() -> None:
+    profiler = TrainingProfiler()
+    assert list(profiler.timed_iter([1, 2, 3])) == [1, 2, 3]
+    assert profiler.summary()["phases"]["data"]["count"] == 3
+
+
+def test_step_counts_images_and_reports_throughput() -> None:
+    profiler = TrainingProfiler()
+    for _ in profiler.timed_iter(range(2)):
+        with profiler.phase("forward"):
+            time.sleep(0.001)
+        profiler.step(batch_size=8)
+    summary = profiler.summary()
+    assert summary["steps"] == 2
+    assert summary["images"] == 16
+    assert summary["images_per_sec"] > 0
+
+
+def test_peak_rss_is_positive() -> None:
+    assert peak_rss_mb() > 0
+    assert TrainingProfiler().summary()["peak_rss_mb"] > 0
+
+
+def test_percentile_interpolates() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([7.0], 95) == 7.0
+
+
+def test_percentile_empty_raises() -> None:
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_latency_ms_converts_seconds() -> None:
+    summary = latency_ms([0.01, 0.02, 0.03, 0.04], quantiles=(50, 95))
+    assert summary == pytest.approx({"mean_ms": 25.0, "p50_ms": 25.0, "p95_ms": 38.5})
+    assert latency_ms([]) == {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+
+
+def test_trace_window_writes_chrome_trace(tmp_path: Path) -> None:
+    profiler = TrainingProfiler(trace_dir=tmp_path, trace_window=(1, 3))
+    for _ in range(4):
+        torch.ones(8, 8) @ torch.ones(8, 8)
+        profiler.step(batch_size=1)
+    trace = profiler.summary()["trace"]
+    assert trace is not None
+    assert Path(trace).exists()
@@ -1,12 +1,13 @@
 """Tests for the promote module."""
 
+import hashlib
 import json
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
-from recbuddy.promote import promote
+from recbuddy.promote import file_digest, promote
 
 _BUCKET = "test-bucket"
 
@@ -23,6 +24,8 @@ def _make_training_metadata(tmp_path: Path) -> Path:
         "val_accuracy": 0.9142,
         "seed": 42,
         "num_classes": 48,
+        "architecture": "efficientnet_b0",
+        "distillation": None,
         "timestamp": "20260303T120000Z",
     }
     meta_path = tmp_path / "training_run_20260303T120000Z.json"
@@ -30,6 +33,16 @@ def _make_training_metadata(tmp_path: Path) -> Path:
     return meta_path
 
 
+def _manifest(client: MagicMock) -> dict:
+    """Return the manifest body passed to ``put_object``."""
+    (body,) = [
+        c.kwargs["Body"]
+        for c in client.put_object.call_args_list
+        if c.kwargs["Key"].endswith("/manifest.json")
+    ]
+    return json.loads(body)
+
+
 @pytest.fixture()
 def artifact_dir(tmp_path: Path) -> Path:
     """Directory with a model artifact and training metadata sidecar."""
@@ -51,7 +64,7 @@ def test_promote_uploads_artifact_to_versioned_prefix(artifact_dir: Path) -> Non
         mock_boto.return_value = mock_client
         promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
     mock_client.upload_file.assert_any_call(
-        str(artifact), _BUCKET, "artifacts/0.1.0/model.safetensors"
+        str(artifact), _BUCKET, "artifacts/0.1.0/model.safetensors", Config=ANY
     )
 
 
@@ -62,9 +75,13 @@ def test_promote_uploads_manifest_to_versioned_prefix(artifact_dir: Path) -> Non
         mock_client.list_objects_v2.return_value = {}
         mock_boto.return_value = mock_client
         promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
-    put_call = mock_client.put_object.call_args
-    assert put_call.kwargs["Key"] == "artifacts/0.1.0/manifest.json"
-    manifest = json.loads(put_call.kwargs["Body"])
+    mock_client.put_object.assert_any_call(
+        Bucket=_BUCKET,
+        Key="artifacts/0.1.0/manifest.json",
+        Body=ANY,
+        ContentType="application/json",
+    )
+    manifest = _manifest(mock_client)
     assert manifest["version"] == "0.1.0"
     assert manifest["artifact_key"] == "artifacts/0.1.0/model.safetensors"
     assert "promoted_at" in manifest["promotion"]
@@ -77,10 +94,12 @@ def test_promote_manifest_includes_training_metadata(artifact_dir: Path) -> None
         mock_client.list_objects_v2.return_value = {}
         mock_boto.return_value = mock_client
         promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
-    manifest = json.loads(mock_client.put_object.call_args.kwargs["Body"])
+    manifest = _manifest(mock_client)
     assert manifest["training"]["epochs"] == 30
     assert manifest["training"]["val_accuracy"] == 0.9142
     assert manifest["training"]["seed"] == 42
+    assert manifest["training"]["architecture"] == "efficientnet_b0"
+    assert manifest["training"]["distillation"] is None
 
 
 def test_promote_errors_if_version_already_exists(artifact_dir: Path) -> None:
@@ -114,3 +133,163 @@ def test_promote_does_not_upload_latest_alias(artifact_dir: Path) -> None:
         promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
     for c in mock_client.upload_file.call_args_list:
         assert "latest" not in c.args[2]
+
+
+def _write_compression(
+    artifact_dir: Path, top1_delta: float, latency_ratio: float
+) -> None:
+    artifact = artifact_dir / "model.safetensors"
+    manifest = {
+        "artifact_sha256": hashlib.sha256(artifact.read_bytes()).hexdigest(),
+        "source_sha256": "abc",
+        "prune_ratio": 0.3,
+        "size_ratio": 0.7,
+        "latency_ratio": latency_ratio,
+        "deltas": {"top1_accuracy": top1_delta},
+    }
+    (artifact_dir / "compression.json").write_text(json.dumps(manifest))
+
+
+def test_promote_refuses_compressed_artifact_with_accuracy_regression(
+    artifact_dir: Path,
+) -> None:
+    _write_compression(artifact_dir, top1_delta=-0.05, latency_ratio=0.8)
+    with patch("recbuddy.promote.boto3.client") as mock_boto:
+        with pytest.raises(ValueError, match="top-1 accuracy"):
+            promote(
+                artifact=artifact_dir / "model.safetensors",
+                s3_bucket=_BUCKET,
+                version="0.1.0",
+            )
+    mock_boto.assert_not_called()
+
+
+def test_promote_refuses_compressed_artifact_with_latency_regression(
+    artifact_dir: Path,
+) -> None:
+    _write_compression(artifact_dir, top1_delta=0.0, latency_ratio=1.3)
+    with pytest.raises(ValueError, match="latency"):
+        promote(
+            artifact=artifact_dir / "model.safetensors",
+            s3_bucket=_BUCKET,
+            version="0.1.0",
+        )
+
+
+def test_promote_refuses_stale_compression_manifest(artifact_dir: Path) -> None:
+    _write_compression(artifact_dir, top1_delta=0.0, latency_ratio=0.8)
+    (artifact_dir / "model.safetensors").write_bytes(b"other-weights")
+    with pytest.raises(ValueError, match="sha256 mismatch"):
+        promote(
+            artifact=artifact_dir / "model.safetensors",
+            s3_bucket=_BUCKET,
+            version="0.1.0",
+        )
+
+
+def test_promote_records_compression_within_thresholds(artifact_dir: Path) -> None:
+    _write_compression(artifact_dir, top1_delta=-0.005, latency_ratio=0.8)
+    with patch("recbuddy.promote.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.list_objects_v2.return_value = {}
+        mock_boto.return_value = mock_client
+        promote(
+            artifact=artifact_dir / "model.safetensors",
+            s3_bucket=_BUCKET,
+            version="0.1.0",
+        )
+    manifest = _manifest(mock_client)
+    assert manifest["compression"]["prune_ratio"] == 0.3
+    assert manifest["compression"]["deltas"]["top1_accuracy"] == -0.005
+
+
+def test_promote_manifest_records_sha256_and_size(artifact_dir: Path) -> None:
+    artifact = artifact_dir / "model.safetensors"
+    with patch("recbuddy.promote.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.list_objects_v2.return_value = {}
+        mock_boto.return_value = mock_client
+        promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
+    manifest = _manifest(mock_client)
+    assert manifest["sha256"] == hashlib.sha256(b"fake-weights").hexdigest()
+    assert manifest["size_bytes"] == len(b"fake-weights")
+
+
+def test_promote_moves_channel_pointer(artifact_dir: Path) -> None:
+    artifact = artifact_dir / "model.safetensors"
+    with (
+        patch("recbuddy.promote.boto3.client") as mock_boto,
+        patch("recbuddy.promote.registry.point_channel") as mock_point,
+    ):
+        mock_client = MagicMock()
+        mock_client.list_objects_v2.return_value = {}
+        mock_boto.return_value = mock_client
+        promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0", channel="latest")
+    _, bucket, channel, manifest = mock_point.call_args.args
+    assert (bucket, channel, manifest["version"]) == (_BUCKET, "latest", "0.1.0")
+
+
+def test_file_digest_matches_s3_multipart_etag(tmp_path: Path) -> None:
+    path = tmp_path / "blob"
+    data = b"a" * 10 + b"b" * 10 + b"c" * 5
+    path.write_bytes(data)
+    digest = file_digest(path, chunk_size=10)
+    parts = [data[:10], data[10:20], data[20:]]
+    md5s = b"".join(hashlib.md5(p).digest() for p in parts)
+    assert digest["sha256"] == hashlib.sha256(data).hexdigest()
+    assert digest["size_bytes"] == 25
+    assert digest["etag"] == f"{hashlib.md5(md5s).hexdigest()}-3"
+    assert digest["parts"]["count"] == 3
+    assert digest["parts"]["sha256"] == [hashlib.sha256(p).hexdigest() for p in parts]
+
+
+def test_file_digest_single_part_etag_is_plain_md5(tmp_path: Path) -> None:
+    path = tmp_path / "blob"
+    path.write_bytes(b"small")
+    digest = file_digest(path, chunk_size=10)
+    assert digest["etag"] == hashlib.md5(b"small").hexdigest()
+    assert digest["parts"]["count"] == 1
+
+
+def test_promote_copies_identical_bytes_instead_of_uploading(
+    artifact_dir: Path,
+) -> None:
+    artifact = artifact_dir / "model.safetensors"
+    sha = hashlib.sha256(b"fake-weights").hexdigest()
+
+    def list_objects(Bucket: str, Prefix: str, MaxKeys: int) -> dict:
+        if Prefix == f"artifacts/sha256/{sha}/":
+            return {"Contents": [{"Key": f"artifacts/sha256/{sha}/0.1.0"}]}
+        return {}
+
+    with patch("recbuddy.promote.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.list_objects_v2.side_effect = list_objects
+        mock_boto.return_value = mock_client
+        promote(artifact=artifact, s3_bucket=_BUCKET, version="0.2.0")
+
+    mock_client.upload_file.assert_not_called()
+    mock_client.copy.assert_called_once_with(
+        {"Bucket": _BUCKET, "Key": "artifacts/0.1.0/model.safetensors"},
+        _BUCKET,
+        "artifacts/0.2.0/model.safetensors",
+        Config=ANY,
+    )
+    manifest = _manifest(mock_client)
+    assert manifest["deduplicated_from"] == "0.1.0"
+    mock_client.put_object.assert_any_call(
+        Bucket=_BUCKET, Key=f"artifacts/sha256/{sha}/0.2.0", Body=b""
+    )
+
+
+def test_promote_writes_digest_marker_last(artifact_dir: Path) -> None:
+    artifact = artifact_dir / "model.safetensors"
+    sha = hashlib.sha256(b"fake-weights").hexdigest()
+    with patch("recbuddy.promote.boto3.client") as mock_boto:
+        mock_client = MagicMock()
+        mock_client.list_objects_v2.return_value = {}
+        mock_boto.return_value = mock_client
+        promote(artifact=artifact, s3_bucket=_BUCKET, version="0.1.0")
+    keys = [c.kwargs["Key"] for c in mock_client.put_object.call_args_list]
+    assert keys[-1] == f"artifacts/sha256/{sha}/0.1.0"
+    assert "artifacts/0.1.0/manifest.json" in keys[:-1]
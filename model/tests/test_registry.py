@@ -0,0 +1,172 @@
+"""Unit tests for the channel-pointer model registry."""
+
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from recbuddy import registry
+
+_BUCKET = "test-bucket"
+
+
+class _FakeS3:
+    """In-memory stand-in for the few S3 calls the registry makes."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **_: object) -> dict:
+        self.objects[Key] = Body
+        return {}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key])}
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[Key])}
+
+    def list_objects_v2(
+        self, Bucket: str, Prefix: str, Delimiter: str = "", MaxKeys: int = 1000
+    ) -> dict:
+        if not Delimiter:
+            keys = sorted(k for k in self.objects if k.startswith(Prefix))
+            return {"Contents": [{"Key": k} for k in keys[:MaxKeys]]}
+        prefixes = sorted(
+            {
+                Prefix + key[len(Prefix) :].split(Delimiter)[0] + Delimiter
+                for key in self.objects
+                if key.startswith(Prefix) and Delimiter in key[len(Prefix) :]
+            }
+        )
+        return {"CommonPrefixes": [{"Prefix": p} for p in prefixes]}
+
+
+def _promote(s3: _FakeS3, version: str) -> dict:
+    manifest = {
+        "version": version,
+        "artifact_key": f"artifacts/{version}/model.safetensors",
+        "sha256": f"sha-{version}",
+        "size_bytes": 123,
+    }
+    s3.put_object(
+        Bucket=_BUCKET,
+        Key=registry.manifest_key(version),
+        Body=json.dumps(manifest).encode(),
+    )
+    return manifest
+
+
+def test_channel_key_rejects_unsafe_names() -> None:
+    assert registry.channel_key("stable") == "artifacts/channels/stable.json"
+    with pytest.raises(ValueError, match="Invalid channel"):
+        registry.channel_key("../stable")
+
+
+def test_list_versions_sorts_semver_and_skips_channels() -> None:
+    s3 = _FakeS3()
+    for version in ("0.10.0", "0.2.0", "0.9.1"):
+        _promote(s3, version)
+    registry.set_channel(s3, _BUCKET, "stable", "0.2.0")
+    assert registry.list_versions(s3, _BUCKET) == ["0.2.0", "0.9.1", "0.10.0"]
+
+
+def test_set_channel_records_hash_and_previous_version() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    _promote(s3, "0.2.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.1.0")
+    pointer = registry.set_channel(s3, _BUCKET, "stable", "0.2.0")
+    assert pointer["version"] == "0.2.0"
+    assert pointer["sha256"] == "sha-0.2.0"
+    assert pointer["previous"] == "0.1.0"
+    assert registry.read_channel(s3, _BUCKET, "stable") == pointer
+
+
+def test_set_channel_rejects_unknown_version() -> None:
+    with pytest.raises(ValueError, match="No manifest"):
+        registry.set_channel(_FakeS3(), _BUCKET, "stable", "9.9.9")
+
+
+def test_rollback_returns_to_previous_version() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    _promote(s3, "0.2.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.1.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.2.0")
+    pointer = registry.rollback(s3, _BUCKET, "stable")
+    assert pointer["version"] == "0.1.0"
+    assert pointer["previous"] is None
+
+
+def test_repeated_rollback_steps_back_without_ping_pong() -> None:
+    s3 = _FakeS3()
+    for version in ("0.1.0", "0.2.0", "0.3.0"):
+        _promote(s3, version)
+        registry.set_channel(s3, _BUCKET, "stable", version)
+    assert registry.rollback(s3, _BUCKET, "stable")["version"] == "0.2.0"
+    assert registry.rollback(s3, _BUCKET, "stable")["version"] == "0.1.0"
+    with pytest.raises(ValueError, match="no previous version"):
+        registry.rollback(s3, _BUCKET, "stable")
+
+
+def test_set_channel_to_current_version_keeps_history() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    _promote(s3, "0.2.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.1.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.2.0")
+    pointer = registry.set_channel(s3, _BUCKET, "stable", "0.2.0")
+    assert pointer["history"] == ["0.1.0"]
+    assert registry.rollback(s3, _BUCKET, "stable")["version"] == "0.1.0"
+
+
+def test_rollback_reads_pointers_without_history() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    manifest = _promote(s3, "0.2.0")
+    legacy = {**manifest, "channel": "stable", "previous": "0.1.0"}
+    s3.put_object(
+        Bucket=_BUCKET,
+        Key=registry.channel_key("stable"),
+        Body=json.dumps(legacy).encode(),
+    )
+    assert registry.rollback(s3, _BUCKET, "stable")["version"] == "0.1.0"
+
+
+def test_rollback_without_history_raises() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    registry.set_channel(s3, _BUCKET, "stable", "0.1.0")
+    with pytest.raises(ValueError, match="no previous version"):
+        registry.rollback(s3, _BUCKET, "stable")
+
+
+def test_find_by_sha256_returns_recorded_version() -> None:
+    s3 = _FakeS3()
+    assert registry.find_by_sha256(s3, _BUCKET, "abc") is None
+    _promote(s3, "0.1.0")
+    registry.record_digest(s3, _BUCKET, "abc", "0.1.0")
+    assert registry.find_by_sha256(s3, _BUCKET, "abc") == "0.1.0"
+    assert registry.find_by_sha256(s3, _BUCKET, "abd") is None
+
+
+def test_find_by_sha256_skips_markers_without_manifest() -> None:
+    s3 = _FakeS3()
+    registry.record_digest(s3, _BUCKET, "abc", "0.1.0")  # promote died here
+    assert registry.find_by_sha256(s3, _BUCKET, "abc") is None
+    _promote(s3, "0.2.0")
+    registry.record_digest(s3, _BUCKET, "abc", "0.2.0")
+    assert registry.find_by_sha256(s3, _BUCKET, "abc") == "0.2.0"
+
+
+def test_list_versions_skips_digest_markers() -> None:
+    s3 = _FakeS3()
+    _promote(s3, "0.1.0")
+    registry.record_digest(s3, _BUCKET, "abc", "0.1.0")
+    assert registry.list_versions(s3, _BUCKET) == ["0.1.0"]
@@ -4,14 +4,22 @@ Tests must FAIL before implementation is complete (TDD — constitution Principl
 Uses tiny synthetic datasets — no S3 access required.
 """
 
+import random
 from pathlib import Path
 from typing import cast
 
+import numpy as np
 import torch
 import torch.nn as nn
 from PIL import Image
 
-from recbuddy.train import build_model, freeze_backbone, get_optimizer, train_one_epoch
+from recbuddy.train import (
+    build_model,
+    freeze_backbone,
+    get_optimizer,
+    set_seeds,
+    train_one_epoch,
+)
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -53,6 +61,14 @@ def test_build_model_custom_num_classes() -> None:
     assert isinstance(head, nn.Linear) and head.out_features == 10
 
 
+def test_build_model_mobilenet_head_shape() -> None:
+    model = build_model(
+        num_classes=48, pretrained=False, architecture="mobilenet_v3_small"
+    )
+    head = cast(nn.Sequential, model.classifier)[3]
+    assert isinstance(head, nn.Linear) and head.out_features == 48
+
+
 # ---------------------------------------------------------------------------
 # freeze_backbone
 # ---------------------------------------------------------------------------
@@ -114,3 +130,59 @@ def test_train_one_epoch_returns_float_loss(tmp_path: Path) -> None:
     loss = train_one_epoch(model, loader, optimizer, criterion)
     assert isinstance(loss, float)
     assert loss > 0.0
+
+
+def test_train_one_epoch_records_profiler_phases(tmp_path: Path) -> None:
+    from torch.utils.data import DataLoader
+    from torchvision.datasets import ImageFolder
+
+    from recbuddy.profiling import TrainingProfiler
+    from recbuddy.transforms import training_transform
+
+    data_dir = _make_tiny_dataset(tmp_path, n_classes=3, n_per_class=2)
+    model = build_model(num_classes=3)
+    optimizer = get_optimizer(model, head_lr=1e-3, backbone_lr=1e-5)
+    dataset = ImageFolder(root=str(data_dir), transform=training_transform())
+    loader = DataLoader(dataset, batch_size=2, shuffle=True)
+    profiler = TrainingProfiler()
+
+    train_one_epoch(model, loader, optimizer, nn.CrossEntropyLoss(), profiler)
+
+    summary = profiler.summary()
+    assert summary["images"] == 6
+    for phase in ("data", "forward", "backward", "optimizer_step"):
+        assert summary["phases"][phase]["count"] == 3
+
+
+def test_train_one_epoch_bf16_returns_float_loss(tmp_path: Path) -> None:
+    from torch.utils.data import DataLoader
+    from torchvision.datasets import ImageFolder
+
+    from recbuddy.transforms import training_transform
+
+    data_dir = _make_tiny_dataset(tmp_path, n_classes=3, n_per_class=2)
+    model = build_model(num_classes=3)
+    optimizer = get_optimizer(model, head_lr=1e-3, backbone_lr=1e-5)
+    dataset = ImageFolder(root=str(data_dir), transform=training_transform())
+    loader = DataLoader(dataset, batch_size=2, shuffle=True)
+
+    loss = train_one_epoch(model, loader, optimizer, nn.CrossEntropyLoss(), bf16=True)
+    assert isinstance(loss, float)
+    assert loss > 0.0
+    # Weights stay fp32 under autocast
+    assert all(p.dtype == torch.float32 for p in model.parameters())
+
+
+# ---------------------------------------------------------------------------
+# set_seeds
+# ---------------------------------------------------------------------------
+
+
+def test_set_seeds_makes_every_rng_repeatable() -> None:
+    def draws() -> tuple:
+        return random.random(), float(np.random.rand()), float(torch.rand(1))
+
+    set_seeds(7)
+    first = draws()
+    set_seeds(7)
+    assert draws() == first
@@ -0,0 +1,54 @@
+"""Unit tests for test-time augmentation views and averaging."""
+
+import pytest
+import torch
+import torch.nn as nn
+from PIL import Image
+
+from recbuddy.transforms import inference_transform, tta_transform
+from recbuddy.tta import (
+    TTA_VIEWS,
+    TTAModel,
+    average_probabilities,
+    center_view,
+    tta_views,
+)
+
+
+def test_center_view_matches_inference_transform() -> None:
+    img = Image.effect_mandelbrot((400, 300), (-2.0, -1.5, 1.0, 1.5), 50)
+    img = img.convert("RGB")
+    square = tta_transform()(img).unsqueeze(0)
+    expected = inference_transform()(img).unsqueeze(0)
+    assert torch.allclose(center_view(square), expected, atol=1e-6)
+
+
+def test_tta_views_shape_and_order() -> None:
+    batch = torch.randn(2, 3, 256, 256)
+    views = tta_views(batch)
+    assert views.shape == (2 * len(TTA_VIEWS), 3, 224, 224)
+    # Sample-major: row 0 is sample 0 "center", row V+1 is sample 1 "hflip".
+    assert torch.equal(views[0], center_view(batch)[0])
+    assert torch.equal(views[len(TTA_VIEWS) + 1], center_view(batch)[1].flip(-1))
+
+
+def test_tta_views_rejects_wrong_size_and_unknown_view() -> None:
+    with pytest.raises(ValueError, match="256x256"):
+        tta_views(torch.randn(1, 3, 224, 224))
+    with pytest.raises(ValueError, match="Unknown"):
+        tta_views(torch.randn(1, 3, 256, 256), ["center", "rotate"])
+
+
+def test_average_probabilities_sums_to_one() -> None:
+    probs = average_probabilities(torch.randn(4, len(TTA_VIEWS), 5))
+    assert probs.shape == (4, 5)
+    assert torch.allclose(probs.sum(dim=1), torch.ones(4))
+
+
+def test_tta_model_runs_one_forward_pass() -> None:
+    calls = []
+    net = nn.Sequential(nn.AdaptiveAvgPool2d(1), nn.Flatten(), nn.Linear(3, 5))
+    net.register_forward_hook(lambda m, i, o: calls.append(i[0].shape[0]))
+    logits = TTAModel(net)(torch.randn(3, 3, 256, 256))
+    assert logits.shape == (3, len(TTA_VIEWS), 5)
+    assert calls == [3 * len(TTA_VIEWS)]